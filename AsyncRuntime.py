@@ -0,0 +1,100 @@
+# An asynchronous runtime executes the programs inside an asyncio event loop (es. in a web service with many sessions):
+# the input statements (prompt) suspend the execution until the host supplies the line, and the long loops give the
+# control back to the event loop every slice_steps steps (iterations of a loop or function calls), so a script that
+# does not stop cannot starve the other coroutines. The programs are executed by the virtual machine
+# (VirtualMachine.py), whose execution is a generator: suspending it keeps the frames in the generator instead of
+# blocking a thread, so a process can hold thousands of sessions, each one with its own runtime.
+# With resource limits, the time spent suspended (waiting for the input or for the other coroutines) is not counted
+# in the timeout.
+import asyncio
+
+from Frame import max_call_depth
+from Runtime import Runtime
+from VirtualMachine import BytecodeCompiler, VirtualMachine, INPUT
+
+default_slice_steps = 1000  # steps executed before giving the control back to the event loop
+
+
+class AsyncRuntime(Runtime):
+    """
+    This class executes JavaScript programs in an isolated global scope like Runtime, but run, execute, call and
+    restore are coroutines
+    """
+    def __init__(self, read_input=None, slice_steps=default_slice_steps, optimize=False, parser=None, cache=None,
+                 output=None, max_call_depth=max_call_depth, limits=None):
+        """
+        :param read_input: coroutine function without arguments returning the line read by an input statement
+        (es. the get method of an asyncio.Queue), if not specified the input statements raise EOFError
+        :param slice_steps: number of steps after which the execution yields to the event loop (None to never yield)
+        The other parameters are the ones of Runtime, the engine is always the virtual machine. The limits must not be
+        shared with other runtimes.
+        """
+        super().__init__('vm', optimize, parser=parser, cache=cache, output=output, max_call_depth=max_call_depth,
+                         limits=limits)
+        self.read_input = read_input
+        self.slice_steps = slice_steps
+
+    def compile(self, tree):
+        """
+        :param tree: parse tree returned by the parser or by the optimize method
+        :return: a function without arguments that starts the execution of the program (a generator)
+        """
+        counts_limits = self.limits is not None and self.limits.counts_steps
+        code = BytecodeCompiler(self.transformer, counts_limits or self.slice_steps is not None).compile(tree)
+        machine = VirtualMachine(self.transformer, self.max_call_depth, self.limits if counts_limits else None,
+                                 self.slice_steps, suspend_input=True)
+        return lambda: machine.start(code)
+
+    async def restore(self, snapshot):
+        """
+        Declares the global variables and functions of a snapshot, replacing the ones with the same names
+        """
+        await self.execute(snapshot.restore(self))
+
+    async def execute(self, tree):
+        """
+        Executes the parse tree of a program
+        :param tree: parse tree returned by the parser or by the optimize method
+        :return: the value of the program
+        """
+        return await self.call(self.compile(tree))
+
+    async def call(self, program):
+        """
+        Executes a compiled program, awaiting the input and yielding to the event loop at the end of every time slice.
+        The output is flushed at the end (also when the program raises an error or the task is cancelled).
+        :param program: function returned by the compile method
+        :return: the value of the program
+        """
+        if self.limits is not None:
+            self.limits.start()
+        execution = program()
+        line = None  # value sent to the execution when it is resumed
+        try:
+            while True:
+                try:
+                    request = execution.send(line)
+                except StopIteration as stop:
+                    return stop.value
+                if self.limits is not None:
+                    self.limits.suspend()
+                if request == INPUT:
+                    if self.read_input is None:
+                        raise EOFError('EOF when reading a line')
+                    line = await self.read_input()
+                else:  # end of the time slice
+                    line = None
+                    await asyncio.sleep(0)
+                if self.limits is not None:
+                    self.limits.resume()
+        finally:
+            execution.close()
+            self.output.flush()
+
+    async def run(self, source):
+        """
+        Parses and executes a program
+        :param source: JavaScript source code
+        :return: the value of the program (es. the value printed by the console)
+        """
+        return await self.call(self.program(source))
@@ -0,0 +1,113 @@
+# Batch execution of many scripts (flag --batch): the scripts are distributed over a pool of worker processes, so the
+# imports and the construction of the parser are paid once per worker instead of once per script.
+# The parser is built (or loaded from the on-disk cache) by the main process before the pool starts, thus the workers
+# inherit it or load it from the warm cache. Every script is executed by its own runtime (Runtime.py), with its own
+# global symbol table, so the scripts cannot see the variables of the other scripts executed by the same worker.
+# The output of each script is captured (by a CaptureSink) and printed in the order of the scripts, followed by a summary
+# with the throughput and the failed scripts.
+# With a snapshot (es. of a prelude), every worker loads it once and restores it into the runtime of every script.
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from lark import UnexpectedInput
+
+from OutputSink import CaptureSink
+from Runtime import Runtime, get_parser
+from Snapshot import Snapshot
+from error_handling import JavaScriptSyntaxError, ExecutionLimitExceeded, IsNotAFunction, RangeError, \
+    script_error_message
+
+snapshot = None  # Snapshot restored before every script of the worker
+
+
+class ScriptResult:
+    """
+    Outcome of the execution of a script
+    """
+    def __init__(self, path, output, error, elapsed):
+        self.path = path
+        self.output = output  # printed output of the script
+        self.error = error  # message of the error that stopped the script, None if it ended normally
+        self.elapsed = elapsed  # seconds
+
+
+def find_scripts(pattern):
+    """
+    :param pattern: a directory (all the .js files in it and in its subdirectories) or a glob pattern
+    :return: the sorted list of the paths of the scripts
+    """
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, '**', '*.js')
+    return sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+
+
+def init_worker(use_cache, snapshot_path=None):
+    """
+    Prepares a worker process: the parser and the snapshot are loaded once, and the keyboard input is closed so that
+    the prompt() calls of the scripts do not compete for the terminal
+    """
+    global snapshot
+    sys.stdin = open(os.devnull)
+    get_parser(use_cache=use_cache)
+    if snapshot_path is not None:
+        snapshot = Snapshot.load(snapshot_path)
+
+
+def run_script(path, engine='compiled', optimize=False, limits=None):
+    """
+    Executes a script with a new global scope
+    :param limits: ExecutionLimits of the script (a copy of them is received by every worker)
+    :return: the ScriptResult of the script
+    """
+    output = CaptureSink()
+    error = None
+    start = time.perf_counter()
+    try:
+        with open(path, 'r') as f:
+            runtime = Runtime(engine, optimize, output=output, limits=limits)
+            if snapshot is not None:
+                runtime.restore(snapshot)
+            runtime.run(f.read())
+    except (UnexpectedInput, JavaScriptSyntaxError) as e:
+        error = script_error_message(e).rstrip('\n')
+    except (IsNotAFunction, RangeError, ExecutionLimitExceeded) as e:
+        error = str(e)
+    except Exception as e:  # the other scripts are executed anyway
+        error = '%s: %s' % (type(e).__name__, e)
+    return ScriptResult(path, output.getvalue(), error, time.perf_counter() - start)
+
+
+def run_batch(pattern, engine='compiled', optimize=False, jobs=None, use_cache=True, limits=None, snapshot_path=None):
+    """
+    Executes all the scripts matching the pattern and prints their outputs and the summary
+    :param jobs: number of worker processes (the number of CPUs if None)
+    :param limits: ExecutionLimits of every script, so that a script that does not terminate does not hold a worker
+    :param snapshot_path: file of a Snapshot restored before every script, None to start every script from scratch
+    :return: the exit status, 1 if at least a script failed
+    """
+    scripts = find_scripts(pattern)
+    if not scripts:
+        print('No scripts found for ' + pattern)
+        return 1
+    get_parser(use_cache=use_cache)  # the workers inherit the parser or load it from the warm cache
+    jobs = min(jobs or os.cpu_count() or 1, len(scripts))
+    start = time.perf_counter()
+    failures = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(use_cache, snapshot_path)) as pool:
+        results = pool.map(run_script, scripts, [engine] * len(scripts), [optimize] * len(scripts),
+                           [limits] * len(scripts), chunksize=max(1, len(scripts) // (jobs * 4)))
+        for result in results:  # in the order of the scripts
+            print('==> %s <==' % result.path)
+            print(result.output, end='')
+            if result.error is not None:
+                print(result.error)
+                failures.append(result)
+    elapsed = time.perf_counter() - start
+    print('\n%d scripts in %.2fs (%.1f scripts/s, %d workers), %d failed'
+          % (len(scripts), elapsed, len(scripts) / elapsed, jobs, len(failures)))
+    for result in failures:
+        print('FAILED %s: %s' % (result.path, result.error.splitlines()[0]))
+    return 1 if failures else 0
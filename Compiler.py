@@ -0,0 +1,629 @@
+# The compiler visits the parse tree only once, before the execution, and turns each node into a Python closure.
+# Executing the program then just calls the closures: the tree is never visited again, thus the statements of a loop
+# or of a function body do not pay the dispatch of Lark's Interpreter and Transformer at every evaluation.
+# The identifiers are resolved at compile time by the resolver (Resolver.py): each closure takes the frame of the
+# function being executed, and the local variables are read and written by index in the slots of the frames (see
+# Frame.py), only the global variables are searched by name in the symbol table.
+# The operations are computed by the methods of TreeToJS (called with the same arguments that the transformer would
+# pass to them), so the compiled program has the same semantics of the tree-walking interpreter. The operators && and
+# || and the ternary condition evaluate only the operands that give their value (short-circuit evaluation).
+# A JavaScript call is executed by nested Python calls of the closures, except for the calls in tail position
+# (return f(...)): they return a TailCall to the caller, which executes it in a loop (trampoline) after the frame of the
+# returning function has been left, so tail recursion runs in constant Python stack. Only the tail calls run in
+# constant stack: the other calls nest Python calls, so the depth of the JavaScript call stack is limited by
+# max_call_depth (RangeError), and the Python recursion limit is raised to let the nested calls reach it. The limit is
+# raised only while a compiled program runs, and restored when the last of the programs running in the process ends.
+# The bytecode virtual machine (VirtualMachine.py) keeps all the calls in an explicit stack of frames instead.
+import sys
+import threading
+from contextlib import contextmanager
+
+from lark import Tree
+
+from Frame import Frame, FrameVariables, UNSET, max_call_depth
+from Profiler import program_name
+from Resolver import Resolver
+from error_handling import RangeError
+from js_values import undefined, truthy
+
+recursion_lock = threading.Lock()
+running_programs = 0  # compiled programs running in the process (es. in the threads of a pool)
+saved_recursion_limit = None  # recursion limit of the process before the first of the running programs
+
+
+@contextmanager
+def recursion_limit(limit):
+    """
+    Raises the Python recursion limit of the process to at least limit while the block is executed
+    """
+    global running_programs, saved_recursion_limit
+    with recursion_lock:
+        if running_programs == 0:
+            saved_recursion_limit = sys.getrecursionlimit()
+        running_programs += 1
+        if sys.getrecursionlimit() < limit:
+            sys.setrecursionlimit(limit)
+    try:
+        yield
+    finally:
+        with recursion_lock:
+            running_programs -= 1
+            if running_programs == 0:
+                sys.setrecursionlimit(saved_recursion_limit)
+
+
+# rules of the statements whose executions are counted by the profiler
+statement_rules = {'print_statement', 'variable_statement', 'variable_assignment', 'if_statement', 'while_statement',
+                   'hoisted_while', 'return_statement', 'function_declaration', 'function_call',
+                   'ternary_condition_statement'}
+
+
+class FunctionReturn(Exception):
+    """
+    Raised by a return statement nested in an if or while statement to leave the function that is being executed
+    """
+    def __init__(self, value):
+        super().__init__()
+        self.value = value
+
+
+class TailCall:
+    """
+    Call in tail position, returned to the caller instead of being executed
+    """
+    __slots__ = ('code', 'frame')
+
+    def __init__(self, code, frame):
+        self.code = code  # compiled body of the called function
+        self.frame = frame  # frame of the called function, with the arguments
+
+
+class JavaScriptCompiler:
+    """
+    This class compiles the parse tree returned by the parser into closures. Each method corresponds to one of the
+    rules in the grammar and returns the closure (with the frame of the function as argument) that evaluates the
+    subtree.
+    """
+    # Python frames that a JavaScript call can take at most (the calls nested in statements and operations), used to
+    # raise the Python recursion limit
+    python_frames_per_call = 32
+
+    def __init__(self, transformer, profiler=None, max_call_depth=max_call_depth, memoizer=None, limits=None):
+        self.transformer = transformer  # it holds the global symbol table and computes the operations
+        self.profiler = profiler  # if given, the closures record the time of the functions and the executed lines
+        self.memoizer = memoizer  # if given, the calls of the pure functions are cached (see Memoizer.py)
+        # if given, the loop conditions and the function bodies count the steps of the execution (ExecutionLimits.py)
+        self.limits = limits if limits is not None and limits.counts_steps else None
+        self.memoized = {}  # id of the declaration -> MemoizedFunction, for the pure functions of the program
+        self.max_call_depth = max_call_depth  # maximum number of nested calls
+        self.parents = []  # nodes being compiled, from the root (only with the profiler)
+        self.variables = FrameVariables(transformer)
+        self.resolver = Resolver()
+        self.scope = None  # scope of the statement being compiled
+        self.in_function = False  # True while compiling the body of a function
+
+    def compile(self, tree):
+        """
+        Compiles the parse tree of a program
+        :param tree: parse tree returned by the parser
+        :return: a function without arguments that executes the program and returns its value
+        """
+        self.scope = self.resolver.resolve(tree)
+        if self.memoizer is not None:
+            self.memoized = self.memoizer.analyze(tree)
+        program = self.visit(tree)
+        if self.profiler is not None:
+            program = self.profiler.frame(program_name, program)
+        nlocals = len(self.scope.local_names)
+
+        limit = self.max_call_depth * self.frames_per_call()
+
+        def run():
+            with recursion_limit(limit):
+                try:
+                    return program(Frame(nlocals, None))
+                except RecursionError:  # the nested calls took more Python frames than expected
+                    raise RangeError() from None
+        return run
+
+    def frames_per_call(self):
+        """
+        :return: the Python frames that a JavaScript call can take at most, including the wrappers of the closures
+        """
+        frames = self.python_frames_per_call
+        if self.profiler is not None:
+            # every statement closure can be wrapped by the profiler, which at most doubles the frames, and the body of
+            # the function is executed in a frame of the profiler
+            frames = frames * 2 + 1
+        if self.memoizer is not None:
+            frames += 1  # the closure of a pure function that looks up the cache
+        if self.limits is not None:
+            frames += 2  # the step counters of the function body and of a loop condition
+        return frames
+
+    def visit(self, tree):
+        if self.profiler is None:
+            return getattr(self, tree.data)(tree)
+        self.parents.append(tree)
+        try:
+            closure = getattr(self, tree.data)(tree)
+        finally:
+            self.parents.pop()
+        return self.trace(tree, closure)
+
+    def trace(self, tree, closure):
+        """
+        :return: the closure of a statement that counts the executions of its line if the program is profiled, the
+        closure itself otherwise
+        """
+        if self.profiler is None or tree.data not in statement_rules or tree.meta.empty:
+            return closure
+        if tree.data == 'function_call' and self.parents:
+            # a function call is counted only when it is a statement, not when it is part of an expression
+            parent = self.parents[-1]
+            if parent.data not in ['start', 'block', 'if_statement', 'while_statement', 'function_declaration'] \
+                    or parent.data in ['if_statement', 'while_statement'] and tree is parent.children[0]:
+                return closure  # es. the call is an operand or the condition of an if statement
+        return self.profiler.statement(tree.meta.line, closure)
+
+    def call_transformer(self, method, tree, children=None):
+        """
+        Compiles a node that is computed by a method of the transformer: the subtrees are evaluated (from left to
+        right) and the tokens are passed as they are, like the transformer does
+        :param method: method of the transformer that computes the node
+        :param tree: the node
+        :param children: children passed to the method instead of the ones of the node
+        :return: the closure that evaluates the node
+        """
+        if children is None:
+            children = tree.children
+        subtrees = [(i, self.visit(child)) for i, child in enumerate(children) if isinstance(child, Tree)]
+        if not subtrees:
+            return lambda frame: method(list(children))
+
+        def run(frame):
+            args = list(children)
+            for i, subtree in subtrees:
+                args[i] = subtree(frame)
+            return method(args)
+        return run
+
+    def binary_operation(self, method, tree):
+        left, right = self.visit(tree.children[0]), self.visit(tree.children[1])
+        return lambda frame: method([left(frame), right(frame)])
+
+    def variable(self, identifier):
+        """
+        :param identifier: JavaScript variable binding (Lark token)
+        :return: the reference to the variable (depth, slot, identifier), depth is -1 for a global variable
+        """
+        depth, slot = self.scope.resolve(identifier)
+        # the identifier is used as key of the symbol table, plain strings are compared faster than Lark tokens
+        return depth, slot, str(identifier)
+
+    def block_scope(self, tree):
+        """
+        Enters the scope of an if or while statement
+        :return: the scope of the enclosing statement and the slots of the variables of the new scope
+        """
+        enclosing_scope, self.scope = self.scope, self.resolver.scope_of(tree)
+        return enclosing_scope, tuple(self.scope.slots.values())
+
+    def block(self, statements):
+        """
+        Compiles a sequence of statements
+        :param statements: list of subtrees
+        :return: the closure that executes the statements and returns the value of the last one
+        """
+        closures = [self.visit(statement) for statement in statements]
+        if len(closures) == 1:
+            return closures[0]
+
+        def run(frame):
+            value = None
+            for statement in closures:
+                value = statement(frame)
+            return value
+        return run
+
+    def start(self, tree):
+        statements = [self.visit(child) for child in tree.children]
+        return lambda frame: [statement(frame) for statement in statements]
+
+    def if_statement(self, tree):
+        condition = self.visit(tree.children[0])
+        enclosing_scope, slots = self.block_scope(tree)
+        true_branch = self.branch(tree.children[1])
+        false_branch = self.branch(tree.children[2]) if len(tree.children) == 3 else None
+        self.scope = enclosing_scope
+
+        def run(frame):
+            if truthy(condition(frame)):
+                branch = true_branch
+            elif false_branch is not None:
+                branch = false_branch
+            else:
+                return None
+            values = frame.values
+            for slot in slots:  # new scope for the if statement
+                values[slot] = UNSET
+            return branch(frame)
+        return run
+
+    def branch(self, tree):
+        """
+        Compiles a branch of an if statement, which can be a block or a single statement
+        :return: the closure that executes the branch and returns the value of the if statement
+        """
+        if tree.data == 'block':
+            if not tree.children:
+                return lambda frame: undefined
+            return self.block(tree.children)  # the value of the last statement of the block
+        statement = self.visit(tree)
+
+        def run(frame):
+            value = statement(frame)
+            if not value:
+                return undefined
+            elif type(value) == list:
+                return value[-1]
+            else:
+                return value
+        return run
+
+    def while_statement(self, tree, invariants=()):
+        """
+        while statement has its own block scope, which is cleared at every iteration
+        :param invariants: closures executed once, before the first iteration (see hoisted_while)
+        """
+        condition = self.visit(tree.children[0])
+        if self.limits is not None:
+            condition = self.limits.counted(condition)
+        enclosing_scope, slots = self.block_scope(tree)
+        body = tree.children[1].children if tree.children[1].data == 'block' else [tree.children[1]]
+        statements = []
+        return_value = None
+        for statement in body:
+            if statement.data == 'return_statement' and not self.in_function:
+                # outside of a function, a return statement in the body ends the loop and gives its value
+                return_value = self.trace(statement, self.return_value(statement))
+                break
+            statements.append(self.visit(statement))
+        self.scope = enclosing_scope
+
+        def run(frame):
+            out = None  # value of the last statement, the body could be never executed
+            values = frame.values
+            pending = invariants
+            while truthy(condition(frame)):
+                for slot in slots:  # clear the scope for the next iteration
+                    values[slot] = UNSET
+                if pending:
+                    for invariant in pending:
+                        invariant(frame)
+                    pending = ()
+                for statement in statements:
+                    out = statement(frame)
+                if return_value is not None:
+                    return return_value(frame)
+            if type(out) == list:
+                return out[-1]
+            else:
+                return out
+        if self.profiler is not None:
+            return self.profiler.frame('while (line %d)' % tree.meta.line if not tree.meta.empty else 'while', run)
+        return run
+
+    def hoisted_while(self, tree):
+        """
+        while statement whose invariant operations have been moved by the optimizer (Optimizer.py) to the declarations
+        of temporary variables, which precede the loop
+        """
+        enclosing_scope, self.scope = self.scope, self.resolver.scope_of(tree)  # scope of the temporary variables
+        invariants = tuple(self.visit(declaration) for declaration in tree.children[:-1])
+        run = self.while_statement(tree.children[-1], invariants)
+        self.scope = enclosing_scope
+        return run
+
+    def ternary_condition_statement(self, tree):
+        condition = self.visit(tree.children[0])
+        true_branch, false_branch = self.visit(tree.children[1]), self.visit(tree.children[2])
+
+        def run(frame):
+            if truthy(condition(frame)):
+                value = true_branch(frame)
+            else:
+                value = false_branch(frame)
+            if type(value) == list:
+                raise Exception('SyntaxError: Unexpected token')
+            return value
+        return run
+
+    def function_declaration(self, tree):
+        variable = self.variable(tree.children[1])
+        parameter_list = Resolver.parameter_list(tree)
+        function_body = tree.children[-1]  # it is a subtree
+        enclosing_scope, self.scope = self.scope, self.resolver.scope_of(tree)
+        # the body is compiled once, when the program is compiled
+        code = self.function_body(function_body)
+        if self.profiler is not None:
+            code = self.profiler.frame(str(tree.children[1]), code)
+        if self.limits is not None:
+            code = self.limits.counted(code)
+        parameter_slots = tuple(self.scope.slots[parameter] for parameter in parameter_list)
+        memoized = self.memoized.get(id(tree))
+        globals_table = self.variables.globals.table
+        if memoized is not None:
+            code = self.memoizer.function(memoized, code, parameter_slots, globals_table, self.max_call_depth)
+        attributes = {'declaration': 'function', 'parameter_list': parameter_list, 'body': function_body,
+                      'type': 'function', 'code': code,
+                      'nlocals': len(self.scope.local_names),
+                      'parameter_slots': parameter_slots}
+        self.scope = enclosing_scope
+        declare_function = self.variables.declare_function
+        if memoized is None:
+            return lambda frame: declare_function(frame, variable, attributes)
+
+        def run(frame):
+            value = declare_function(frame, variable, attributes)
+            memoized.binding = globals_table.get(variable[2])  # the calls are cached while the name is bound to it
+            return value
+        return run
+
+    def function_body(self, tree):
+        """
+        Compiles the body of a function
+        :param tree: a block or a single statement
+        :return: the closure that executes the body and returns the value returned by the function
+        """
+        in_function, self.in_function = self.in_function, True
+        try:
+            statements = []
+            return_value = None
+            for statement in (tree.children if tree.data == 'block' else [tree]):
+                if statement.data == 'return_statement':
+                    # the statements after the return are never executed
+                    return_value = self.trace(statement, self.return_value(statement))
+                    break
+                statements.append(self.visit(statement))
+        finally:
+            self.in_function = in_function
+
+        def run(frame):
+            try:
+                for statement in statements:
+                    statement(frame)
+                if return_value is None:
+                    return undefined
+                return return_value(frame)
+            except FunctionReturn as r:  # return statement nested in an if or a while statement
+                return r.value
+        return run
+
+    def function_call(self, tree, tail=False):
+        """
+        :param tail: True for a call in tail position: the closure returns the TailCall, which is executed by the caller
+        """
+        variable = self.variable(tree.children[0])
+        # take the argument list
+        if len(tree.children) == 3:
+            arguments = []  # if there are no arguments
+        elif tree.children[2].data == 'argument_list':  # if there are more than one argument
+            arguments = [self.visit(argument) for argument in tree.children[2].children]
+        else:
+            arguments = [self.visit(tree.children[2])]
+        find_function = self.variables.function
+        max_depth = self.max_call_depth
+
+        def call(frame):
+            """
+            :return: the TailCall of the function with the arguments, None if the identifier is not a function
+            """
+            argument_list = [argument(frame) for argument in arguments]
+            function = find_function(frame, variable)  # None if the identifier is not associated with a function
+            if function is None:
+                return None
+            # a tail call takes the place of the frame of the caller on the call stack
+            depth = frame.depth if tail else frame.depth + 1
+            if depth > max_depth:
+                raise RangeError()
+            # create the frame of the function, linked to the frame where the function has been declared
+            callee = Frame(function['nlocals'], function['scope'], depth=depth)
+            parameter_slots = function['parameter_slots']
+            for i in range(len(parameter_slots)):
+                callee.values[parameter_slots[i]] = argument_list[i] if i < len(argument_list) else undefined
+                callee.declarations[parameter_slots[i]] = 'var'
+            return TailCall(function['code'], callee)
+
+        if tail:
+            return call
+
+        def run(frame):
+            result = call(frame)
+            while type(result) is TailCall:  # the function, and the ones it calls in tail position
+                result = result.code(result.frame)
+            return result
+        return run
+
+    def return_value(self, tree):
+        """
+        :param tree: a return statement
+        :return: the closure that evaluates the returned expression
+        """
+        for child in tree.children:
+            if isinstance(child, Tree):
+                if self.in_function and child.data == 'function_call':
+                    return self.function_call(child, tail=True)  # return f(...)
+                return self.visit(child)
+        return lambda frame: undefined  # return without expression
+
+    def return_statement(self, tree):
+        value = self.return_value(tree)
+        if not self.in_function:
+            return value
+
+        def run(frame):
+            raise FunctionReturn(value(frame))
+        return run
+
+    def print_statement(self, tree):
+        return self.call_transformer(self.transformer.print_statement, tree)
+
+    def input_statement(self, tree):
+        return self.call_transformer(self.transformer.input_statement, tree)
+
+    def variable_statement(self, tree):
+        children = tree.children
+        if len(children) == 2:  # variable declaration (es. let a)
+            variable, keyword = self.variable(children[1]), children[0]
+            declare = self.variables.declare
+            return lambda frame: declare(frame, variable, keyword, False, None)
+        elif len(children) == 3:  # variable assignment (es. a = 2)
+            variable, value = self.variable(children[0]), self.visit(children[2])
+            assign = self.variables.assign
+            if variable[0] != 0:
+                return lambda frame: assign(frame, variable, value(frame))
+            slot = variable[1]
+
+            def run(frame):
+                new_value = value(frame)
+                if frame.values[slot] is UNSET or frame.declarations[slot] == 'const':
+                    return assign(frame, variable, new_value)
+                frame.values[slot] = new_value
+                return new_value
+            return run
+        elif len(children) == 4:  # variable declaration and assignment (es. let a = 2)
+            variable, keyword, value = self.variable(children[1]), children[0], self.visit(children[3])
+            declare = self.variables.declare
+            return lambda frame: declare(frame, variable, keyword, True, value(frame))
+        elif len(children) == 6:  # assignment to a cell of the array
+            variable, index, value = self.variable(children[0]), self.visit(children[2]), self.visit(children[5])
+            store_element = self.variables.store_element
+
+            def run(frame):
+                i = index(frame)
+                return store_element(frame, variable, i, value(frame))
+            return run
+        return lambda frame: None
+
+    def variable_assignment(self, tree):
+        children = tree.children
+        update = self.variables.update
+        if children[0] in ['++', '--']:  # pre increment and pre decrement
+            variable, operator = self.variable(children[1]), str(children[0])
+            return lambda frame: update(frame, variable, operator, True, None)
+        variable, operator = self.variable(children[0]), str(children[1])
+        if len(children) == 2:  # post increment and post decrement
+            return lambda frame: update(frame, variable, operator, False, None)
+        operand = self.visit(children[2])
+        return lambda frame: update(frame, variable, operator, False, operand(frame))
+
+    def logical_and(self, tree):
+        left, right = self.visit(tree.children[0]), self.visit(tree.children[1])
+
+        def run(frame):
+            value = left(frame)
+            return right(frame) if truthy(value) else value  # the right operand is evaluated only if it is needed
+        return run
+
+    def logical_or(self, tree):
+        left, right = self.visit(tree.children[0]), self.visit(tree.children[1])
+
+        def run(frame):
+            value = left(frame)
+            return value if truthy(value) else right(frame)
+        return run
+
+    def equality(self, tree):
+        return self.binary_operation(self.transformer.equality, tree)
+
+    def inequality(self, tree):
+        return self.binary_operation(self.transformer.inequality, tree)
+
+    def strict_equality(self, tree):
+        return self.binary_operation(self.transformer.strict_equality, tree)
+
+    def strict_inequality(self, tree):
+        return self.binary_operation(self.transformer.strict_inequality, tree)
+
+    def greater_than(self, tree):
+        return self.binary_operation(self.transformer.greater_than, tree)
+
+    def greater_than_or_equal(self, tree):
+        return self.binary_operation(self.transformer.greater_than_or_equal, tree)
+
+    def less_than(self, tree):
+        return self.binary_operation(self.transformer.less_than, tree)
+
+    def less_than_or_equal(self, tree):
+        return self.binary_operation(self.transformer.less_than_or_equal, tree)
+
+    def add(self, tree):
+        return self.binary_operation(self.transformer.add, tree)
+
+    def sub(self, tree):
+        return self.binary_operation(self.transformer.sub, tree)
+
+    def mul(self, tree):
+        return self.binary_operation(self.transformer.mul, tree)
+
+    def div(self, tree):
+        return self.binary_operation(self.transformer.div, tree)
+
+    def negative(self, tree):
+        return self.call_transformer(self.transformer.negative, tree)
+
+    def logical_not(self, tree):
+        return self.call_transformer(self.transformer.logical_not, tree)
+
+    def template_literal(self, tree):
+        return self.call_transformer(self.transformer.template_literal, tree)
+
+    def factor(self, tree):
+        child = tree.children[0]
+        if isinstance(child, Tree):  # template literal, input statement, array or function call
+            return self.visit(child)
+        elif child.type == 'IDENTIFIER':
+            return self.identifier(child)
+        value = self.transformer.factor([child])  # literals are computed once, at compile time
+        return lambda frame: value
+
+    def identifier(self, identifier):
+        """
+        :param identifier: JavaScript variable binding
+        :return: the closure that reads the value of the variable
+        """
+        variable = self.variable(identifier)
+        load = self.variables.load
+        if variable[0] != 0:  # variable of an enclosing function or global variable
+            return lambda frame: load(frame, variable)
+        slot = variable[1]
+
+        def run(frame):
+            value = frame.values[slot]
+            if value is UNSET or type(value) is dict:  # not declared in the local scope or function
+                return load(frame, variable)
+            return value
+        return run
+
+    def term(self, tree):
+        return self.visit(tree.children[0])
+
+    def expression(self, tree):
+        return self.visit(tree.children[0])
+
+    def array(self, tree):
+        # an empty array literal has a single None child (placeholder of the missing element list)
+        elements = [self.visit(child) for child in tree.children if child is not None]
+        array = self.transformer.array
+        return lambda frame: array([element(frame) for element in elements])
+
+    def array_access(self, tree):
+        array, index = self.identifier(tree.children[0]), self.visit(tree.children[1])
+        get_element = self.transformer.get_element
+        return lambda frame: get_element(array(frame), index(frame))
+
+    def array_length(self, tree):
+        array = self.identifier(tree.children[0])
+        length = self.transformer.length
+        return lambda frame: length(array(frame))
@@ -0,0 +1,226 @@
+# Incremental parsing of the lines typed in the console (JS> prompt).
+# A statement can span many lines (es. a function declaration or a loop): the lines are read until the statement is
+# complete, then the statement is executed. Every line is lexed on its own and its tokens are fed to Lark's interactive
+# parser, which keeps the parser state between the lines, so reading a line costs time proportional to the line and not
+# to the whole statement typed so far. A statement is complete when its brackets are balanced and the parser accepts
+# the end of input after it: a line that ends with the condition of an if or of a while statement waits for the body.
+# An if statement whose block has just been closed could still go on with an else in the next line, as in a script:
+# it is held until the next line, and executed before it unless the line starts with else (an empty line executes it).
+# When the statement is complete the end of input is fed to the parser, which returns the parse tree of the lines.
+# A multi-line comment (/* ... */) cannot be lexed one line at a time: its text is kept until the line that closes it.
+# Lark has no public API to lex a new text with the lexer of an interactive parser (the contextual lexer, which depends
+# on the parser state): lex_text is the only function using Lark's internals, which are the ones of tested_lark_version,
+# and it fails with a clear error if the installed version has changed them. The tokens are fed with the public API.
+import re
+
+import lark
+from lark import Token, UnexpectedInput
+
+try:
+    from lark.lexer import LexerState, LineCounter
+except ImportError:  # moved by another version of Lark, lex_text raises the error
+    LexerState = LineCounter = None
+
+from ErrorClassifier import get_classifier
+
+tested_lark_version = '1.1.7'
+
+opening_brackets = ['LPAR', 'LSQB', 'LBRACE']  # and the ${ of the template literals, an anonymous terminal
+closing_brackets = ['RPAR', 'RSQB', 'RBRACE']
+
+# strings, comments and the start of a comment not closed
+comments_and_strings = re.compile(r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|//[^\n]*|/\*.*?\*/|/\*', re.S)
+
+
+def open_comment(text):
+    """
+    :return: the position of the multi-line comment not closed in the text, None if all the comments are closed
+    """
+    for match in comments_and_strings.finditer(text):
+        if match.group() == '/*':
+            return match.start()
+    return None
+
+
+def lex_text(interactive, text, line_number, column, last_token):
+    """
+    Makes the lexer of an interactive parser read a new text, which continues the input parsed so far
+    :param interactive: Lark's InteractiveParser
+    :param text: the text to be lexed
+    :param line_number: line of the statement where the text starts
+    :param column: column of the line where the text starts
+    :param last_token: last token fed to the parser, None at the start of a statement
+    :return: None, it raises RuntimeError if the internals of the installed Lark are not the expected ones
+    """
+    try:
+        line_counter = LineCounter('\n')
+        for field in ['char_pos', 'line', 'column', 'line_start_pos']:
+            getattr(line_counter, field)  # the fields set below must exist, setting them would not fail
+        line_counter.line = line_number
+        line_counter.line_start_pos = 1 - column  # so that the first character is in the given column
+        line_counter.column = column
+        interactive.lexer_thread.state = LexerState(text, line_counter, last_token)
+    except (TypeError, AttributeError) as e:
+        raise RuntimeError('the console lexes the lines with the internals of Lark %s, not compatible with the '
+                           'installed Lark %s' % (tested_lark_version, lark.__version__)) from e
+
+
+class Console:
+    """
+    This class parses the lines typed in the console, returning the parse tree of each complete statement
+    """
+    def __init__(self, parser):
+        """
+        :param parser: Lark parser of the grammar (LALR)
+        """
+        self.parser = parser
+        self.reset()
+
+    def reset(self):
+        """
+        Discards the lines of the incomplete statement
+        """
+        self.interactive = self.parser.parse_interactive('')
+        self.depth = 0  # number of open brackets
+        self.lines = 0  # number of lines read for the statement
+        self.tokens = 0  # number of tokens fed to the parser
+        self.last_token = None
+        self.text = ''  # last text lexed, for the context of the errors
+        self.comment = None  # (text, line, column) of an open multi-line comment
+        self.incomplete = False  # True if the parser does not accept the end of input yet (es. after an if condition)
+        self.top_level_if = False  # True if an if statement was read outside the brackets, so an else could follow
+        self.held = False  # True if the statement is complete but could go on with an else in the next line
+
+    @property
+    def pending(self):
+        """
+        :return: True if the lines read so far are an incomplete statement, or a statement held by the last line
+        """
+        return self.depth > 0 or self.comment is not None or self.incomplete or self.held
+
+    def feed(self, line):
+        """
+        Parses a line of the console
+        :param line: the line, without the final newline
+        :return: generator of the parse trees of the statements ended by the line, which generates nothing if the next
+        lines are needed (or if there are no statements, es. a comment). A statement held by the previous line is
+        generated before the line is parsed, so it is executed also when the line has an error. It raises the lexical
+        and syntax errors like the parse function of Runtime.py
+        """
+        if self.held:
+            self.held = False
+            if not self.starts_with_else(line):
+                yield self.end_statement()
+        self.lines += 1
+        if self.comment is not None:
+            text, line_number, column = self.comment
+            text += '\n' + line
+        else:
+            text, line_number, column = line, self.lines, 1
+        self.comment = None
+        start = open_comment(text)
+        if start is not None:  # the text of the comment is lexed when the comment is closed
+            newline = text.rfind('\n', 0, start)
+            self.comment = (text[start:], line_number + text.count('\n', 0, start),
+                            column + start if newline < 0 else start - newline)
+            text = text[:start]
+        self.lex(text + '\n', line_number, column)
+        if self.depth > 0 or self.comment is not None:
+            return
+        if not self.tokens:  # only spaces and comments
+            self.reset()
+            return
+        # the terminals of the parse table for the parser state, not accepts(): it feeds every terminal to a copy of the
+        # parser, and copying the parser copies all the parse trees of the statement (es. of a long function)
+        choices = self.interactive.choices()
+        self.incomplete = '$END' not in choices
+        if self.incomplete:
+            return
+        if self.top_level_if and 'ELSE' in choices and self.accepts_else():
+            self.held = True
+            return
+        yield self.end_statement()
+
+    def accepts_else(self):
+        """
+        :return: True if the statement can go on with an else (the parse table lists it also after the end of the other
+        blocks, es. of a function body, since LALR merges the states of all the blocks)
+        """
+        try:
+            self.interactive.copy().feed_token(Token('ELSE', 'else'))
+        except UnexpectedInput:
+            return False
+        return True
+
+    def starts_with_else(self, line):
+        """
+        :return: True if the first token of the line is else, which goes on with the if statement held by the last line
+        """
+        probe = self.interactive.copy()  # the line is lexed again by feed, after the decision
+        lex_text(probe, line + '\n', self.lines + 1, 1, self.last_token)
+        try:
+            for token in probe.iter_parse():
+                return token.type == 'ELSE'
+        except UnexpectedInput:
+            pass  # the error is raised when the line is parsed
+        return False
+
+    def end_statement(self):
+        """
+        :return: the parse tree of the complete statement, after which the console starts a new one
+        """
+        try:
+            tree = self.interactive.feed_eof(self.last_token)
+        except UnexpectedInput as u:
+            self.syntax_error(u)
+        self.reset()
+        return tree
+
+    def lex(self, text, line_number, column):
+        """
+        Feeds the tokens of a text to the parser
+        :param line_number: line of the statement where the text starts
+        :param column: column of the line where the text starts
+        """
+        self.text = text
+        lex_text(self.interactive, text, line_number, column, self.last_token)
+        try:
+            for token in self.interactive.iter_parse():
+                self.tokens += 1
+                self.last_token = token
+                if token.type == 'IF' and self.depth == 0:
+                    self.top_level_if = True
+                if token.type in opening_brackets or token == '${':
+                    self.depth += 1
+                elif token.type in closing_brackets:
+                    self.depth -= 1
+        except UnexpectedInput as u:
+            self.syntax_error(u)
+
+    def syntax_error(self, u):
+        """
+        Raises the error of the console, after discarding the incomplete statement
+        :param u: UnexpectedInput raised by the parser
+        """
+        if getattr(u, "interactive_parser", False) is None:  # set by Lark only when parsing a whole text
+            u.interactive_parser = self.interactive
+        text = self.text
+        self.reset()
+        exc_class = get_classifier(self.parser).classify(u)
+        if not exc_class:
+            raise u
+        raise exc_class(u.get_context(text), u.line, u.column)
+
+    def end(self):
+        """
+        Ends the input of the console
+        :return: the parse tree of the statement held by the last line, None if there is not; it raises the error of the
+        incomplete statement if there is one
+        """
+        if not self.pending:
+            return None
+        if self.comment is not None:
+            text, line_number, column = self.comment
+            self.comment = None
+            self.lex(text, line_number, column)  # it raises the error of the comment
+        return self.end_statement()
@@ -0,0 +1,222 @@
+# Classification of the syntax errors: a malformed script is reported with the error class of the examples below that
+# fail in the same way (same parser state and same unexpected token).
+# Lark's UnexpectedInput.match_examples parses again every example at each syntax error. Here the examples are parsed
+# only once per parser, and their errors are indexed by parser state, so classifying an error is a dictionary lookup
+# followed by the (short) scan of the examples that failed in that state. The result is the same of
+# match_examples(parser.parse, error_examples, use_accepts=True):
+# - two errors are in the same state when their parser stacks have the same depth and the same top state (a state of
+#   the parser built with debug=True is the set of its LR items, named here by the digest of the items, which is the
+#   same in every process);
+# - with use_accepts, an example that failed on an unexpected token with a different set of acceptable tokens does not
+#   match an error on an unexpected token;
+# - the first example failing on the same token (same type and same value) wins, otherwise the first example failing
+#   in the same state.
+# The map is built when the parser is created (Runtime.get_parser), and saved as JSON next to the parser in the on-disk
+# cache (ParserCache.py), so the processes that load the parser from the cache do not parse the examples again.
+import hashlib
+import json
+import weakref
+
+from lark import UnexpectedInput
+from lark.exceptions import UnexpectedEOF, UnexpectedToken
+
+from error_handling import *
+
+# error class -> malformed scripts that raise it
+error_examples = {
+    MissingClosingParenthesisAfterCondition: ['if (a == b',
+                                              'if (a == b { return foo }',
+                                              'if (a > b',
+                                              'if (a > b { return foo }',
+                                              'if (a < b',
+                                              'if (a < b { return foo }',
+                                              'if (a',
+                                              'if (a { return foo }',
+                                              'if (true',
+                                              'if (true { return foo }',
+                                              'if (false',
+                                              'if (false { return foo }',
+                                              'if (a == b && c != d',
+                                              'if (a == b && c != d { return foo }',
+                                              'while (a == b',
+                                              'while (a > b',
+                                              'while (a < b',
+                                              'while (a',
+                                              'while (true',
+                                              'while (false',
+                                              'while (a == b && c != d'
+                                              ],
+    MissingClosingParenthesisAfterElementList: ['[fo',
+                                                '[foo, fo',
+                                                '[fooo, foo, fo',
+                                                '[fooo, foo, fo,',
+                                                '[foo, fo,',
+                                                '[fo,'
+                                                ],
+    MissingClosingParenthesisAfterFunctionBody: ['function foo() {',
+                                                 'function foo() { return 1',
+                                                 'function foo() { return 1 + 2',
+                                                 'function foo(a,b) { return a+ b'],
+    MissingEqualInConstDeclaration: ['const foo 1',
+                                     'const foo',
+                                     'const foo;'],
+    UnexpectedEndOfInput: ['const foo =',
+                           'foo(',
+                           'function foo(',
+                           'function foo(fo',
+                           'function foo(fo,',
+                           'function foo(foo, fo',
+                           'function foo(foo, fo,',
+                           'function foo(fooo, foo, fo',
+                           'function foo(fooo, foo, fo,',
+                           'let a = [fo',
+                           'let a = [foo, fo',
+                           'let a = [fooo, foo, fo',
+                           'let a = [fo,',
+                           'let a = [foo, fo,',
+                           'let a = [fooo, foo, fo,',
+                           'const a = [fo',
+                           'const a = [foo, fo',
+                           'const a = [fooo, foo, fo',
+                           'const a = [fo,',
+                           'const a = [foo, fo,',
+                           'const a = [fooo, foo, fo,',
+                           'var a = [fo',
+                           'var a = [foo, fo',
+                           'var a = [fooo, foo, fo',
+                           'var a = [fo,',
+                           'var a = [foo, fo,',
+                           'var a = [fooo, foo, fo,'
+                           ]
+}
+
+# digest of the examples, saved with the map so that a map built from other examples is never loaded
+examples_digest = hashlib.sha256(repr([(error_class.__name__, scripts) for error_class, scripts
+                                       in error_examples.items()]).encode('utf8')).hexdigest()
+
+classifiers = weakref.WeakKeyDictionary()  # parser -> its ErrorClassifier
+state_names = {}  # set of LR items -> its digest, computed once per state
+
+
+def get_classifier(parser):
+    """
+    :return: the ErrorClassifier of the parser, built at the first call if it has not been registered when the parser
+    was created
+    """
+    classifier = classifiers.get(parser)
+    if classifier is None:
+        classifier = classifiers[parser] = ErrorClassifier.of(parser)
+    return classifier
+
+
+def register_classifier(parser, classifier):
+    """
+    :param classifier: ErrorClassifier built from the parser (es. loaded from the cache) returned by get_classifier
+    """
+    classifiers[parser] = classifier
+
+
+class ErrorClassifier:
+    """
+    This class maps the errors raised by a parser to the error classes of the examples
+    """
+    def __init__(self, states):
+        """
+        :param states: state -> [(error class, accepts, token)] of the examples failing in the state, in the order of
+        the examples
+        """
+        self.states = states
+
+    @classmethod
+    def of(cls, parser, examples=error_examples):
+        """
+        :param parser: Lark parser raising the errors
+        :param examples: error class -> malformed scripts, the order of the classes and of the scripts is the priority
+        :return: the ErrorClassifier of the errors of the examples
+        """
+        states = {}
+        for error_class, scripts in examples.items():
+            for script in scripts:
+                try:
+                    parser.parse(script)
+                except UnexpectedInput as error:
+                    states.setdefault(cls.state(error), []).append((error_class,) + cls.failure(error))
+        return cls(states)
+
+    def dumps(self):
+        """
+        :return: the map in JSON (the error classes by name), built from the examples of error_examples
+        """
+        states = [[state, [[error_class.__name__, sorted(accepts) if accepts is not None else None, token]
+                           for error_class, accepts, token in examples]]
+                  for state, examples in self.states.items()]
+        return json.dumps({'examples': examples_digest, 'states': states})
+
+    @classmethod
+    def loads(cls, data):
+        """
+        :param data: map returned by dumps
+        :return: the ErrorClassifier, ValueError if the map has been built from other examples
+        """
+        data = json.loads(data)
+        if data.get('examples') != examples_digest:
+            raise ValueError('the map has been built from other examples')
+        error_classes = {error_class.__name__: error_class for error_class in error_examples}
+        states = {}
+        for state, examples in data['states']:
+            states[tuple(state) if state is not None else None] = [
+                (error_classes[name], frozenset(accepts) if accepts is not None else None,
+                 tuple(token) if token is not None else None) for name, accepts, token in examples]
+        return cls(states)
+
+    @staticmethod
+    def state(error):
+        """
+        :return: the (depth of the stack, top state) of the parser when the error was raised, None if unknown (the
+        errors with unknown state are all in the same state, like in match_examples)
+        """
+        state_stack = getattr(error.state, 'state_stack', None)
+        if state_stack is None:
+            return None
+        state = state_stack[-1]
+        if not isinstance(state, int):  # set of LR items
+            name = state_names.get(state)
+            if name is None:
+                name = state_names[state] = hashlib.sha1('\n'.join(sorted(map(str, state))).encode('utf8')).hexdigest()
+            state = name
+        return len(state_stack), state
+
+    @staticmethod
+    def failure(error):
+        """
+        :return: the acceptable tokens (None if the error is not on an unexpected token) and the (type, value) of the
+        unexpected token (None if the error is not on a token)
+        """
+        accepts = frozenset(error.accepts) if isinstance(error, UnexpectedToken) else None
+        return accepts, ErrorClassifier.token(error)
+
+    @staticmethod
+    def token(error):
+        return (error.token.type, str(error.token)) if isinstance(error, (UnexpectedToken, UnexpectedEOF)) else None
+
+    def classify(self, error):
+        """
+        :param error: UnexpectedInput raised by the parser
+        :return: the error class of the example failing like the error, None if no example matches
+        """
+        examples = self.states.get(self.state(error))
+        if not examples:
+            return None
+        # the acceptable tokens are computed by Lark (and cached in the error) only if they are compared, because
+        # computing them copies the parser state
+        check_accepts = isinstance(error, UnexpectedToken)
+        token = self.token(error)
+        candidate = None
+        for error_class, example_accepts, example_token in examples:
+            if check_accepts and example_accepts is not None and error.accepts != example_accepts:
+                continue
+            if token is not None and token == example_token:
+                return error_class
+            if candidate is None:
+                candidate = error_class
+        return candidate
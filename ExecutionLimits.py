@@ -0,0 +1,129 @@
+# Resource limits of the executions, for the scripts that cannot be trusted to terminate:
+# - max_steps: maximum number of steps of an execution. A step is an evaluation of the condition of a while loop or a
+#   call of a function, so every program that does not terminate (es. while (true) {}) exceeds the limit, while the
+#   work done between two steps is bounded by the size of the program;
+# - timeout: maximum wall-clock time of an execution, in seconds. The clock is read only every check_interval steps, so
+#   checking the deadline costs less than counting the steps;
+# - max_value_size: maximum length of each array or string (elements or characters). It is checked when an array or a
+#   string is built (array literals, concatenations, template literals) and before an assignment to a cell of an array,
+#   which would pad the array up to the index. It caps every value on its own, not the total size of the values alive
+#   at the same time: a program can still build many values under the cap, as many as its steps allow.
+# An execution that exceeds a limit is stopped by a subclass of ExecutionLimitExceeded (error_handling.py).
+# The checks are added only when a limit is given: the closure compiler (Compiler.py) counts the steps in wrappers of the
+# loop conditions and of the function bodies, the bytecode compiler (VirtualMachine.py) emits a CHECK_LIMITS
+# instruction before the loop conditions and at the start of the function bodies, and the methods of the transformer
+# that build arrays and strings are replaced by ones that check the size of the result.
+import time
+
+from JSArray import JSArray
+from Rope import Rope
+from error_handling import SizeLimitExceeded, StepLimitExceeded, TimeLimitExceeded
+
+check_interval = 1024  # number of steps between two readings of the clock
+
+
+class ExecutionLimits:
+    """
+    This class counts the steps of an execution and checks the limits. The counters are reset at the start of every
+    execution, thus the limits must not be shared by runtimes that execute programs at the same time.
+    """
+    def __init__(self, max_steps=None, timeout=None, max_value_size=None):
+        """
+        :param max_steps: maximum number of steps of an execution, None for no limit
+        :param timeout: maximum time of an execution in seconds, None for no limit
+        :param max_value_size: maximum length of each array or string, None for no limit
+        """
+        self.max_steps = max_steps
+        self.timeout = timeout
+        self.max_value_size = max_value_size
+        self.steps = 0
+        self.checkpoint = 0  # number of steps of the next check of the limits
+        self.deadline = None
+        self.suspended_at = None  # time at which the execution has been suspended
+
+    @property
+    def counts_steps(self):
+        """
+        :return: True if the engines have to count the steps
+        """
+        return self.max_steps is not None or self.timeout is not None
+
+    def start(self):
+        """
+        Starts a new execution
+        """
+        self.steps = 0
+        self.deadline = time.monotonic() + self.timeout if self.timeout is not None else None
+        self.checkpoint = 0
+        self.check()
+
+    def suspend(self):
+        """
+        Stops the clock while the execution is suspended (es. waiting for the input of an asynchronous host)
+        """
+        self.suspended_at = time.monotonic()
+
+    def resume(self):
+        """
+        Restarts the clock: the time spent suspended is not counted in the timeout
+        """
+        if self.deadline is not None:
+            self.deadline += time.monotonic() - self.suspended_at
+        self.suspended_at = None
+
+    def step(self):
+        self.steps += 1
+        if self.steps >= self.checkpoint:  # a single comparison per step
+            self.check()
+
+    def check(self):
+        """
+        Checks the number of steps and the deadline, and sets the next checkpoint
+        """
+        if self.max_steps is not None and self.steps > self.max_steps:
+            raise StepLimitExceeded(self.max_steps)
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise TimeLimitExceeded(self.timeout)
+        self.checkpoint = self.steps + check_interval
+        if self.max_steps is not None and self.checkpoint > self.max_steps + 1:
+            self.checkpoint = self.max_steps + 1
+
+    def counted(self, closure):
+        """
+        :param closure: compiled closure (with the frame as argument) of a loop condition or of a function body
+        :return: the closure that counts a step and executes the given one
+        """
+        step = self.step
+
+        def run(frame):
+            step()
+            return closure(frame)
+        return run
+
+    def size(self, value):
+        """
+        :return: the value, after checking its length if it is an array or a string
+        """
+        if (type(value) is str or type(value) is JSArray or type(value) is Rope) and \
+                len(value) > self.max_value_size:
+            raise SizeLimitExceeded(self.max_value_size)
+        return value
+
+    def install(self, transformer):
+        """
+        Replaces the methods of the transformer that build arrays and strings with ones that check the size limit
+        :param transformer: TreeToJS of a runtime, used by all the engines to compute the operations
+        """
+        if self.max_value_size is None:
+            return
+        size, max_value_size = self.size, self.max_value_size
+        for name in ['add', 'template_literal', 'array']:
+            method = getattr(transformer, name)
+            setattr(transformer, name, lambda args, method=method: size(method(args)))
+        set_element = transformer.set_element
+
+        def checked_set_element(arr, index, value):
+            if (type(index) is int or type(index) is float) and index >= max_value_size:
+                raise SizeLimitExceeded(max_value_size)  # before the array is padded up to the index
+            return set_element(arr, index, value)
+        transformer.set_element = checked_set_element
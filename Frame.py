@@ -0,0 +1,195 @@
+# Runtime storage of the variables resolved by the resolver (Resolver.py). Each execution of the program or of a
+# function has a frame: a list of slots holding the local variables of the function and of its blocks, and a link to
+# the frame in which the function has been declared (lexical scope). A variable is referenced by the tuple
+# (depth, slot, identifier): depth is the number of frames to go up, -1 for the global variables, which are stored by
+# name in the global symbol table.
+# The methods of FrameVariables implement the declarations, assignments and reads of the variables with the same
+# semantics (and error messages) of the transformer, which is used directly for the global variables.
+from lark import Token
+
+from error_handling import *
+from js_values import undefined, NaN
+
+UNSET = object()  # value of a slot whose variable has not been declared yet in the current execution of its scope
+
+max_call_depth = 10000  # default maximum number of nested JavaScript calls, beyond it a RangeError is raised
+
+compound_operators = {'+=': 'add', '-=': 'sub', '*=': 'mul', '/=': 'div'}  # method of the transformer of each operator
+
+
+class Frame:
+    """
+    Activation record of the program or of a function call
+    """
+    __slots__ = ('values', 'declarations', 'parent', 'code', 'stack', 'pc', 'depth')
+
+    def __init__(self, nlocals, parent, code=None, depth=0):
+        self.values = [UNSET] * nlocals
+        self.declarations = [None] * nlocals  # let, var, const or function
+        self.parent = parent  # frame in which the function has been declared (lexical scope)
+        self.code = code  # code object executed in the frame by the virtual machine
+        self.stack = [] if code is not None else None
+        self.pc = 0
+        self.depth = depth  # number of calls on the call stack (0 for the program)
+
+
+class FrameVariables:
+    """
+    This class reads and writes the variables resolved at compile time. When the slot of a local variable has not been
+    set yet, the variable with the same name in the global symbol table is used, like the transformer that searches the
+    identifier in the enclosing scopes.
+    """
+    def __init__(self, transformer):
+        self.transformer = transformer
+        self.globals = transformer.symbol_table
+
+    @staticmethod
+    def owner(frame, depth):
+        """
+        :return: the frame that stores a local variable, depth frames up in the lexical scopes
+        """
+        for _ in range(depth):
+            frame = frame.parent
+        return frame
+
+    def load(self, frame, variable):
+        depth, slot, identifier = variable
+        if depth >= 0:
+            value = self.owner(frame, depth).values[slot]
+            if type(value) is dict:
+                return f"function {identifier}"
+            elif value is not UNSET:
+                return value
+        # an identifier can be associated with a function or with a value
+        try:
+            attributes = self.globals.find(identifier)
+        except ReferenceError:
+            self.transformer.output.write('ReferenceError: ' + identifier + ' is not defined\n')
+            return None
+        if attributes['declaration'] == 'function':
+            return f"function {identifier}"
+        return attributes['value']
+
+    def declare(self, frame, variable, keyword, with_value, value):
+        """
+        Variable declaration, with or without value (es. let a, let a = 2)
+        :return: the value of the statement
+        """
+        depth, slot, identifier = variable
+        if identifier in reserved_words or depth < 0:
+            identifier = Token('IDENTIFIER', identifier)  # the transformer takes the tokens of the parse tree
+            args = [keyword, identifier, '=', value] if with_value else [keyword, identifier]
+            return self.transformer.variable_statement(args)
+        owner = self.owner(frame, depth)
+        if not with_value:
+            if owner.values[slot] is not UNSET and owner.declarations[slot] == 'let':
+                self.transformer.output.write('SyntaxError: Identifier ' + identifier + ' has already been declared\n')
+                return None
+            owner.values[slot], owner.declarations[slot] = undefined, keyword.value
+            return undefined
+        if owner.values[slot] is UNSET:
+            if self.globals.exist(identifier) and self.globals.find(identifier)['declaration'] == 'var':
+                # var declaration has not a scope and can be redeclared
+                return self.transformer.variable_statement([keyword, Token('IDENTIFIER', identifier), '=', value])
+            owner.values[slot], owner.declarations[slot] = value, keyword.value
+        elif owner.declarations[slot] == 'var':
+            owner.values[slot], owner.declarations[slot] = value, keyword.value
+        elif owner.declarations[slot] in ['let', 'const']:
+            self.transformer.output.write('SyntaxError: Identifier ' + identifier + ' has already been declared\n')
+            return None
+        return undefined
+
+    def assign(self, frame, variable, value):
+        """
+        Assignment to a variable (es. a = 2), the variable is declared if it does not exist
+        :return: the assigned value
+        """
+        depth, slot, identifier = variable
+        if identifier not in reserved_words and depth >= 0:
+            owner = self.owner(frame, depth)
+            if owner.values[slot] is not UNSET:
+                if owner.declarations[slot] == 'const':
+                    self.transformer.output.write('TypeError: Assignment to constant variable\n')
+                    return None
+                owner.values[slot] = value
+                return value
+            if not self.globals.exist(identifier):  # the variable has not been declared yet
+                owner.values[slot], owner.declarations[slot] = value, 'var'
+                return value
+        return self.transformer.variable_statement([Token('IDENTIFIER', identifier), '=', value])
+
+    def store_element(self, frame, variable, index, value):
+        """
+        Assignment to a cell of an array (es. a[0] = 2)
+        """
+        depth, slot, identifier = variable
+        if identifier not in reserved_words and depth >= 0:
+            owner = self.owner(frame, depth)
+            if owner.values[slot] is not UNSET:
+                owner.values[slot] = self.transformer.set_element(owner.values[slot], index, value)
+                return None
+        return self.transformer.variable_statement([Token('IDENTIFIER', identifier), '[', index, ']', '=', value])
+
+    def update(self, frame, variable, operator, prefix, operand):
+        """
+        Variable assignment with an operator (es. a += 2, a++, --a)
+        :param operator: +=, -=, *=, /=, ++ or --
+        :param prefix: True for pre-increment and pre-decrement
+        :param operand: right operand of +=, -=, *= and /=, None otherwise
+        :return: the value of the expression
+        """
+        depth, slot, identifier = variable
+        owner = self.owner(frame, depth) if depth >= 0 else None
+        if owner is None or owner.values[slot] is UNSET:
+            if prefix:
+                return self.transformer.variable_assignment([operator, identifier])
+            elif operand is None:
+                return self.transformer.variable_assignment([identifier, operator])
+            return self.transformer.variable_assignment([identifier, operator, operand])
+        value = owner.values[slot]
+        if operand is not None:  # +=, -=, *=, /=
+            value = getattr(self.transformer, compound_operators[operator])([value, operand])
+            owner.values[slot] = value
+            return value
+        if type(value) not in [int, float]:
+            owner.values[slot] = NaN
+            return NaN
+        new_value = value + 1 if operator == '++' else value - 1
+        owner.values[slot] = new_value
+        return new_value if prefix else value
+
+    def function(self, frame, variable):
+        """
+        :return: the function associated with the identifier, None (after printing the error) if there is not
+        """
+        depth, slot, identifier = variable
+        function = self.owner(frame, depth).values[slot] if depth >= 0 else UNSET
+        if function is UNSET:
+            try:
+                function = self.globals.find(identifier)  # search for the function in the symbol table
+            except ReferenceError:
+                self.transformer.output.write('ReferenceError: ' + identifier + ' is not defined\n')
+                return None
+        if type(function) is not dict or function['declaration'] != 'function':
+            self.transformer.output.write('TypeError: ' + identifier + ' is not a function\n')
+            return None
+        return function
+
+    def declare_function(self, frame, variable, attributes):
+        """
+        Function declaration
+        :param attributes: attributes of the function, without the scope in which it is declared
+        :return: the value of the statement
+        """
+        depth, slot, identifier = variable
+        if identifier in reserved_words:
+            self.transformer.output.write('SyntaxError: Unexpected token ' + identifier + '\n')
+            return None
+        # the function is stored together with the frame in which it is declared (lexical scope)
+        function = dict(attributes, scope=frame)
+        if depth < 0:
+            self.globals.insert(identifier, function)
+        else:
+            owner = self.owner(frame, depth)
+            owner.values[slot], owner.declarations[slot] = function, 'function'
+        return undefined
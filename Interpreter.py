@@ -2,89 +2,106 @@
 # The interpreter walks the tree starting at the root, it visits the tree from the root to the leaves (top-down).
 # For each node it calls its methods (inherited) according to tree.data. Differently from transformer, the interpreter
 # does not automatically visit the sub-branches, unless it is explicitly told to do so.
-from copy import deepcopy
 
 # Interpreter allows to implement branching, loops and functions
+from lark import Tree
 from lark.visitors import Interpreter
 from Transformer import TreeToJS
-from SymbolTable import symbol_table, SymbolTable
+from SymbolTable import SymbolTable
 from error_handling import *
+from js_values import undefined, truthy
 
 # the transformer is used to visit the tree from the leaves to the root (bottom-up)
-js_transformer = TreeToJS(symbol_table=symbol_table)
+# It is the global state of the tree-walking interpreter (kept as the reference of the benchmarks), the execution
+# engines take the transformer of their runtime (Runtime.py)
+js_transformer = TreeToJS(symbol_table=SymbolTable())
 
-js_falsy_values = ['undefined', 'null', 'NaN', False, 0, "", "0"]
+# nodes whose operands are computed only when they are needed (short-circuit evaluation), thus visited by the interpreter
+# instead of being computed bottom-up by js_transformer
+lazy_nodes = {'logical_and', 'logical_or', 'ternary_condition_statement'}
 
 class JavaScriptInterpreter(Interpreter):
 
+    def __init__(self, limits=None):
+        """
+        :param limits: ExecutionLimits counting the iterations of the loops and the function calls (the size limit is
+        installed on js_transformer by the caller), the caller starts the execution with limits.start()
+        """
+        super().__init__()
+        self.limits = limits if limits is not None and limits.counts_steps else None
+
     def start(self, tree):
         return self.visit_children(tree)
 
+    def evaluate(self, tree):
+        """
+        Computes a node with js_transformer, after replacing the &&, || and ternary conditions in it with their values
+        :param tree: node of the parse tree
+        :return: the value of the node
+        """
+        if tree.data in lazy_nodes:
+            return self.visit(tree)
+        return js_transformer.transform(self.lazy_operands(tree))
+
+    def lazy_operands(self, tree):
+        """
+        :param tree: node of the parse tree
+        :return: a copy of the node in which the &&, || and ternary conditions are replaced by their values, or the node
+        itself when it does not contain any
+        """
+        children = [(self.visit(child) if child.data in lazy_nodes else self.lazy_operands(child))
+                    if isinstance(child, Tree) else child for child in tree.children]
+        if all(child is original for child, original in zip(children, tree.children)):
+            return tree
+        return Tree(tree.data, children)
+
     def if_statement(self, tree):
 
-        condition = js_transformer.transform(tree.children[0])
-
-        new_symbol_table = SymbolTable(parent=deepcopy(js_transformer.symbol_table))  # create a new symbol table for the if statement
-        js_transformer.symbol_table = new_symbol_table  # update the symbol table of the transformer
-
-        if condition not in js_falsy_values:  # JavaScript falsy values
-            true_branch = self.visit(tree.children[1])  # visit the true branch
-            if not true_branch:
-                js_transformer.symbol_table = deepcopy(
-                    js_transformer.symbol_table.parent)  # update the symbol table of the transformer
-                return 'undefined'
-            elif type(true_branch) == list:
-                js_transformer.symbol_table = deepcopy(
-                    js_transformer.symbol_table.parent)  # update the symbol table of the transformer
-                return true_branch[-1]
-            else:
-                js_transformer.symbol_table = deepcopy(
-                    js_transformer.symbol_table.parent)  # update the symbol table of the transformer
-                return true_branch
-        elif len(tree.children) == 3:  # if there is else branch
-            false_branch = self.visit(tree.children[2])  # visit the false branch
-            if not false_branch:
-                js_transformer.symbol_table = deepcopy(
-                    js_transformer.symbol_table.parent)  # update the symbol table of the transformer
-                return 'undefined'
-            elif type(false_branch) == list:
-                js_transformer.symbol_table = deepcopy(
-                    js_transformer.symbol_table.parent)  # update the symbol table of the transformer
-                return false_branch[-1]
-            else:
-                js_transformer.symbol_table = deepcopy(
-                    js_transformer.symbol_table.parent)  # update the symbol table of the transformer
-                return false_branch
+        condition = self.evaluate(tree.children[0])
 
+        js_transformer.symbol_table = js_transformer.symbol_table.push()  # create a new scope for the if statement
+        try:
+            if truthy(condition):  # JavaScript truthy values
+                branch = self.visit(tree.children[1])  # visit the true branch
+            elif len(tree.children) == 3:  # if there is else branch
+                branch = self.visit(tree.children[2])  # visit the false branch
+            else:
+                return None
+        finally:
+            js_transformer.symbol_table = js_transformer.symbol_table.pop()  # go back to the enclosing scope
+        if not branch:
+            return undefined
+        elif type(branch) == list:
+            return branch[-1]
+        else:
+            return branch
 
     def while_statement(self, tree):
         """
         while statement has its own block scope, thus we have to create a new symbol table to manage this scope
         """
-        condition = js_transformer.transform(tree.children[0])  # evaluate the condition
-
-        new_symbol_table = SymbolTable(parent=deepcopy(js_transformer.symbol_table))  # create a new symbol table for the while statement
-
-        js_transformer.symbol_table = new_symbol_table  # update the symbol table of the transformer
-
-        while condition not in js_falsy_values:
-            js_transformer.symbol_table.table = {}  # clear the scope for the next iteration
-            if tree.children[1].data == 'block':
-                for i in range(len(tree.children[1].children)):
-                    if tree.children[1].children[i].data == 'return_statement':
-                        out = self.visit(tree.children[1].children[i])
-                        js_transformer.symbol_table = deepcopy(js_transformer.symbol_table.parent)
-                        return out
-                    else:
-                        out = self.visit(tree.children[1].children[i])
-            elif tree.children[1].data == 'return_statement':
-                out = self.visit(tree.children[1])
-                js_transformer.symbol_table = deepcopy(js_transformer.symbol_table.parent)
-                return out
-            else:
-                out = self.visit(tree.children[1])
-            condition = js_transformer.transform(tree.children[0])  # evaluate the condition
-        js_transformer.symbol_table = deepcopy(js_transformer.symbol_table.parent)  # update the symbol table of the transformer
+        condition = self.evaluate(tree.children[0])  # evaluate the condition
+
+        out = None  # value of the last statement, the body could be never executed
+        js_transformer.symbol_table = js_transformer.symbol_table.push()  # create a new scope for the while statement
+        try:
+            while truthy(condition):
+                if self.limits is not None:
+                    self.limits.step()
+                js_transformer.symbol_table.table = {}  # clear the scope for the next iteration
+                if tree.children[1].data == 'block':
+                    for i in range(len(tree.children[1].children)):
+                        if tree.children[1].children[i].data == 'return_statement':
+                            return self.visit(tree.children[1].children[i])
+                        else:
+                            out = self.visit(tree.children[1].children[i])
+                elif tree.children[1].data == 'return_statement':
+                    return self.visit(tree.children[1])
+                else:
+                    out = self.visit(tree.children[1])
+                condition = self.evaluate(tree.children[0])  # evaluate the condition
+        finally:
+            js_transformer.symbol_table = js_transformer.symbol_table.pop()  # go back to the enclosing scope
 
         if type(out) == list:
             return out[-1]
@@ -92,8 +109,8 @@ class JavaScriptInterpreter(Interpreter):
             return out
 
     def ternary_condition_statement(self, tree):
-        condition = js_transformer.transform(tree.children[0])
-        if condition not in js_falsy_values:
+        condition = self.evaluate(tree.children[0])
+        if truthy(condition):
             true_branch = self.visit(tree.children[1])
             if type(true_branch) == list:
                 raise Exception('SyntaxError: Unexpected token')
@@ -122,11 +139,14 @@ class JavaScriptInterpreter(Interpreter):
                 elif str(type(tree.children[3])) == "<class 'lark.tree.Tree'>":
                     parameter_list = tree.children[3].children
                 function_body = tree.children[5]  # it is a subtree
-            symbol_table.insert(identifier, {'declaration': declaration, 'parameter_list': parameter_list,
-                                             'body': function_body, 'type': declaration}) # insert the function body a subtree to be evaluated later
-            return 'undefined'
+            # insert the function body a subtree to be evaluated later, together with the scope in which the function
+            # is declared (JavaScript functions are lexically scoped)
+            js_transformer.symbol_table.insert(identifier, {'declaration': declaration, 'parameter_list': parameter_list,
+                                                            'body': function_body, 'type': declaration,
+                                                            'scope': js_transformer.symbol_table})
+            return undefined
         except ReservedWordAsIdentifier:
-            print('SyntaxError: Unexpected token ' + identifier)
+            js_transformer.output.write('SyntaxError: Unexpected token ' + identifier + '\n')
 
     def function_call(self, tree):
         try:
@@ -140,14 +160,16 @@ class JavaScriptInterpreter(Interpreter):
             else:  # if there is only one argument convert to list to adapt to the interface used for other cases
                 argument_list = [js_transformer.transform(tree.children[2])]
             # search for the function in the symbol table
-            function = symbol_table.find(identifier)
+            function = js_transformer.symbol_table.find(identifier)
             # check if the identifier is associated with function
             if function['declaration'] == 'function':
+                if self.limits is not None:
+                    self.limits.step()
                 # take the parameter list
                 parameter_list = function['parameter_list']
 
-                # create a new symbol table for the function
-                new_symbol_table = SymbolTable(parent=deepcopy(js_transformer.symbol_table))
+                # create a new scope for the function, nested in the scope where the function has been declared
+                new_symbol_table = function['scope'].push()
 
                 # take the function body
                 function_body = function['body']
@@ -157,45 +179,38 @@ class JavaScriptInterpreter(Interpreter):
                     new_symbol_table.insert(parameter_list[i], {'declaration': 'var', 'value': argument_list[i],
                                                                 'type': type(argument_list[i])})
 
-                # update the symbol table of the transformer
+                # update the symbol table of the transformer, the scope of the caller is restored at the end of the call
+                caller_symbol_table = js_transformer.symbol_table
                 js_transformer.symbol_table = new_symbol_table
-
-                if function_body.data == 'block':
-                    for i in range(len(function_body.children)): # in case of a block, execute all the statements in it
-                        if function_body.children[i].data == 'return_statement':
-                            out = js_transformer.transform(function_body.children[i])
-                            # update the symbol table of the transformer
-                            js_transformer.symbol_table = deepcopy(new_symbol_table.parent)
-                            return out
-                        else:
-                            visited_body = self.visit(function_body.children[i])
-                    # update the symbol table of the transformer
-                    js_transformer.symbol_table = deepcopy(new_symbol_table.parent)
-                    return 'undefined'
-                elif function_body.data == 'return_statement':
-                    out = js_transformer.transform(function_body)
-                    # update the symbol table of the transformer
-                    js_transformer.symbol_table = deepcopy(new_symbol_table.parent)
-                    return out
-                else: # the body doesn't contain a return statement, neither a block
-                    visited_body = self.visit(function_body)
-                # update the symbol table of the transformer
-                js_transformer.symbol_table = deepcopy(new_symbol_table.parent)
-                return 'undefined'
+                try:
+                    if function_body.data == 'block':
+                        for i in range(len(function_body.children)): # in case of a block, execute all the statements in it
+                            if function_body.children[i].data == 'return_statement':
+                                return self.return_statement(function_body.children[i])
+                            else:
+                                visited_body = self.visit(function_body.children[i])
+                    elif function_body.data == 'return_statement':
+                        return self.return_statement(function_body)
+                    else: # the body doesn't contain a return statement, neither a block
+                        visited_body = self.visit(function_body)
+                finally:
+                    js_transformer.symbol_table = caller_symbol_table
+                return undefined
             else:
                 raise IsNotAFunction # the identifier is not associated with a function
         except IsNotAFunction:
-            print('TypeError: ' + identifier + ' is not a function')
+            js_transformer.output.write('TypeError: ' + identifier + ' is not a function\n')
         except ReferenceError:
-            print('ReferenceError: ' + identifier + ' is not defined')
+            js_transformer.output.write('ReferenceError: ' + identifier + ' is not defined\n')
 
-    @staticmethod
-    def return_statement(tree):
-        return js_transformer.transform(tree)
+    def return_statement(self, tree):
+        for child in tree.children:
+            if isinstance(child, Tree) and child.data == 'function_call':
+                return self.visit(child)  # return f(...)
+        return self.evaluate(tree)
 
-    @staticmethod
-    def print_statement(tree):
-        return js_transformer.transform(tree)
+    def print_statement(self, tree):
+        return self.evaluate(tree)
 
     @staticmethod
     def input_statement(tree):
@@ -206,19 +221,22 @@ class JavaScriptInterpreter(Interpreter):
             if str(type(tree.children[i])) == "<class 'lark.tree.Tree'>":
                 if tree.children[i].data == 'function_call':
                     tree.children[i] = self.visit(tree.children[i])  # this is required to assign the value of a function call to a variable
-        return js_transformer.transform(tree)
-
-    @staticmethod
-    def variable_assignment(tree):
-        return js_transformer.transform(tree)
-
-    @staticmethod
-    def logical_and(tree):
-        return js_transformer.transform(tree)
-
-    @staticmethod
-    def logical_or(tree):
-        return js_transformer.transform(tree)
+        return self.evaluate(tree)
+
+    def variable_assignment(self, tree):
+        return self.evaluate(tree)
+
+    def logical_and(self, tree):
+        left = self.evaluate(tree.children[0])
+        if not truthy(left):  # the right operand is not evaluated (es. the prompt in a && prompt())
+            return left
+        return self.evaluate(tree.children[1])
+
+    def logical_or(self, tree):
+        left = self.evaluate(tree.children[0])
+        if truthy(left):  # the right operand is not evaluated
+            return left
+        return self.evaluate(tree.children[1])
 
     @staticmethod
     def equality(tree):
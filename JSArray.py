@@ -0,0 +1,154 @@
+# Representation of the JavaScript arrays.
+# A Python list stores a pointer to a separate object for each element, so an array of numbers takes several times the
+# memory of its values. When all the elements of an array are integers (or all are floats) they are stored unboxed in a
+# typed array of the standard library (array('q') of 64 bit integers, array('d') of doubles), which takes 8 bytes per
+# element. The integers and the floats are not mixed in the same typed array, because 1 and 1.0 are printed differently.
+# As soon as a value of another type is stored (es. a string, a boolean, undefined or an integer out of 64 bits), the
+# elements are moved to a generic list, which is used from then on. An empty array chooses the typed storage with its
+# first element, so also the arrays filled one cell at a time (es. a[i] = i in a loop) are compact.
+# Indexed reads, writes and length behave like the ones of a list.
+# The copies of an array (copy.deepcopy, es. of the variables of a snapshot) are copy-on-write: the copy shares the
+# storage of the original until one of them is written, then the written one copies the storage, once. The arrays
+# sharing a storage share the count of its users, so the last user left writes the storage in place, without copying
+# it again.
+from array import array
+from copy import deepcopy
+
+typecodes = {int: 'q', float: 'd'}  # typecode of the typed array storing the values of each type
+
+
+def storage(elements):
+    """
+    :param elements: list of the elements of an array
+    :return: the typed array of the elements if they are all integers or all floats, the list itself otherwise
+    """
+    if elements:
+        typecode = typecodes.get(type(elements[0]))
+        if typecode is not None and all(type(element) is type(elements[0]) for element in elements):
+            try:
+                return array(typecode, elements)
+            except OverflowError:  # integer out of 64 bits
+                pass
+    return elements
+
+
+class JSArray:
+    """
+    JavaScript array, stored in a typed array while its elements are numbers of the same type
+    """
+    __slots__ = ('elements', 'shared')
+    __hash__ = None  # an array is mutable
+
+    def __init__(self, elements=None):
+        self.elements = storage(list(elements) if elements is not None else [])
+        self.shared = None  # [number of arrays using the storage] if it is shared with the copies of the array
+
+    def __deepcopy__(self, memo):
+        """
+        :return: a copy of the array sharing its storage, the arrays nested in a list are copied in the same way
+        """
+        copied = JSArray.__new__(JSArray)
+        copied.shared = None
+        memo[id(self)] = copied  # an array referenced twice is copied once
+        if type(self.elements) is list and any(type(element) is JSArray for element in self.elements):
+            copied.elements = [deepcopy(element, memo) if type(element) is JSArray else element
+                               for element in self.elements]
+        else:
+            copied.elements = self.elements
+            if self.shared is None:
+                self.shared = [1]
+            self.shared[0] += 1
+            copied.shared = self.shared
+        return copied
+
+    def unshare(self):
+        """
+        Leaves the storage shared with other arrays before modifying it, copying it if the other arrays still use it
+        """
+        if self.shared[0] > 1:
+            self.shared[0] -= 1
+            self.elements = self.elements[:]
+        self.shared = None
+
+    def __del__(self):
+        if self.shared is not None:  # the other arrays using the storage can write it
+            self.shared[0] -= 1
+
+    def is_typed(self):
+        return type(self.elements) is array
+
+    def fits(self, value):
+        """
+        :return: True if the value can be stored in the current storage of the array
+        """
+        return type(self.elements) is list or typecodes.get(type(value)) == self.elements.typecode
+
+    def generalize(self, value):
+        """
+        Moves the elements to the storage that can hold the value: an empty array takes the typed storage of the value,
+        a typed array is converted to a list
+        """
+        if len(self.elements) == 0:
+            self.elements = storage([value])[:0]
+        else:
+            self.elements = self.elements.tolist()
+
+    def append(self, value):
+        if self.shared is not None:
+            self.unshare()
+        if not self.fits(value) or len(self.elements) == 0:
+            self.generalize(value)
+        try:
+            self.elements.append(value)
+        except OverflowError:
+            self.elements = self.elements.tolist()
+            self.elements.append(value)
+
+    def extend(self, value, count):
+        """
+        Appends count cells with the same value (es. the undefined cells before an index out of bounds)
+        """
+        if count <= 0:
+            return
+        if self.shared is not None:
+            self.unshare()
+        if not self.fits(value) or len(self.elements) == 0:
+            self.generalize(value)
+        try:
+            self.elements.extend([value] * count)
+        except OverflowError:
+            self.elements = self.elements.tolist()
+            self.elements.extend([value] * count)
+
+    def __setitem__(self, index, value):
+        if self.shared is not None:
+            self.unshare()
+        if not self.fits(value):
+            self.generalize(value)
+        try:
+            self.elements[index] = value
+        except OverflowError:
+            self.elements = self.elements.tolist()
+            self.elements[index] = value
+
+    def __getitem__(self, index):
+        return self.elements[index]
+
+    def __len__(self):
+        return len(self.elements)
+
+    def __iter__(self):
+        return iter(self.elements)
+
+    def __eq__(self, other):
+        if type(other) is not JSArray:
+            return NotImplemented
+        return list(self.elements) == list(other.elements)
+
+    def __add__(self, other):
+        if type(other) is not JSArray:
+            return NotImplemented
+        return JSArray(list(self.elements) + list(other.elements))
+
+    def __repr__(self):
+        return repr(list(self.elements))
@@ -0,0 +1,350 @@
+# Memoization of the pure functions (flag --memoize-pure, compiled engine only).
+# Before the compilation the purity analysis finds the functions declared at the top level of the program that are
+# pure: their result depends only on their arguments and calling them has no effect besides returning it. The body of a
+# pure function:
+# - reads only its parameters and the local variables it has already declared (a variable read before its declaration
+#   would be searched in the global scope);
+# - assigns only its parameters and its local variables, and never a constant (the error would be printed);
+# - calls only pure functions, never in tail position (return f(...)), and never console.log or prompt;
+# - does not declare nested functions.
+# The calls of a pure function are cached in a bounded LRU cache, by the arguments. Only the calls whose arguments and
+# result are primitive values (numbers, strings, booleans, undefined) are cached: an array can be modified after the
+# call, thus it is never shared through the cache.
+# The analysis sees only the program being compiled, so every call checks that the names of the pure functions it
+# depends on are still bound to them (e.g., a later line of the console can redeclare them), and that no global variable
+# has the name of one of their local variables (the declaration of the local variable would assign it); otherwise the
+# call is executed without the cache.
+# A cached result also records how many nested calls its computation took, so a call found in the cache at a depth where
+# computing it would exceed the maximum call depth is executed again, raising the same RangeError as without the cache.
+from collections import Counter, OrderedDict
+
+from lark import Token, Tree
+
+from Resolver import Resolver
+from Rope import Rope
+from error_handling import reserved_words
+from js_values import Undefined
+
+max_entries = 10000  # default maximum number of cached calls of each function
+
+primitive_types = {int, float, str, bool, Undefined}  # types of the values that can be cached
+
+
+def arguments_key(values):
+    """
+    :param values: arguments of a call
+    :return: the key of the arguments in the cache, None if an argument is not a primitive value
+    """
+    key = []
+    for value in values:
+        value_type = type(value)
+        if value_type is Rope:  # the same string as a str
+            value_type, value = str, str(value)
+        if value_type not in primitive_types:
+            return None
+        if value_type is float:
+            value = repr(value)  # 0.0 and -0.0 are equal but give different results (es. 1 / x), NaN is not equal to NaN
+        key.append(value_type)  # 1, 1.0 and true are equal for Python
+        key.append(value)
+    return tuple(key)
+
+
+class NotPure(Exception):
+    """
+    Raised by the purity analysis at the first operation of a function that is not pure
+    """
+
+
+class PurityAnalysis:
+    """
+    This class finds the pure functions declared at the top level of a program
+    """
+    def __init__(self, tree):
+        """
+        :param tree: parse tree of the program
+        """
+        if tree.data != 'start':  # a program with a single statement
+            tree = Tree('start', [tree])
+        declarations = [child for child in tree.children
+                        if isinstance(child, Tree) and child.data == 'function_declaration']
+        names = Counter(str(declaration.children[1]) for declaration in declarations)
+        self.declarations = {}  # name -> declaration of the function
+        self.calls = {}  # name -> names of the functions called by the function
+        self.local_names = {}  # name -> names of the local variables declared by the function
+        self.called = set()  # names of the functions called by the function being checked
+        for declaration in declarations:
+            name = str(declaration.children[1])
+            if names[name] > 1 or name in reserved_words:
+                continue  # the function that is called depends on the order of execution
+            calls = self.function(declaration)
+            if calls is not None:
+                self.declarations[name] = declaration
+                self.calls[name] = calls
+        # a function is pure only if all the functions it calls are pure
+        pure = set(self.calls)
+        changed = True
+        while changed:
+            changed = False
+            for name in list(pure):
+                if not self.calls[name] <= pure:
+                    pure.discard(name)
+                    changed = True
+        self.pure = pure
+
+    def callees(self, name):
+        """
+        :param name: name of a pure function
+        :return: the names of the functions called by the function, directly or not, the function included
+        """
+        callees = {name}
+        pending = [name]
+        while pending:
+            for callee in self.calls[pending.pop()]:
+                if callee not in callees:
+                    callees.add(callee)
+                    pending.append(callee)
+        return callees
+
+    def function(self, declaration):
+        """
+        :param declaration: function declaration
+        :return: the names of the functions called by the function if its body is pure, None otherwise
+        """
+        parameters = [str(parameter) for parameter in Resolver.parameter_list(declaration)]
+        body = declaration.children[-1]
+        local_names = {str(statement.children[1]) for statement in body.find_data('variable_statement')
+                       if statement.children[0].type in ['LET', 'VAR', 'CONST']}
+        self.local_names[str(declaration.children[1])] = local_names
+        self.called = set()
+        try:
+            if len(set(parameters)) < len(parameters):
+                raise NotPure
+            scope = {parameter: 'var' for parameter in parameters}  # declared variable -> declaration
+            for statement in (body.children if body.data == 'block' else [body]):
+                self.statement(statement, scope)
+        except NotPure:
+            return None
+        if self.called & (local_names | set(parameters)):
+            return None  # a local variable with the name of a function
+        return self.called
+
+    @staticmethod
+    def block_declarations(tree, names):
+        """
+        Collects the variables declared in the scope of a block, like the resolver (Resolver.py)
+        :param tree: the block
+        :param names: set where the names are added
+        """
+        for child in tree.children:
+            if not isinstance(child, Tree) or child.data in ['if_statement', 'while_statement']:
+                continue  # the condition has no declarations, the branches have their own scope
+            if child.data == 'variable_statement' and child.children[0].type in ['LET', 'VAR', 'CONST']:
+                names.add(str(child.children[1]))
+            PurityAnalysis.block_declarations(child, names)
+
+    def block_scope(self, branches, scope):
+        """
+        Checks the branches of an if or while statement, which have their own scope
+        :param branches: blocks or single statements
+        :param scope: declared variable -> declaration, in the enclosing scope
+        """
+        shadowed = set()  # the variables declared in the branches hide the ones of the enclosing scopes
+        for branch in branches:
+            self.block_declarations(Tree('block', [branch]), shadowed)
+        for branch in branches:
+            branch_scope = {name: declaration for name, declaration in scope.items() if name not in shadowed}
+            for statement in (branch.children if branch.data == 'block' else [branch]):
+                self.statement(statement, branch_scope)
+
+    def declare(self, identifier, keyword, scope):
+        name = str(identifier)
+        if name in scope or name in reserved_words:
+            raise NotPure  # redeclaration
+        scope[name] = keyword.value
+
+    @staticmethod
+    def assign(identifier, scope):
+        if scope.get(str(identifier), 'const') == 'const':
+            raise NotPure  # variable not declared by the function, or constant
+
+    def statement(self, tree, scope):
+        """
+        Checks a statement, adding the variables it declares to the scope
+        :param scope: declared variable -> declaration
+        """
+        if not isinstance(tree, Tree):
+            return self.expression(tree, scope)
+        children = tree.children
+        if tree.data == 'variable_statement':
+            if len(children) == 2:  # variable declaration (es. let a)
+                self.declare(children[1], children[0], scope)
+            elif len(children) == 3:  # variable assignment (es. a = 2)
+                self.expression(children[2], scope)
+                self.assign(children[0], scope)
+            elif len(children) == 4:  # variable declaration and assignment (es. let a = 2)
+                self.expression(children[3], scope)  # the value is evaluated before the declaration
+                self.declare(children[1], children[0], scope)
+            elif len(children) == 6:  # assignment to a cell of the array
+                self.expression(children[2], scope)
+                self.expression(children[5], scope)
+                if str(children[0]) not in scope:
+                    raise NotPure
+            else:
+                raise NotPure
+        elif tree.data == 'variable_assignment':
+            if len(children) == 3:
+                self.expression(children[2], scope)
+            self.assign(children[1] if children[0] in ['++', '--'] else children[0], scope)
+        elif tree.data in ['if_statement', 'while_statement']:
+            self.expression(children[0], scope)  # the condition is evaluated in the enclosing scope
+            self.block_scope(children[1:], scope)
+        elif tree.data in ['hoisted_while', 'block']:
+            for child in children:
+                self.statement(child, scope)
+        elif tree.data == 'return_statement':
+            for child in children:
+                if isinstance(child, Tree) and child.data == 'function_call':
+                    raise NotPure  # tail call, executed by the caller (see Compiler.py)
+                self.expression(child, scope)
+        else:
+            self.expression(tree, scope)
+
+    def expression(self, tree, scope):
+        """
+        Checks the variables read and the functions called by an expression
+        """
+        if isinstance(tree, Token):
+            if tree.type == 'IDENTIFIER' and str(tree) not in scope:
+                raise NotPure  # variable not declared by the function
+            return
+        if not isinstance(tree, Tree):  # placeholder of an empty array
+            return
+        if tree.data in ['print_statement', 'input_statement', 'function_declaration']:
+            raise NotPure
+        if tree.data in ['variable_statement', 'variable_assignment', 'if_statement', 'while_statement',
+                         'hoisted_while', 'return_statement']:
+            return self.statement(tree, scope)  # es. a branch of a ternary condition
+        children = tree.children
+        if tree.data == 'function_call':
+            self.called.add(str(children[0]))
+            children = children[1:]
+        for child in children:
+            self.expression(child, scope)
+
+
+class MemoizedFunction:
+    """
+    Cache and statistics of a pure function
+    """
+    def __init__(self, name):
+        self.name = name
+        self.cache = OrderedDict()  # arguments key -> (result, nested calls of the call), from the least recently used
+        self.binding = None  # attributes of the function in the global scope, set when the declaration is executed
+        self.callees = ()  # MemoizedFunction of the functions called, directly or not (itself included)
+        self.local_names = ()  # names of the local variables of the callees
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0  # calls executed without the cache
+        self.evictions = 0
+
+    def bound(self, globals_table):
+        """
+        :param globals_table: dictionary of the global scope
+        :return: True if the names of the callees are bound to them and no global variable hides a local variable
+        """
+        for callee in self.callees:
+            if callee.binding is None or globals_table.get(callee.name) is not callee.binding:
+                return False
+        for name in self.local_names:
+            if name in globals_table:
+                return False
+        return True
+
+
+class Memoizer:
+    """
+    This class finds the pure functions of the compiled programs and caches their calls. A memoizer keeps the state of
+    the calls being executed, thus it must be used by one runtime only.
+    """
+    def __init__(self, max_entries=max_entries):
+        """
+        :param max_entries: maximum number of cached calls of each function, the least recently used are evicted
+        """
+        self.max_entries = max_entries
+        self.functions = []  # MemoizedFunction of every pure function compiled
+        self.deepest = 0  # deepest call depth reached by the call being computed
+
+    def analyze(self, tree):
+        """
+        :param tree: parse tree of a program
+        :return: id of the declaration -> MemoizedFunction, for the pure functions of the program
+        """
+        analysis = PurityAnalysis(tree)
+        functions = {name: MemoizedFunction(name) for name in analysis.pure}
+        for name, function in functions.items():
+            callees = analysis.callees(name)
+            function.callees = tuple(functions[callee] for callee in sorted(callees))
+            function.local_names = tuple(sorted(set().union(*[analysis.local_names[callee] for callee in callees])))
+        self.functions.extend(functions.values())
+        return {id(analysis.declarations[name]): function for name, function in functions.items()}
+
+    def function(self, function, code, parameter_slots, globals_table, max_depth):
+        """
+        :param function: MemoizedFunction of the function
+        :param code: closure of the compiled function body
+        :param parameter_slots: slots of the parameters in the frame of the function
+        :param globals_table: dictionary of the global scope
+        :param max_depth: maximum call depth (see Compiler.py)
+        :return: the closure that executes the body only for the calls that are not cached
+        """
+        cache = function.cache
+        max_entries = self.max_entries
+
+        def run(frame):
+            depth = frame.depth
+            if depth > self.deepest:
+                self.deepest = depth
+            key = arguments_key([frame.values[slot] for slot in parameter_slots])
+            if key is None or not function.bound(globals_table):
+                function.bypasses += 1
+                return code(frame)
+            entry = cache.get(key)
+            if entry is not None and depth + entry[1] <= max_depth:
+                function.hits += 1
+                cache.move_to_end(key)
+                if depth + entry[1] > self.deepest:  # the call counts as deep as its computation
+                    self.deepest = depth + entry[1]
+                return entry[0]
+            function.misses += 1
+            deepest, self.deepest = self.deepest, depth
+            try:
+                value = code(frame)
+            finally:
+                height = self.deepest - depth  # nested calls of the computation
+                if deepest > self.deepest:
+                    self.deepest = deepest
+            if type(value) in primitive_types:
+                cache[key] = (value, height)
+                if len(cache) > max_entries:
+                    cache.popitem(last=False)
+                    function.evictions += 1
+            return value
+        return run
+
+    def report(self):
+        """
+        :return: the text of the report, with the calls and the hit rate of each pure function that has been called
+        """
+        statistics = {}  # name -> [calls, hits, misses, bypasses, entries] (of all the declarations with the name)
+        for function in self.functions:
+            row = statistics.setdefault(function.name, [0, 0, 0, 0, 0])
+            for i, value in enumerate([function.hits + function.misses + function.bypasses, function.hits,
+                                       function.misses, function.bypasses, len(function.cache)]):
+                row[i] += value
+        rows = ["%-30s %10s %10s %10s %10s %9s %10s" % ("memoized function", "calls", "hits", "misses", "uncached",
+                                                        "hit rate", "entries")]
+        for name, (calls, hits, misses, bypasses, entries) in sorted(statistics.items(), key=lambda item: -item[1][0]):
+            if calls:
+                rows.append("%-30s %10d %10d %10d %10d %8.1f%% %10d" % (name, calls, hits, misses, bypasses,
+                                                                       hits * 100 / calls, entries))
+        return '\n'.join(rows) + '\n'
@@ -0,0 +1,245 @@
+# The optimizer rewrites the parse tree before the execution (flag -O), the rewritten tree has the same results of the
+# original one:
+# - constant folding: an operation whose operands are all literals (es. 2 * 3, "5" - 1, 1 < 2) is computed once, by the
+#   same method of TreeToJS used at run time (thus with the same type coercion), and replaced by the literal of its
+#   value. The operations whose value has no literal (es. undefined) are left as they are. An && or || operation
+#   with a literal left operand is replaced by the operand that gives its value (es. true && x by x);
+# - dead branches: an if statement with a constant condition keeps only the branch that is executed (with the condition
+#   true, so that the branch still has its own block scope), a while statement with a false condition loses its body;
+# - loop-invariant code motion: an operation inside the body of a while statement whose variables are not modified by
+#   the loop (es. a * b in while (i < n) { x = a * b + i; i++ }) is computed once, in a temporary variable, instead of
+#   at every iteration. The loop becomes a hoisted_while node, executed by the engines as the original loop with the
+#   declarations of the temporary variables run at the first iteration (so they are not evaluated if the body is never
+#   executed). The temporary variables are local to the hoisted_while node (a scope of its own, see Resolver.py), also
+#   at the top level of the program, so they are never global variables.
+# The input tree is not modified, the optimizer builds a new tree.
+from itertools import count
+
+from lark import Tree, Token
+
+from Resolver import Resolver
+from js_values import truthy
+
+# operations without side effects, computed by the method of the transformer with the same name
+operations = ['add', 'sub', 'mul', 'div', 'negative', 'logical_not', 'logical_and', 'logical_or', 'equality',
+              'inequality', 'strict_equality', 'strict_inequality', 'greater_than', 'greater_than_or_equal',
+              'less_than', 'less_than_or_equal']
+
+literal_types = ['INT', 'FLOAT', 'STRING', 'BOOL']
+
+# statements whose parts are not executed at every iteration of a loop that contains them
+conditional_statements = ['if_statement', 'while_statement', 'hoisted_while', 'ternary_condition_statement',
+                          'function_declaration', 'logical_and', 'logical_or']
+
+class Optimizer:
+    """
+    This class implements the optimizations of the parse tree returned by the parser
+    """
+    def __init__(self, transformer):
+        """
+        :param transformer: TreeToJS computing the constant operations (es. the one of the runtime)
+        """
+        self.transformer = transformer
+        # names of the temporary variables, distinct in the programs optimized by this instance (they are local to
+        # their loop, see Resolver.py, so two programs can use the same names)
+        self.temporary_names = count()
+
+    def optimize(self, tree):
+        """
+        :param tree: parse tree returned by the parser
+        :return: the optimized parse tree
+        """
+        tree = self.fold(tree)
+        if tree.data == 'start':
+            return Tree('start', self.statements(tree.children, set()), tree.meta)
+        return self.statement(tree, set())
+
+    # constant folding and dead branches
+
+    def fold(self, tree):
+        """
+        Folds the constant operations of a subtree, from the leaves to the root
+        :return: the new subtree
+        """
+        tree = Tree(tree.data, [self.fold(child) if isinstance(child, Tree) else child for child in tree.children],
+                    tree.meta)
+        if tree.data in operations:
+            values = [self.literal(child) for child in tree.children]
+            if None in values:
+                if tree.data in ['logical_and', 'logical_or'] and values[0] is not None:
+                    # a literal left operand decides whether the value is the left or the right operand
+                    if truthy(self.transformer.factor([values[0]])) == (tree.data == 'logical_or'):
+                        return tree.children[0]
+                    return tree.children[1]
+                return tree
+            try:
+                value = getattr(self.transformer, tree.data)([self.transformer.factor([token]) for token in values])
+            except Exception:  # the error is raised at run time, as without optimizations
+                return tree
+            folded = self.literal_node(value)
+            return folded if folded is not None else tree
+        elif tree.data == 'if_statement':
+            condition = self.literal(tree.children[0])
+            if condition is None:
+                return tree
+            if truthy(self.transformer.factor([condition])):
+                return Tree('if_statement', [self.literal_node(True), tree.children[1]], tree.meta)
+            elif len(tree.children) == 3:  # only the else branch is executed
+                return Tree('if_statement', [self.literal_node(True), tree.children[2]], tree.meta)
+            return Tree('if_statement', [self.literal_node(False), Tree('block', [])], tree.meta)
+        elif tree.data == 'while_statement':
+            condition = self.literal(tree.children[0])
+            if condition is not None and not truthy(self.transformer.factor([condition])):
+                return Tree('while_statement', [tree.children[0], Tree('block', [])], tree.meta)
+        return tree
+
+    @staticmethod
+    def literal(tree):
+        """
+        :return: the token of a literal (es. 2, (2), 'a', true), None if the subtree is not a literal
+        """
+        while isinstance(tree, Tree) and tree.data in ['term', 'expression'] and len(tree.children) == 1:
+            tree = tree.children[0]
+        if isinstance(tree, Tree) and tree.data == 'factor' and isinstance(tree.children[0], Token) \
+                and tree.children[0].type in literal_types:
+            return tree.children[0]
+        return None
+
+    def literal_node(self, value):
+        """
+        :return: the literal (factor node) with the given value, None if the value cannot be written as a literal
+        """
+        try:
+            if type(value) is bool:
+                token = Token('BOOL', 'true' if value else 'false')
+            elif type(value) is int:
+                token = Token('INT', str(value))
+            elif type(value) is float:
+                token = Token('FLOAT', repr(value))  # repr gives back the same float (also nan and inf)
+            elif type(value) is str:
+                token = Token('STRING', "'" + value + "'")
+            else:
+                return None
+            literal_value = self.transformer.factor([token])
+        except ValueError:  # es. integer with too many digits
+            return None
+        if type(literal_value) is not type(value) or repr(literal_value) != repr(value):
+            return None
+        return Tree('factor', [token])
+
+    # loop-invariant code motion
+
+    def statements(self, statements, defined):
+        """
+        Optimizes the loops in a sequence of statements
+        :param defined: identifiers of the variables surely declared before the first statement
+        :return: the list of the new statements
+        """
+        defined = set(defined)
+        optimized = []
+        for statement in statements:
+            optimized.append(self.statement(statement, defined))
+            if statement.data == 'variable_statement' and len(statement.children) in [2, 3, 4]:
+                defined.add(self.assigned_variable(statement))
+        return optimized
+
+    def statement(self, tree, defined):
+        if tree.data == 'function_declaration':
+            # the function can be called anywhere, only its parameters are surely declared at the start of the body
+            body = self.branch(tree.children[-1], set(Resolver.parameter_list(tree)))
+            return Tree(tree.data, tree.children[:-1] + [body], tree.meta)
+        elif tree.data == 'if_statement':
+            return Tree(tree.data, tree.children[:1] + [self.branch(branch, defined) for branch in tree.children[1:]],
+                        tree.meta)
+        elif tree.data == 'while_statement':
+            loop = Tree(tree.data, [tree.children[0], self.branch(tree.children[1], defined)], tree.meta)
+            return self.hoist(loop, defined)
+        return tree
+
+    def branch(self, tree, defined):
+        """
+        :param tree: a block or a single statement
+        """
+        if tree.data == 'block':
+            return Tree('block', self.statements(tree.children, defined), tree.meta)
+        return self.statement(tree, defined)
+
+    @staticmethod
+    def assigned_variable(tree):
+        """
+        :param tree: a variable statement
+        :return: the identifier of the declared or assigned variable
+        """
+        if isinstance(tree.children[0], Token) and tree.children[0].type in ['LET', 'VAR', 'CONST']:
+            return str(tree.children[1])
+        return str(tree.children[0])
+
+    def hoist(self, loop, defined):
+        """
+        Moves the invariant operations out of the body of a while statement
+        :param loop: a while statement
+        :param defined: identifiers of the variables surely declared before the loop
+        :return: the while statement, or the hoisted_while node with the declarations of the temporary variables
+        """
+        assigned = set()
+        stores_elements = False
+        for subtree in loop.iter_subtrees():
+            if subtree.data in ['function_call', 'function_declaration']:
+                return loop  # a function can modify any variable
+            elif subtree.data == 'variable_statement':
+                assigned.add(self.assigned_variable(subtree))
+                stores_elements = stores_elements or len(subtree.children) == 6
+            elif subtree.data == 'variable_assignment':
+                assigned.update(str(child) for child in subtree.children
+                                if isinstance(child, Token) and child.type == 'IDENTIFIER')
+        invariant = defined - assigned
+        # an array computed once would be shared by the iterations, which could modify its cells
+        roots = [operation for operation in operations
+                 if not stores_elements or operation not in ['add', 'logical_and', 'logical_or']]
+        temporaries = {}  # operation -> identifier of the temporary variable
+
+        def replace(tree):
+            if tree.data in roots and self.is_invariant(tree, invariant) and self.has_variables(tree):
+                if tree not in temporaries:
+                    temporaries[tree] = '$' + str(next(self.temporary_names))
+                return Tree('factor', [Token('IDENTIFIER', temporaries[tree])])
+            elif tree.data in conditional_statements:
+                return tree
+            return Tree(tree.data, [replace(child) if isinstance(child, Tree) else child for child in tree.children],
+                        tree.meta)
+
+        body = loop.children[1].children if loop.children[1].data == 'block' else [loop.children[1]]
+        statements = []
+        for statement in body:
+            statements.append(replace(statement))
+            if statement.data == 'return_statement':
+                statements += body[len(statements):]  # never executed
+                break
+        if not temporaries:
+            return loop
+        body = Tree('block', statements, loop.children[1].meta) if loop.children[1].data == 'block' else statements[0]
+        declarations = [Tree('variable_statement', [Token('VAR', 'var'), Token('IDENTIFIER', identifier),
+                                                    Token('EQUAL', '='), operation])
+                        for operation, identifier in temporaries.items()]
+        return Tree('hoisted_while', declarations + [Tree('while_statement', [loop.children[0], body], loop.meta)],
+                    loop.meta)
+
+    def is_invariant(self, tree, invariant):
+        """
+        :param invariant: identifiers of the variables that keep their value during the loop
+        :return: True if the subtree is made only of operations, literals and invariant variables
+        """
+        if tree.data in ['term', 'expression']:
+            return len(tree.children) == 1 and isinstance(tree.children[0], Tree) \
+                and self.is_invariant(tree.children[0], invariant)
+        elif tree.data == 'factor':
+            token = tree.children[0]
+            return isinstance(token, Token) and (token.type in literal_types
+                                                 or token.type == 'IDENTIFIER' and str(token) in invariant)
+        elif tree.data in operations:
+            return all(isinstance(child, Tree) and self.is_invariant(child, invariant) for child in tree.children)
+        return False
+
+    @staticmethod
+    def has_variables(tree):
+        return any(True for _ in tree.scan_values(lambda value: isinstance(value, Token) and value.type == 'IDENTIFIER'))
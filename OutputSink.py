@@ -0,0 +1,142 @@
+# Output of the programs: the text printed by console.log (and the messages of prompt) is written to an output sink
+# instead of being printed directly, so that the output can be buffered, captured or discarded:
+# - StreamSink: writes to a stream (the standard output by default), with a flush policy:
+#   'always' passes every write to the stream (like print), 'line' buffers the text until the end of each line (like a
+#   terminal), 'full' buffers the text until the buffer is full (the fastest one when the output is a file or a pipe);
+# - FileSink: a StreamSink writing to a file;
+# - CaptureSink: keeps the output in memory (es. for the programs executed by an embedding application);
+# - NullSink: discards the output, counting its bytes (flag --quiet, to benchmark the programs without the cost of
+#   the output).
+# The buffered text is always flushed before reading the keyboard input (so the messages printed before a prompt are
+# visible) and at the end of every execution of a runtime.
+# The message of a prompt is given to the prompt method of the sink, since it must be seen by whoever types the input:
+# the sinks writing to the standard output and the capturing one keep it in order with the rest of the output, while
+# the sinks whose output nobody reads while the program runs (a file, or the discarded output) write it to the terminal
+# (a prompt stream, the standard output by default).
+import sys
+
+flush_policies = ['always', 'line', 'full']
+
+
+class StreamSink:
+    """
+    Output sink writing to a stream
+    """
+    def __init__(self, stream=None, flush_policy='always', buffer_size=8192):
+        """
+        :param stream: text stream, None for the current standard output (also when it is redirected after the
+        creation of the sink)
+        :param flush_policy: 'always', 'line' or 'full'
+        :param buffer_size: number of buffered characters that triggers the flush with the 'full' policy
+        """
+        if flush_policy not in flush_policies:
+            raise ValueError('unknown flush policy ' + repr(flush_policy))
+        self.stream = stream
+        self.flush_policy = flush_policy
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.buffered = 0  # number of buffered characters
+
+    def write(self, text):
+        if self.flush_policy == 'always':
+            (self.stream or sys.stdout).write(text)
+            return
+        self.buffer.append(text)
+        self.buffered += len(text)
+        if self.buffered >= self.buffer_size or self.flush_policy == 'line' and '\n' in text:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered text to the stream
+        """
+        stream = self.stream or sys.stdout
+        if self.buffer:
+            stream.write(''.join(self.buffer))
+            self.buffer.clear()
+            self.buffered = 0
+        stream.flush()
+
+    def prompt(self, message):
+        """
+        Writes the message of a prompt, before the input is read
+        """
+        self.write(message)
+        self.flush()  # the output printed before the prompt is visible when the input is typed
+
+
+class FileSink(StreamSink):
+    """
+    Output sink writing to a file
+    """
+    def __init__(self, path, flush_policy='full', buffer_size=65536, prompt_stream=None):
+        """
+        :param path: path of the file, it is overwritten
+        :param prompt_stream: stream of the messages of the prompts, None for the current standard output
+        """
+        super().__init__(open(path, 'w'), flush_policy, buffer_size)
+        self.prompt_stream = prompt_stream
+
+    def prompt(self, message):
+        """
+        Writes the message of a prompt to the terminal, where the input is typed
+        """
+        self.flush()
+        stream = self.prompt_stream or sys.stdout
+        stream.write(message)
+        stream.flush()
+
+    def close(self):
+        self.flush()
+        self.stream.close()
+
+
+class CaptureSink:
+    """
+    Output sink keeping the output in memory
+    """
+    def __init__(self):
+        self.parts = []
+
+    def write(self, text):
+        self.parts.append(text)
+
+    def flush(self):
+        pass
+
+    def prompt(self, message):
+        self.parts.append(message)
+
+    def getvalue(self):
+        """
+        :return: the output written so far
+        """
+        return ''.join(self.parts)
+
+    def clear(self):
+        self.parts.clear()
+
+
+class NullSink:
+    """
+    Output sink discarding the output
+    """
+    def __init__(self, prompt_stream=None):
+        """
+        :param prompt_stream: stream of the messages of the prompts, None to discard them with the output
+        """
+        self.bytes = 0  # bytes of the discarded output (UTF-8)
+        self.prompt_stream = prompt_stream
+
+    def write(self, text):
+        self.bytes += len(text.encode('utf8'))
+
+    def flush(self):
+        pass
+
+    def prompt(self, message):
+        if self.prompt_stream is None:
+            self.write(message)
+            return
+        self.prompt_stream.write(message)
+        self.prompt_stream.flush()
@@ -0,0 +1,127 @@
+# Building the LALR tables from JavaScript_grammar.lark takes most of the start-up time of the interpreter.
+# The compiled parser is therefore serialized on disk (with Lark's save/load methods) and reused by the next runs.
+# Each cache file is keyed by the content of the grammar, the Lark version, the Python version and the parser options,
+# so that any change of one of them invalidates the cache automatically.
+# Next to the parser, the cache keeps the map of the syntax errors built from its examples (ErrorClassifier.py), so
+# that it is not built again by every process.
+# Loading the parser unpickles the cache file, so the cache files are read only from a directory private to the user
+# (cache_files.py).
+import hashlib
+import os
+import sys
+import tempfile
+
+import lark
+from lark import Lark
+
+from ErrorClassifier import ErrorClassifier
+from cache_files import make_private_directory, open_private_file
+
+# the cache directory can be moved with the JS_INTERPRETER_CACHE_DIR environment variable
+default_cache_dir = os.environ.get('JS_INTERPRETER_CACHE_DIR') or \
+                    os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+                                 'javascript-interpreter')
+
+
+def cache_key(grammar, options):
+    """
+    Computes the key of the cached parser
+    :param grammar: content of the grammar file
+    :param options: options given to the Lark constructor
+    :return: hexadecimal sha256 digest identifying the compiled parser
+    """
+    options_str = ''.join(k + repr(options[k]) for k in sorted(options))
+    key = grammar + options_str + lark.__version__ + str(sys.version_info[:2])
+    return hashlib.sha256(key.encode('utf8')).hexdigest()
+
+
+def cache_file_paths(grammar_file_path, cache_dir, options):
+    """
+    :return: the cache key, the cache directory and the paths of the cache files of the parser and of its error map
+    """
+    with open(grammar_file_path, 'r') as f:
+        grammar = f.read()
+    key = cache_key(grammar, options)
+    cache_dir = cache_dir or default_cache_dir
+    return key, cache_dir, os.path.join(cache_dir, 'parser-%s.lark' % key), \
+        os.path.join(cache_dir, 'parser-%s.errors.json' % key)
+
+
+def load_parser(grammar_file_path, use_cache=True, cache_dir=None, **options):
+    """
+    Returns the Lark parser for the given grammar, loading it from the on-disk cache when possible
+    :param grammar_file_path: path of the .lark grammar file
+    :param use_cache: if False the parser is always built from the grammar and the cache is not touched
+    :param cache_dir: directory of the cache files (default_cache_dir if not specified)
+    :param options: options given to the Lark constructor (e.g., parser='lalr')
+    :return: the Lark parser
+    """
+    if not use_cache:
+        return Lark.open(grammar_file_path, **options)
+
+    key, cache_dir, cache_file_path, _ = cache_file_paths(grammar_file_path, cache_dir, options)
+
+    try:
+        with open_private_file(cache_file_path) as f:
+            # the first line of the file contains the key, so that a renamed or truncated file is never used
+            if f.readline().rstrip(b'\n') == key.encode('utf8'):
+                return Lark.load(f)
+    except FileNotFoundError:
+        pass  # cold start, the parser has never been cached
+    except Exception:
+        pass  # corrupted cache file or writable by other users, it is replaced below
+
+    parser = Lark.open(grammar_file_path, **options)
+    save_cache_file(lambda f: parser.save(f), key, cache_dir, cache_file_path)
+    return parser
+
+
+def load_classifier(lark_parser, grammar_file_path, use_cache=True, cache_dir=None, **options):
+    """
+    Returns the ErrorClassifier of a parser returned by load_parser, loading it from the on-disk cache when possible
+    :param lark_parser: the Lark parser (the parser keyword is one of the options)
+    The other parameters are the ones given to load_parser for the parser
+    :return: the ErrorClassifier
+    """
+    if not use_cache:
+        return ErrorClassifier.of(lark_parser)
+
+    key, cache_dir, _, cache_file_path = cache_file_paths(grammar_file_path, cache_dir, options)
+    try:
+        with open_private_file(cache_file_path) as f:
+            if f.readline().rstrip(b'\n') == key.encode('utf8'):
+                return ErrorClassifier.loads(f.read().decode('utf8'))
+    except FileNotFoundError:
+        pass
+    except Exception:
+        pass  # corrupted file or map built from other examples, it is replaced below
+
+    classifier = ErrorClassifier.of(lark_parser)
+    save_cache_file(lambda f: f.write(classifier.dumps().encode('utf8')), key, cache_dir, cache_file_path)
+    return classifier
+
+
+def save_cache_file(write, key, cache_dir, cache_file_path):
+    """
+    Writes a file of the cache. The file is written in a temporary file and then renamed, so that concurrent
+    interpreter processes never read a partially written cache file
+    :param write: function writing the content of the file in the binary file it takes
+    :param key: cache key of the parser
+    :param cache_dir: directory of the cache files
+    :param cache_file_path: final path of the cache file
+    :return: None
+    """
+    try:
+        make_private_directory(cache_dir)
+        fd, temp_path = tempfile.mkstemp(dir=cache_dir, prefix='.parser-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(key.encode('utf8') + b'\n')
+                write(f)
+            os.replace(temp_path, cache_file_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+    except OSError:
+        pass  # the cache is only an optimization: a read-only file system (or a directory of another user) must not
+        # prevent the execution
@@ -0,0 +1,231 @@
+# Profiler of the JavaScript programs (flag --profile).
+# The compiler (Compiler.py) wraps the closures of the program, of the function bodies and of the while loops in timed
+# frames, and the closures of the statements in counters of the executed lines. The wrapping is done at compile time
+# only when a profiler is given, so a program compiled without profiler runs exactly the same closures as before.
+# For each function (and loop) the profiler records:
+# - calls: number of executions;
+# - cumulative time: time spent in the function, including the functions it calls (counted once for recursive calls);
+# - self time: time spent in the function, excluding the functions it calls.
+# At the end the report is written sorted by self time, together with the collapsed stacks (one line per call stack:
+# the frame names separated by ';' and the self time in microseconds), the format read by flamegraph.pl and speedscope.
+# The SamplingProfiler (flag --profile-interval) does not time the calls: the wrappers only keep the names of the active
+# frames and the line of the current statement, and a thread reads them at regular intervals. The times are estimated
+# from the number of samples, so the overhead is lower and does not grow with the number of short calls, at the cost of
+# the precision of the functions that run only for a few intervals and of the exact counts of calls and line hits.
+import sys
+import threading
+import time
+from collections import Counter
+
+program_name = '<program>'
+
+
+class FrameStatistics:
+    """
+    Statistics of a function or of a loop
+    """
+    __slots__ = ('calls', 'cumulative_time', 'self_time')
+
+    def __init__(self):
+        self.calls = 0
+        self.cumulative_time = 0.0
+        self.self_time = 0.0
+
+
+class Profiler:
+    def __init__(self):
+        self.frames = {}  # name -> FrameStatistics
+        self.lines = Counter()  # line number -> number of executed statements
+        self.stacks = Counter()  # collapsed call stack -> self time in seconds
+        self.stack = []  # [name, start time, time spent in the called frames] of the active frames
+        self.active = Counter()  # name -> number of active frames with the name (recursion)
+
+    def frame(self, name, closure):
+        """
+        :param name: name of the function or of the loop
+        :param closure: closure of the compiled function body or loop
+        :return: the closure that executes the given one in a timed frame
+        """
+        enter, leave = self.enter, self.leave
+
+        def run(frame):
+            enter(name)
+            try:
+                return closure(frame)
+            finally:
+                leave()
+        return run
+
+    def statement(self, line, closure):
+        """
+        :param line: line of the statement in the script
+        :param closure: closure of the compiled statement
+        :return: the closure that counts the executions of the line and executes the statement
+        """
+        lines = self.lines
+
+        def run(frame):
+            lines[line] += 1
+            return closure(frame)
+        return run
+
+    def enter(self, name):
+        self.active[name] += 1
+        self.stack.append([name, time.perf_counter(), 0.0])
+
+    def leave(self):
+        name, start, children_time = self.stack.pop()
+        elapsed = time.perf_counter() - start
+        self.active[name] -= 1
+        statistics = self.frames.get(name)
+        if statistics is None:
+            statistics = self.frames[name] = FrameStatistics()
+        statistics.calls += 1
+        statistics.self_time += elapsed - children_time
+        if not self.active[name]:  # the time of a recursive call is already in the one of the outer call
+            statistics.cumulative_time += elapsed
+        self.stacks[';'.join([entry[0] for entry in self.stack] + [name])] += elapsed - children_time
+        if self.stack:
+            self.stack[-1][2] += elapsed
+
+    def report(self):
+        """
+        :return: the text of the report, with the functions sorted by self time and the lines by number of executions
+        """
+        rows = ["%-30s %10s %14s %14s" % ("function", "calls", "cumulative ms", "self ms")]
+        for name, statistics in sorted(self.frames.items(), key=lambda item: item[1].self_time, reverse=True):
+            rows.append("%-30s %10d %14.3f %14.3f" % (name, statistics.calls, statistics.cumulative_time * 1000,
+                                                      statistics.self_time * 1000))
+        rows.append("")
+        rows.append("%-10s %10s" % ("line", "hits"))
+        for line, hits in sorted(self.lines.items(), key=lambda item: (-item[1], item[0])):
+            rows.append("%-10d %10d" % (line, hits))
+        return '\n'.join(rows) + '\n'
+
+    def collapsed_stacks(self):
+        """
+        :return: the collapsed stacks, the self time of each stack is in microseconds
+        """
+        return ''.join("%s %d\n" % (stack, round(self_time * 1e6)) for stack, self_time in sorted(self.stacks.items()))
+
+    def save(self, prefix):
+        """
+        Writes the report in prefix.txt and the collapsed stacks in prefix.folded
+        """
+        with open(prefix + '.txt', 'w') as f:
+            f.write(self.report())
+        with open(prefix + '.folded', 'w') as f:
+            f.write(self.collapsed_stacks())
+        print('Profile written to %s.txt and %s.folded' % (prefix, prefix), file=sys.stderr)
+
+
+class SamplingProfiler:
+    """
+    Profiler that samples the stack of the active JavaScript frames, with the same interface used by the compiler
+    """
+    def __init__(self, interval=0.005):
+        """
+        :param interval: time between two samples in seconds. The sampling thread needs the GIL, thus it is not scheduled
+        more often than the switch interval of Python (5 ms by default)
+        """
+        self.interval = interval
+        self.stack = []  # names of the active frames
+        self.line = None  # line of the statement being executed
+        self.samples = Counter()  # collapsed call stack -> number of samples
+        self.lines = Counter()  # line number -> number of samples
+        self.elapsed = 0.0  # time spent sampling, the estimated time of a sample is elapsed / number of samples
+        self.stopped = None  # event stopping the sampling thread, None while the program is not running
+
+    def frame(self, name, closure):
+        """
+        :param name: name of the function or of the loop
+        :param closure: closure of the compiled function body or loop
+        :return: the closure that executes the given one in a frame visible to the sampler (the frame of the program
+        also samples its execution)
+        """
+        stack, profiler = self.stack, self
+
+        def run(frame):
+            stack.append(name)
+            line = profiler.line
+            try:
+                return closure(frame)
+            finally:
+                stack.pop()
+                profiler.line = line  # the statement of the caller is being executed again
+        if name != program_name:
+            return run
+
+        def run_program(frame):
+            if self.stopped is not None:
+                return run(frame)  # a program executed by a function of another program (es. a snapshot prelude)
+            self.start()
+            try:
+                return run(frame)
+            finally:
+                self.stop()
+        return run_program
+
+    def statement(self, line, closure):
+        """
+        :param line: line of the statement in the script
+        :param closure: closure of the compiled statement
+        :return: the closure that records the line of the statement and executes it
+        """
+        profiler = self
+
+        def run(frame):
+            profiler.line = line
+            return closure(frame)
+        return run
+
+    def start(self):
+        self.stopped = threading.Event()
+        threading.Thread(target=self.sample, args=(self.stopped, time.perf_counter()), daemon=True).start()
+
+    def stop(self):
+        self.stopped.set()
+        self.stopped = None
+
+    def sample(self, stopped, start):
+        """
+        Body of the sampling thread, it records the active frames every interval until the event is set
+        """
+        while not stopped.wait(self.interval):
+            stack, line = self.stack[:], self.line  # copied while holding the GIL, thus consistent
+            if stack:
+                self.samples[';'.join(stack)] += 1
+                if line is not None:
+                    self.lines[line] += 1
+        self.elapsed += time.perf_counter() - start
+
+    def report(self):
+        """
+        :return: the text of the report, with the functions sorted by estimated self time and the lines by samples
+        """
+        total = sum(self.samples.values())
+        sample_time = self.elapsed / total if total else 0.0
+        self_samples, cumulative_samples = Counter(), Counter()
+        for stack, samples in self.samples.items():
+            names = stack.split(';')
+            self_samples[names[-1]] += samples
+            for name in set(names):  # a recursive function is counted once in each sample
+                cumulative_samples[name] += samples
+        rows = ["%d samples every %.3f ms, %.3f ms per sample" % (total, self.interval * 1000, sample_time * 1000),
+                "%-30s %12s %14s %14s" % ("function", "self samples", "cumulative ms", "self ms")]
+        for name, samples in sorted(cumulative_samples.items(), key=lambda item: (-self_samples[item[0]], item[0])):
+            rows.append("%-30s %12d %14.3f %14.3f" % (name, self_samples[name], samples * sample_time * 1000,
+                                                      self_samples[name] * sample_time * 1000))
+        rows.append("")
+        rows.append("%-10s %10s" % ("line", "samples"))
+        for line, samples in sorted(self.lines.items(), key=lambda item: (-item[1], item[0])):
+            rows.append("%-10d %10d" % (line, samples))
+        return '\n'.join(rows) + '\n'
+
+    def collapsed_stacks(self):
+        """
+        :return: the collapsed stacks with their number of samples
+        """
+        return ''.join("%s %d\n" % (stack, samples) for stack, samples in sorted(self.samples.items()))
+
+    save = Profiler.save  # the same files of the instrumenting profiler
@@ -0,0 +1,134 @@
+# Cache of the parsed programs, for the services that execute the same scripts many times.
+# The parse trees are stored in memory in least recently used order and are looked up by the sha256 digest of the
+# source code (together with a namespace identifying the grammar, the Lark version and the options that change the
+# tree, es. the optimizations). The cache is limited both in number of entries and in bytes (the size of a tree is the
+# size of its pickled form), the least recently used trees are evicted first.
+# With a cache directory, the pickled trees are also written on disk, so that a new process (es. after a restart) finds
+# the programs parsed by the previous ones. Like the parser cache, the files are written in a temporary file and then
+# renamed, so that concurrent processes never read a partially written file. Since unpickling a file can execute code,
+# the files are read only from a directory private to the user (cache_files.py).
+# The cached trees are shared by all the executions: the engines and the optimizer never modify the parse tree.
+import hashlib
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+
+from cache_files import make_private_directory, open_private_file
+
+
+class ProgramCache:
+    """
+    LRU cache of parse trees, with an optional on-disk tier
+    """
+    def __init__(self, max_entries=256, max_bytes=32 * 2 ** 20, cache_dir=None):
+        """
+        :param max_entries: maximum number of trees kept in memory
+        :param max_bytes: maximum total size (of the pickled trees) kept in memory
+        :param cache_dir: directory of the on-disk tier, None to keep the trees only in memory
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.entries = OrderedDict()  # key -> (tree, size in bytes), from the least to the most recently used
+        self.bytes = 0
+        self.hits = 0
+        self.disk_hits = 0  # hits of the on-disk tier (the tree was not in memory)
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(source, namespace=''):
+        """
+        :param source: source code of the program
+        :param namespace: identifier of the grammar and of the options that change the parse tree
+        :return: the key of the program
+        """
+        return hashlib.sha256((namespace + '\0' + source).encode('utf8')).hexdigest()
+
+    def get(self, key):
+        """
+        :return: the cached tree of the key, None if it is not cached
+        """
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        data = self.load(key)
+        if data is not None:
+            try:
+                tree = pickle.loads(data)
+            except Exception:
+                tree = None  # corrupted file, it is replaced at the next put
+            if tree is not None:
+                self.insert(key, tree, len(data))
+                self.disk_hits += 1
+                return tree
+        self.misses += 1
+        return None
+
+    def put(self, key, tree):
+        """
+        Caches the tree of a program (in memory and on disk)
+        """
+        data = pickle.dumps(tree, protocol=pickle.HIGHEST_PROTOCOL)
+        self.insert(key, tree, len(data))
+        self.store(key, data)
+
+    def insert(self, key, tree, size):
+        if size > self.max_bytes:
+            return  # the tree alone would exceed the limit
+        if key in self.entries:
+            self.bytes -= self.entries.pop(key)[1]
+        self.entries[key] = (tree, size)
+        self.bytes += size
+        while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+            _, (_, evicted_size) = self.entries.popitem(last=False)  # least recently used
+            self.bytes -= evicted_size
+            self.evictions += 1
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, key + '.pickle')
+
+    def load(self, key):
+        """
+        :return: the pickled tree stored on disk, None if there is not
+        """
+        if self.cache_dir is None:
+            return None
+        try:
+            with open_private_file(self.path(key)) as f:
+                return f.read()
+        except OSError:
+            return None  # not cached, or the file could have been written by another user
+
+    def store(self, key, data):
+        if self.cache_dir is None:
+            return
+        try:
+            make_private_directory(self.cache_dir)
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, prefix='.program-', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(temp_path, self.path(key))
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError:
+            pass  # the cache directory is not writable or not private, the tree is kept only in memory
+
+    def clear(self):
+        """
+        Empties the memory tier (the files on disk are kept)
+        """
+        self.entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        """
+        :return: the counters of the cache
+        """
+        return {'entries': len(self.entries), 'bytes': self.bytes, 'hits': self.hits, 'disk_hits': self.disk_hits,
+                'misses': self.misses, 'evictions': self.evictions}
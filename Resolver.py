@@ -0,0 +1,144 @@
+# The resolver visits the parse tree before the compilation and collects the variables declared in each scope, so that
+# every identifier can be resolved at compile time to the place where its value is stored:
+# - the variables declared at the top level of the program are global: they are stored by name in the global symbol
+#   table, which is shared by the programs executed with the same transformer (e.g., the lines of the console);
+# - the variables declared in a function or in a block (if, while) are local: each of them has a slot in the frame of
+#   the enclosing function (the program itself for the blocks at the top level), and is accessed with its depth (number
+#   of function frames to go up, following the lexical scopes) and its index in the frame.
+# An assignment to a variable that has not been declared (es. a = 2) implicitly declares it in the scope of the
+# assignment, like the insert in the symbol table of the current scope made by the transformer.
+# The temporary variables of a loop rewritten by the optimizer (hoisted_while, see Optimizer.py) are declared in a
+# scope of the loop, so they are local also at the top level of the program and never become global variables.
+from lark import Tree, Token
+
+
+class Scope:
+    """
+    Lexical scope of a program: the program itself, the body of a function, an if or a while statement, the temporary
+    variables of a hoisted while statement
+    """
+    def __init__(self, parent=None, function=None):
+        self.parent = parent
+        # the scope that owns the frame where the local variables are stored (the program or a function)
+        self.function = function if function is not None else self
+        self.slots = {}  # identifier -> index of the slot in the frame
+        if self.function is self:
+            self.local_names = []  # identifier of each slot of the frame
+            self.depth = 0 if parent is None else parent.function.depth + 1  # nesting level of the function
+
+    def is_global(self):
+        return self.parent is None
+
+    def declare(self, identifier):
+        """
+        Declares a variable in the scope, the variables of the program scope are global and have no slot
+        :param identifier: JavaScript variable binding
+        :return: None
+        """
+        if not self.is_global() and identifier not in self.slots:
+            self.slots[identifier] = len(self.function.local_names)
+            self.function.local_names.append(identifier)
+
+    def is_declared(self, identifier):
+        """
+        Checks if the identifier is declared as local variable in this scope or in one of the enclosing scopes
+        """
+        scope = self
+        while scope is not None:
+            if identifier in scope.slots:
+                return True
+            scope = scope.parent
+        return False
+
+    def resolve(self, identifier):
+        """
+        Resolves an identifier used in this scope
+        :param identifier: JavaScript variable binding
+        :return: (depth, index) of the slot of a local variable, (-1, -1) for a global variable
+        """
+        scope = self
+        while scope is not None:
+            if identifier in scope.slots:
+                return self.function.depth - scope.function.depth, scope.slots[identifier]
+            scope = scope.parent
+        return -1, -1
+
+
+class Resolver:
+    """
+    This class collects the declarations of the scopes of a parse tree. The scopes are indexed by the node that
+    introduces them (function_declaration, if_statement, while_statement, hoisted_while).
+    """
+    def __init__(self):
+        self.scopes = {}  # id of the node -> scope
+
+    def resolve(self, tree):
+        """
+        :param tree: parse tree returned by the parser
+        :return: the scope of the program
+        """
+        program = Scope()
+        if tree.data != 'start':  # a program with a single statement
+            tree = Tree('start', [tree])
+        self.declarations(tree, program)  # explicit declarations first, so that they are visible to every statement
+        self.implicit_declarations(tree, program)
+        return program
+
+    def scope_of(self, tree):
+        return self.scopes[id(tree)]
+
+    def declarations(self, tree, scope):
+        for child in tree.children:
+            if not isinstance(child, Tree):
+                continue
+            if child.data == 'function_declaration':
+                scope.declare(child.children[1])
+                function = Scope(parent=scope)
+                self.scopes[id(child)] = function
+                for parameter in self.parameter_list(child):
+                    function.declare(parameter)
+                self.declarations(child, function)
+            elif child.data in ['if_statement', 'while_statement']:
+                self.declarations(child.children[0], scope)  # the condition is evaluated in the enclosing scope
+                block = Scope(parent=scope, function=scope.function)
+                self.scopes[id(child)] = block
+                for branch in child.children[1:]:  # a branch can be a block or a single statement
+                    self.declarations(Tree('block', [branch]), block)
+            elif child.data == 'hoisted_while':
+                # the declarations of the temporary variables and the loop, which sees them
+                temporaries = Scope(parent=scope, function=scope.function)
+                self.scopes[id(child)] = temporaries
+                self.declarations(child, temporaries)
+            else:
+                if child.data == 'variable_statement' and child.children[0].type in ['LET', 'VAR', 'CONST']:
+                    scope.declare(child.children[1])
+                self.declarations(child, scope)
+
+    def implicit_declarations(self, tree, scope):
+        for child in tree.children:
+            if not isinstance(child, Tree):
+                continue
+            child_scope = self.scopes.get(id(child), scope)
+            if child.data in ['if_statement', 'while_statement']:
+                self.implicit_declarations(child.children[0], scope)
+                for branch in child.children[1:]:
+                    self.implicit_declarations(Tree('block', [branch]), child_scope)
+                continue
+            if child.data == 'variable_statement' and len(child.children) == 3:  # assignment (es. a = 2)
+                identifier = child.children[0]
+                if not child_scope.is_declared(identifier):
+                    child_scope.declare(identifier)
+            self.implicit_declarations(child, child_scope)
+
+    @staticmethod
+    def parameter_list(tree):
+        """
+        :param tree: a function declaration
+        :return: the list of the parameters of the function
+        """
+        if len(tree.children) == 5:  # if there are no parameters
+            return []
+        elif isinstance(tree.children[3], Token):
+            return [tree.children[3]]
+        else:
+            return tree.children[3].children
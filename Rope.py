@@ -0,0 +1,101 @@
+# Representation of the long strings built by concatenation.
+# A Python string is immutable, so appending to it copies it: a loop that accumulates a string (es. s += x) copies the
+# whole string at every iteration and takes quadratic time. When the result of a concatenation is long, it is a rope
+# instead: the list of its parts, joined only when the content of the string is needed (printed, compared, indexed,
+# converted to a number). The length of a rope is known without joining its parts.
+# Appending to a rope does not copy it: the new rope appends its part to the list of the old one, which keeps counting
+# only its own parts, so the old value is not changed (es. t = s; s += x leaves t unchanged). When another rope has
+# already appended to the list, the parts are copied (es. t = s + x after s + y). The short parts at the end are joined
+# in chunks of chunk_parts parts, so the list stays short and every character is copied a constant number of times.
+# A rope is a JavaScript string: it is converted to a Python string (str) by the operations that look at its content,
+# and it is equal to the str with the same content.
+
+min_length = 256  # length from which the result of a concatenation is a rope
+chunk_parts = 1024  # number of short parts at the end of a rope joined in a chunk
+
+
+class Rope:
+    """
+    JavaScript string made of parts, joined when its content is needed
+    """
+    __slots__ = ('parts', 'count', 'chunks', 'length', 'flat')
+
+    def __init__(self, parts, chunks, length):
+        """
+        :param parts: list of the strings that make up the rope (it can be extended by the ropes built from this one)
+        :param chunks: number of parts at the start of the list that are chunks of joined parts
+        :param length: length of the string
+        """
+        self.parts = parts
+        self.count = len(parts)  # the parts of this rope, the list can have more parts appended by other ropes
+        self.chunks = chunks
+        self.length = length
+        self.flat = None  # the joined string, once it has been computed
+
+    def concat(self, string):
+        """
+        :param string: str appended to the rope
+        :return: the rope of the concatenation, this rope is not modified
+        """
+        parts, count, chunks = self.parts, self.count, self.chunks
+        if self.flat is not None:
+            parts, chunks = [self.flat], 1
+        elif count - chunks >= chunk_parts:  # the short parts are joined in a new chunk, in a new list of parts
+            parts = parts[:chunks]
+            parts.append(''.join(self.parts[chunks:count]))
+            chunks += 1
+        elif count != len(parts):  # another rope has appended to the list
+            parts = parts[:count]
+        parts.append(string)
+        return Rope(parts, chunks, self.length + len(string))
+
+    def __str__(self):
+        if self.flat is None:
+            self.flat = ''.join(self.parts[:self.count] if self.count != len(self.parts) else self.parts)
+            self.parts, self.count, self.chunks = None, 0, 0  # the parts are not needed anymore
+        return self.flat
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        return str(self)[index]
+
+    def __eq__(self, other):
+        if type(other) is str or type(other) is Rope:
+            return self.length == len(other) and str(self) == str(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        if type(other) is str or type(other) is Rope:
+            return not self == other
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(str(self))  # like the equal str
+
+    def __repr__(self):
+        return repr(str(self))
+
+    def __reduce__(self):
+        return str, (str(self),)  # a copied or pickled rope is a plain string
+
+
+def concatenate(left, right):
+    """
+    :param left: str or rope
+    :param right: str
+    :return: the concatenation, a rope if it is long
+    """
+    if type(left) is Rope:
+        return left.concat(right)
+    if len(left) + len(right) < min_length:
+        return left + right
+    return Rope([left, right], 0, len(left) + len(right))
+
+
+def flatten(values):
+    """
+    :return: the list of the values, with the ropes converted to str
+    """
+    return [str(value) if type(value) is Rope else value for value in values]
@@ -0,0 +1,223 @@
+# A runtime is a self-contained instance of the interpreter: it owns its global scope (a transformer with its own
+# symbol table) and the options of the execution, so many runtimes can execute programs in the same process (es. in
+# the threads of a pool) without seeing the variables and the functions of each other. The variables of a runtime are
+# kept between its runs, like the lines of the console.
+# The output of the programs goes to the output sink of the runtime (OutputSink.py), flushed at the end of every run.
+# With resource limits (ExecutionLimits.py), every run gets the full budget of steps and time.
+# With a program cache (ProgramCache.py), the parse trees of the programs already seen are reused, and every runtime
+# also keeps the compiled form of its recent programs, which is bound to its global scope.
+# A snapshot of the global scope (Snapshot.py) can be restored into new runtimes, so that a prelude executed once is
+# shared by many runs without executing it again.
+# This module also builds the parser (shared by all the runtimes, because it has no state) and parses the scripts.
+import hashlib
+import os
+import sys
+from collections import OrderedDict
+
+import lark
+from lark import UnexpectedInput
+
+from Compiler import JavaScriptCompiler
+from ErrorClassifier import get_classifier, register_classifier
+from Frame import max_call_depth
+from Optimizer import Optimizer
+from OutputSink import StreamSink
+from ParserCache import load_classifier, load_parser
+from Snapshot import Snapshot
+from SymbolTable import SymbolTable
+from Transformer import TreeToJS
+from VirtualMachine import BytecodeCompiler, VirtualMachine
+from error_handling import *
+
+# Get the path to the 'JavaScript_grammar.lark' file relative to the script location
+script_dir = os.path.dirname(os.path.realpath(__file__))
+grammar_file_path = os.path.join(script_dir, "JavaScript_grammar.lark")
+
+# Now you can use grammar_file_path to access the grammar file
+
+# the grammar is contained in the file JavaScript_grammar.lark, the parser is built (or loaded from the on-disk cache)
+# the first time it is needed, so that the --no-parser-cache flag can be taken into account
+parser = None
+
+
+def get_parser(use_cache=True, propagate_positions=False):
+    """
+    Returns the LALR parser of the JavaScript grammar, building it at the first call together with the map of its
+    syntax errors (see ErrorClassifier.py), both loaded from the on-disk cache when possible
+    :param use_cache: if False the parser is built from the grammar without using the on-disk cache
+    :param propagate_positions: if True the nodes of the parse tree have the line and the column in the script (used
+    by the profiler)
+    :return: the Lark parser
+    """
+    global parser
+    if parser is None:
+        options = {'parser': 'lalr', 'debug': True, 'propagate_positions': propagate_positions}
+        parser = load_parser(grammar_file_path, use_cache=use_cache, **options)
+        register_classifier(parser, load_classifier(parser, grammar_file_path, use_cache=use_cache, **options))
+    return parser
+
+
+def parse(javascript_script, parser=None):
+    """
+    Wrapper for the parser.parse method including error handling
+    :param javascript_script: script given as input from CLI command
+    :param parser: Lark parser to be used (the one returned by get_parser if not specified)
+    :return:
+    """
+    if parser is None:
+        parser = get_parser()
+    try:
+        tree = parser.parse(javascript_script)
+    except UnexpectedInput as u:
+        # find some lexical or syntactic error, the examples have been parsed with the parser (see ErrorClassifier.py)
+        exc_class = get_classifier(parser).classify(u)
+        if not exc_class:
+            raise
+        raise exc_class(u.get_context(javascript_script), u.line, u.column)
+    else:
+        return tree # return the parse tree
+
+
+class Runtime:
+    """
+    This class executes JavaScript programs in an isolated global scope
+    """
+    def __init__(self, engine='compiled', optimize=False, profiler=None, parser=None, cache=None, output=None,
+                 max_call_depth=max_call_depth, memoizer=None, limits=None):
+        """
+        :param engine: 'compiled' (the tree is compiled into closures) or 'vm' (bytecode executed by the virtual
+        machine)
+        :param optimize: if True the parse trees are optimized before the execution (see Optimizer.py)
+        :param profiler: profiler recording the executions (only with the compiled engine)
+        :param parser: Lark parser of the grammar (the one returned by get_parser if not specified)
+        :param cache: ProgramCache of the parse trees, it can be shared by many runtimes (None to parse every program)
+        :param output: output sink of the programs, the standard output (fully buffered) if not specified
+        :param max_call_depth: maximum number of nested JavaScript calls, a deeper call raises a RangeError
+        :param memoizer: Memoizer caching the calls of the pure functions (only with the compiled engine), it must not
+        be shared with other runtimes
+        :param limits: ExecutionLimits of every run (steps, time, size of the arrays and strings), an execution that
+        exceeds them raises ExecutionLimitExceeded
+        """
+        if engine not in ['compiled', 'vm']:
+            raise ValueError('unknown engine ' + repr(engine))
+        self.engine = engine
+        self.profiler = profiler
+        self.max_call_depth = max_call_depth
+        self.memoizer = memoizer
+        self.limits = limits
+        self.parser = parser if parser is not None else get_parser()
+        self.output = output if output is not None else StreamSink(flush_policy='full')
+        self.transformer = TreeToJS(SymbolTable(), self.output)  # it holds the global scope of the runtime
+        if limits is not None:
+            limits.install(self.transformer)
+        self.optimizer = Optimizer(self.transformer) if optimize else None
+        self.cache = cache
+        self.compiled = OrderedDict()  # key of the program -> compiled program, from the least recently used
+        # the parse trees depend on the grammar, on the Lark version, on the positions and on the optimizations
+        with open(grammar_file_path, 'r') as f:
+            self.grammar_digest = hashlib.sha256(f.read().encode('utf8')).hexdigest()
+        self.cache_namespace = '%s:%s:%s:%s:%s' % (self.grammar_digest, lark.__version__, sys.version_info[:2],
+                                                   self.parser.options.propagate_positions, optimize)
+
+    @property
+    def globals(self):
+        """
+        :return: the symbol table of the global scope
+        """
+        return self.transformer.symbol_table
+
+    def reset(self):
+        """
+        Discards the global variables and functions declared by the previous runs
+        """
+        # the table is emptied in place, so the compiled programs (which refer to it) stay valid
+        self.transformer.symbol_table.table.clear()
+
+    def snapshot(self):
+        """
+        :return: the Snapshot of the global variables and functions declared by the previous runs
+        """
+        return Snapshot.of(self)
+
+    def restore(self, snapshot):
+        """
+        Declares the global variables and functions of a snapshot, replacing the ones with the same names
+        :param snapshot: Snapshot taken from a runtime (of any engine), it is not modified and can be shared
+        """
+        self.execute(snapshot.restore(self))
+
+    def parse(self, source):
+        """
+        :return: the parse tree of the program, it raises the lexical and syntax errors like the parse function
+        """
+        return parse(source, self.parser)
+
+    def optimize(self, tree):
+        """
+        :return: the parse tree to be executed, optimized if the runtime has been created with optimize=True
+        """
+        return self.optimizer.optimize(tree) if self.optimizer is not None else tree
+
+    def compile(self, tree):
+        """
+        :param tree: parse tree returned by the parser or by the optimize method
+        :return: a function without arguments that executes the program and returns its value
+        """
+        count_steps = self.limits is not None and self.limits.counts_steps
+        if self.engine == 'vm':
+            code = BytecodeCompiler(self.transformer, count_steps).compile(tree)
+            machine = VirtualMachine(self.transformer, self.max_call_depth, self.limits if count_steps else None)
+            return lambda: machine.run(code)
+        return JavaScriptCompiler(self.transformer, self.profiler, self.max_call_depth, self.memoizer,
+                                  self.limits).compile(tree)
+
+    def execute(self, tree):
+        """
+        Executes the parse tree of a program
+        :param tree: parse tree returned by the parser or by the optimize method
+        :return: the value of the program
+        """
+        return self.call(self.compile(tree))
+
+    def call(self, program):
+        """
+        Executes a compiled program, flushing its output at the end (also when the program raises an error)
+        :param program: function returned by the compile method
+        :return: the value of the program
+        """
+        if self.limits is not None:
+            self.limits.start()
+        try:
+            return program()
+        finally:
+            self.output.flush()
+
+    def run(self, source):
+        """
+        Parses and executes a program
+        :param source: JavaScript source code
+        :return: the value of the program (es. the value printed by the console)
+        """
+        return self.call(self.program(source))
+
+    def program(self, source):
+        """
+        :param source: JavaScript source code
+        :return: the compiled program, taken from the cache if the runtime has one
+        """
+        if self.cache is None:
+            return self.compile(self.optimize(self.parse(source)))
+        key = self.cache.key(source, self.cache_namespace)
+        program = self.compiled.get(key)
+        if program is None:
+            tree = self.cache.get(key)
+            if tree is None:
+                tree = self.optimize(self.parse(source))
+                self.cache.put(key, tree)
+            program = self.compiled[key] = self.compile(tree)
+            if len(self.compiled) > self.cache.max_entries:
+                self.compiled.popitem(last=False)
+        else:
+            self.compiled.move_to_end(key)
+            self.cache.hits += 1
+        return program
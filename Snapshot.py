@@ -0,0 +1,114 @@
+# Snapshot of the global scope of a runtime, to start new runtimes from a program already executed (es. a prelude of
+# functions and constant tables shared by many scripts) without executing it again.
+# The snapshot keeps the attributes of the global variables (their declaration and value) and the parse trees of the
+# global functions (with their parameters and body). It is written as a compressed pickle, together with the digest of
+# the grammar and the Lark version, because the parse trees depend on them.
+# Restoring a snapshot into a runtime is copy-on-write: the global symbol table of the runtime gets the attributes of
+# the snapshot without copying them (the assignments replace the attributes in the table of the runtime, never modify
+# them), so many runtimes can share one snapshot. The arrays, which are modified in place by the assignments to their
+# cells, are copy-on-write copies (JSArray.py): a runtime copies the storage of an array only when it writes it. The
+# functions are compiled again for the runtime, because the compiled code is bound to
+# the global scope (and to the engine) of the runtime: compiling them is much faster than parsing and executing the
+# prelude, and the names of their rules are stored as plain strings, which the compilers compare faster.
+import copy
+import pickle
+import zlib
+
+import lark
+from lark import Token, Tree
+
+from JSArray import JSArray
+
+format_version = 3  # version of the file format, a snapshot of another version cannot be restored
+
+
+def function_declaration(identifier, attributes):
+    """
+    :param identifier: name of a global function
+    :param attributes: attributes of the function in the symbol table
+    :return: the parse tree of the declaration of the function
+    """
+    parameter_list = list(attributes['parameter_list'])
+    children = [Token('FUNCTION', 'function'), Token('IDENTIFIER', identifier), Token('LPAR', '(')]
+    if len(parameter_list) == 1:
+        children.append(parameter_list[0])
+    elif parameter_list:
+        children.append(Tree('parameter_list', parameter_list))
+    children += [Token('RPAR', ')'), attributes['body']]
+    return Tree('function_declaration', children)
+
+
+class Snapshot:
+    """
+    Global variables and functions of a runtime, which can be restored into other runtimes
+    """
+    def __init__(self, variables, functions, grammar_digest):
+        """
+        :param variables: identifier -> attributes of each global variable
+        :param functions: parse tree of a program declaring the global functions
+        :param grammar_digest: sha256 digest of the grammar that has parsed the functions
+        """
+        self.variables = variables
+        self.functions = functions
+        self.grammar_digest = grammar_digest
+
+    @classmethod
+    def of(cls, runtime):
+        """
+        :return: the snapshot of the global scope of the runtime
+        """
+        variables = {}
+        declarations = []
+        for identifier, attributes in runtime.globals.table.items():
+            if attributes['declaration'] == 'function':
+                declarations.append(function_declaration(identifier, attributes))
+            else:
+                variables[identifier] = attributes
+        functions = copy.deepcopy(Tree('start', declarations))
+        for subtree in functions.iter_subtrees():
+            # the names of the rules are tokens, compared with the strings much more slowly than plain strings
+            subtree.data = str(subtree.data)
+        # the arrays are copied (copy-on-write), the program that has built them can still modify them
+        return cls(copy.deepcopy(variables), functions, runtime.grammar_digest)
+
+    def restore(self, runtime):
+        """
+        Declares the global variables of the snapshot in the runtime, replacing the ones with the same names
+        :return: the parse tree of the program declaring the functions, to be executed by the runtime
+        """
+        if self.grammar_digest != runtime.grammar_digest:
+            raise ValueError('the snapshot has been taken with another version of the grammar')
+        table = runtime.globals.table
+        memo = {}  # the arrays referenced by many variables stay shared by them
+        for identifier, attributes in self.variables.items():
+            if type(attributes['value']) is JSArray:  # the other values are immutable
+                attributes = copy.deepcopy(attributes, memo)
+            table[identifier] = attributes
+        return self.functions
+
+    def dumps(self):
+        """
+        :return: the snapshot in binary form
+        """
+        data = (format_version, lark.__version__, self.grammar_digest, self.variables, self.functions)
+        return zlib.compress(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+
+    @classmethod
+    def loads(cls, data):
+        """
+        :param data: snapshot in binary form, returned by dumps
+        :return: the snapshot
+        """
+        version, lark_version, grammar_digest, variables, functions = pickle.loads(zlib.decompress(data))
+        if version != format_version or lark_version != lark.__version__:
+            raise ValueError('the snapshot has been written by another version of the interpreter or of Lark')
+        return cls(variables, functions, grammar_digest)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.dumps())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.loads(f.read())
@@ -1,6 +1,11 @@
 # The symbol table is organized as a dictionary,
-# where the keys are the variable identifiers and the values are the attributes
+# where the keys are the variable identifiers and the values are the attributes.
+# Each block scope (if, while, function body) has its own symbol table, linked to the symbol table of the enclosing
+# scope through the parent attribute. Entering and leaving a scope is O(1), no symbol table is ever copied, thus
+# updates of outer variables are made on the real binding.
 from error_handling import *
+from JSArray import JSArray
+from Rope import Rope
 
 
 class SymbolTable:
@@ -10,6 +15,57 @@ class SymbolTable:
         self.table = initial_state
         self.parent = parent
 
+    def push(self):
+        """
+        Creates the symbol table of a new scope nested in the current one
+        :return: the symbol table of the new scope
+        """
+        return SymbolTable(parent=self)
+
+    def pop(self):
+        """
+        Leaves the current scope, its bindings are discarded
+        :return: the symbol table of the enclosing scope
+        """
+        return self.parent
+
+    @staticmethod
+    def js_type(value_type):
+        """
+        :param value_type: Python type of a value
+        :return: the corresponding JavaScript type
+        """
+        if value_type == float:
+            return 'Number'
+        elif value_type == str or value_type == Rope:
+            return 'String'
+        elif value_type == bool:
+            return 'Boolean'
+        elif value_type == JSArray:
+            return 'Array'
+        return value_type
+
+    @staticmethod
+    def attributes(declaration, value):
+        """
+        :return: the attributes of a variable with the given declaration and value
+        """
+        return {'declaration': declaration, 'value': value, 'type': SymbolTable.js_type(type(value))}
+
+    def lookup(self, identifier):
+        """
+        Searches the identifier in the current symbol table and then in the enclosing ones until the root (with a loop,
+        so that the search does not recurse once per scope)
+        :param identifier: JavaScript variable binding
+        :return: the dictionary of the scope where the identifier is declared, None if it is not declared
+        """
+        symbol_table = self
+        while symbol_table is not None:
+            if identifier in symbol_table.table:
+                return symbol_table.table
+            symbol_table = symbol_table.parent
+        return None
+
     def insert(self, identifier, attributes):
         """
         Inserts a new identifier in the symbol table
@@ -17,15 +73,7 @@ class SymbolTable:
         :param attributes: can be another dictionary, containing the variable attributes
         :return: None
         """
-        if attributes['type']:
-            if attributes['type'] == float:
-                attributes['type'] = 'Number'
-            elif attributes['type'] == str:
-                attributes['type'] = 'String'
-            elif attributes['type'] == bool:
-                attributes['type'] = 'Boolean'
-            elif attributes['type'] == list:
-                attributes['type'] = 'Array'
+        attributes['type'] = self.js_type(attributes['type'])
         self.table[identifier] = attributes
 
     def exist(self, identifier):
@@ -34,13 +82,7 @@ class SymbolTable:
         :param identifier: JavaScript variable binding
         :return: True if the identifier exists, False otherwise
         """
-        # search in the current symbol table, if not search in the parent symbol table until the root
-        if identifier in self.table.keys():
-            return True
-        elif self.parent is not None:
-            return self.parent.exist(identifier)
-        else:
-            return False
+        return self.lookup(identifier) is not None
 
     def find(self, identifier):
         """
@@ -48,13 +90,10 @@ class SymbolTable:
         :param identifier: JavaScript variable binding
         :return: the attributes of the required identifier
         """
-        # search in the current symbol table, if not search in the parent symbol table until the root
-        if identifier in self.table.keys():
-            return self.table[identifier]
-        elif self.parent is not None:
-            return self.parent.find(identifier)
-        else:
+        table = self.lookup(identifier)
+        if table is None:
             raise ReferenceError
+        return table[identifier]
 
     def delete(self, identifier):
         """
@@ -62,13 +101,10 @@ class SymbolTable:
         :param identifier: JavaScript variable binding
         :return: None
         """
-        # search in the current symbol table, if not search in the parent symbol table until the root
-        if identifier in self.table.keys():
-            del self.table[identifier]
-        elif self.parent is not None:
-            self.parent.delete(identifier)
-        else:
+        table = self.lookup(identifier)
+        if table is None:
             raise ReferenceError
+        del table[identifier]
 
     def update(self, identifier, attributes):
         """
@@ -78,22 +114,8 @@ class SymbolTable:
         :return: None
         """
         # assign the corresponding JavaScript type to the variable
-        if attributes['type']:
-            if attributes['type'] == float:
-                attributes['type'] = 'Number'
-            elif attributes['type'] == str:
-                attributes['type'] = 'String'
-            elif attributes['type'] == bool:
-                attributes['type'] = 'Boolean'
-            elif attributes['type'] == list:
-                attributes['type'] = 'Array'
-        # search in the current symbol table, if not search in the parent symbol table until the root
-        if identifier in self.table.keys():
-            self.table[identifier] = attributes
-        elif self.parent is not None:
-            self.parent.update(identifier, attributes)
-        else:
+        attributes['type'] = self.js_type(attributes['type'])
+        table = self.lookup(identifier)
+        if table is None:
             raise ReferenceError
-
-# create an instance of symbol table
-symbol_table = SymbolTable()
+        table[identifier] = attributes
@@ -4,7 +4,12 @@
 # node, creating a new structure. When the transformer doesn't find the method for a node, it simply returns the node.
 
 from lark.visitors import Transformer
+from coercion import add_table, sub_table, mul_table, div_table, add_same_type, nan, to_number
 from error_handling import *
+from JSArray import JSArray
+from js_values import undefined, NaN, truthy, divide, display
+from OutputSink import StreamSink
+from Rope import Rope, concatenate, flatten
 
 
 class TreeToJS(Transformer):
@@ -12,23 +17,37 @@ class TreeToJS(Transformer):
     This class extends Lark's transformer class, which provides a convenient interface to process the parse tree that
     Lark returns. Each method of the class corresponds to one of the rules in the grammar.
     """
-    def __init__(self, symbol_table):
+    def __init__(self, symbol_table, output=None):
+        """
+        :param symbol_table: symbol table of the global scope
+        :param output: output sink of console.log (see OutputSink.py), the standard output if not specified
+        """
         super().__init__()
         self.symbol_table = symbol_table
+        self.output = output if output is not None else StreamSink()
 
-    @staticmethod
-    def print_statement(args):
+    def print_statement(self, args):
         if not args:
-            print('undefined')  # when no message is specified (this changes if executed in Chrome console or in replit workspace)
+            self.output.write('undefined\n')  # when no message is specified (this changes if executed in Chrome console or in replit workspace)
         else:
-            print(args[0])
+            self.output.write(display(args[0]) + '\n')
+
+    def input_statement(self, args):
+        self.prompt(args)
+        return self.input_value(input())
+
+    def prompt(self, args):
+        """
+        Writes the message of an input statement, before the input is read
+        """
+        self.output.prompt(str(args[0]) if args else '')  # the input message, where the input is typed
 
     @staticmethod
-    def input_statement(args):
-        if not args:
-            x = input()  # when no input message is specified
-        else:
-            x = input(args[0])
+    def input_value(x):
+        """
+        :param x: line read as input
+        :return: the value of the input statement, a number if the line is a number, otherwise the line
+        """
         try:
             x = int(x)
         except ValueError:
@@ -44,25 +63,25 @@ class TreeToJS(Transformer):
                 if args[1].value in reserved_words:  # check that the chosen identifier can be used
                     wrong_id = args[1].value
                     raise ReservedWordAsIdentifier
-                if args[1].value in self.symbol_table.table.keys() and \
-                        self.symbol_table.find(args[1].value)['declaration'] == 'let':
+                if args[1].value in self.symbol_table.table and \
+                        self.symbol_table.table[args[1].value]['declaration'] == 'let':
                     raise IdentifierAlreadyDeclared
                 else:
-                    self.symbol_table.insert(args[1].value, {'declaration': args[0].value, 'value': 'undefined',
+                    self.symbol_table.insert(args[1].value, {'declaration': args[0].value, 'value': undefined,
                                                         'type': 'undefined'})
-                return 'undefined'
+                return undefined
 
             elif len(args) == 3:  # variable assignment (es. a = 2) there is included also the assignment of an array to a binding (es. a = [1,2,3])
                 if args[0].value in reserved_words:
                     wrong_id = args[0].value
                     raise ReservedWordAsIdentifier
-                if self.symbol_table.exist(args[0].value):
-                    if self.symbol_table.find(args[0].value)['declaration'] == 'const':
+                scope = self.symbol_table.lookup(args[0].value)  # the variable is searched only once
+                if scope is not None:
+                    declaration = scope[args[0].value]['declaration']
+                    if declaration == 'const':
                         raise ConstAssignmentTypeError
                     else:
-                        self.symbol_table.update(args[0].value,
-                                            {'declaration': self.symbol_table.find(args[0].value)['declaration'],
-                                             'value': args[2], 'type': type(args[2])})
+                        scope[args[0].value] = self.symbol_table.attributes(declaration, args[2])
                 else:  # the variable has not been declared yet
                     self.symbol_table.insert(args[0].value, {'declaration': 'var', 'value': args[2], 'type': type(args[2])})
                 return args[2]
@@ -73,103 +92,62 @@ class TreeToJS(Transformer):
                     raise ReservedWordAsIdentifier
 
                 # var declaration has not a scope and can be redeclared
-                if self.symbol_table.exist(args[1].value) and self.symbol_table.find(args[1].value)['declaration'] == 'var':
-                    self.symbol_table.update(args[1].value, {'declaration': args[0].value, 'value': args[3],
-                                                             'type': type(args[3])})
+                scope = self.symbol_table.lookup(args[1].value)
+                if scope is not None and scope[args[1].value]['declaration'] == 'var':
+                    scope[args[1].value] = self.symbol_table.attributes(args[0].value, args[3])
 
-                elif args[1].value in self.symbol_table.table.keys():  # the variable has already been declared in the current scope
-                    if self.symbol_table.find(args[1].value)['declaration'] in ['let', 'const']:
+                elif args[1].value in self.symbol_table.table:  # the variable has already been declared in the current scope
+                    if self.symbol_table.table[args[1].value]['declaration'] in ['let', 'const']:
                         raise IdentifierAlreadyDeclared
                 else:
                     self.symbol_table.insert(args[1].value, {'declaration': args[0].value, 'value': args[3],
                                                         'type': type(args[3])})
-                return 'undefined'
+                return undefined
 
             elif len(args) == 6:  # assignment to a cell of the array
                 if args[0].value in reserved_words:
                     wrong_id = args[0].value
                     raise ReservedWordAsIdentifier
-                if self.symbol_table.exist(args[0].value):
-                    arr = self.symbol_table.find(args[0].value)['value']
-                    if args[2] >= len(arr):
-                        # pad intermediate cells with undefined
-                        for i in range(len(arr), args[2]):
-                            arr.append('undefined')
-                        arr.append(args[5])
-                    else:
-                        arr[args[2]] = args[5]  # update the value
-                    self.symbol_table.update(args[0].value, {'declaration': self.symbol_table.find(args[0].value)['declaration'],
-                                                    'value': arr, 'type': type(arr)})
+                scope = self.symbol_table.lookup(args[0].value)
+                if scope is not None:
+                    # the array is modified in place, its binding does not change
+                    self.set_element(scope[args[0].value]['value'], args[2], args[5])
         except IdentifierAlreadyDeclared:
-            print('SyntaxError: Identifier ' + args[1].value + ' has already been declared') # print customized error messages
+            self.output.write('SyntaxError: Identifier ' + args[1].value + ' has already been declared\n') # print customized error messages
         except ConstAssignmentTypeError:
-            print('TypeError: Assignment to constant variable')
+            self.output.write('TypeError: Assignment to constant variable\n')
         except ReservedWordAsIdentifier:
-            print('SyntaxError: Unexpected token ' + wrong_id)
+            self.output.write('SyntaxError: Unexpected token ' + wrong_id + '\n')
 
     def variable_assignment(self, args):
-        if args[0] == '++':  # pre increment
-            value = self.symbol_table.find(args[1])['value']
-            if type(value) in [int, float]:
-                value += 1
-                self.symbol_table.update(args[1], {'declaration': self.symbol_table.find(args[1])['declaration'], 'value': value,
-                                              'type': type(value)})
-            else:
-                value = 'NaN'
-                self.symbol_table.update(args[1], {'declaration': self.symbol_table.find(args[1])['declaration'], 'value': 'NaN',
-                                              'type': 'NaN'})
-            return value
-        elif args[0] == '--':  # pre decrement
-            value = self.symbol_table.find(args[1])['value']
-            if type(value) in [int, float]:
-                value -= 1
-                self.symbol_table.update(args[1], {'declaration': self.symbol_table.find(args[1])['declaration'], 'value': value,
-                                              'type': type(value)})
-            else:
-                value = 'NaN'
-                self.symbol_table.update(args[1], {'declaration': self.symbol_table.find(args[1])['declaration'], 'value': 'NaN',
-                                              'type': 'NaN'})
-            return value
-        elif args[1] == '+=':
-            value = self.add([self.symbol_table.find(args[0])['value'], args[2]])
-            self.symbol_table.update(args[0], {'declaration': self.symbol_table.find(args[0])['declaration'], 'value': value,
-                                          'type': type(value)})
-            return value
-        elif args[1] == '-=':
-            value = self.sub([self.symbol_table.find(args[0])['value'], args[2]])
-            self.symbol_table.update(args[0], {'declaration': self.symbol_table.find(args[0])['declaration'], 'value': value,
-                                          'type': type(value)})
-            return value
-        elif args[1] == '*=':
-            value = self.mul([self.symbol_table.find(args[0])['value'], args[2]])
-            self.symbol_table.update(args[0], {'declaration': self.symbol_table.find(args[0])['declaration'], 'value': value,
-                                          'type': type(value)})
-            return value
-        elif args[1] == '/=':
-            value = self.div([self.symbol_table.find(args[0])['value'], args[2]])
-            self.symbol_table.update(args[0], {'declaration': self.symbol_table.find(args[0])['declaration'], 'value': value,
-                                          'type': type(value)})
-            return value
-        elif args[1] == '++':  # post increment
-            value = self.symbol_table.find(args[0])['value']
-            if type(value) in [int, float]:
-                self.symbol_table.update(args[0], {'declaration': self.symbol_table.find(args[0])['declaration'],
-                                              'value': value + 1, 'type': type(value + 1)})
-            else:
-                value = 'NaN'
-                self.symbol_table.update(args[0], {'declaration': self.symbol_table.find(args[0])['declaration'], 'value': 'NaN',
-                                              'type': 'NaN'})
-            return value
-        elif args[1] == '--':  # post decrement
-            value = self.symbol_table.find(args[0])['value']
-            if type(value) in [int, float]:
-                self.symbol_table.update(args[0], {'declaration': self.symbol_table.find(args[0])['declaration'],
-                                              'value': value - 1, 'type': type(value - 1)})
-            else:
-                value = 'NaN'
-                self.symbol_table.update(args[0], {'declaration': self.symbol_table.find(args[0])['declaration'], 'value': 'NaN',
-                                              'type': 'NaN'})
-            return value
+        if args[0] in ['++', '--']:  # pre increment and pre decrement
+            identifier, operator = args[1], args[0]
+        else:
+            identifier, operator = args[0], args[1]
+        scope = self.symbol_table.lookup(identifier)  # the variable is searched only once
+        if scope is None:
+            raise ReferenceError
+        attributes = scope[identifier]
+        value = attributes['value']
+        if operator == '+=':
+            value = result = self.add([value, args[2]])
+        elif operator == '-=':
+            value = result = self.sub([value, args[2]])
+        elif operator == '*=':
+            value = result = self.mul([value, args[2]])
+        elif operator == '/=':
+            value = result = self.div([value, args[2]])
+        elif type(value) in [int, float]:  # increment and decrement
+            result = value + 1 if operator == '++' else value - 1
+            if args[0] == operator:  # the pre increment and pre decrement return the new value
+                value = result
+            else:  # the post increment and post decrement return the old value
+                value, result = result, value
+        else:
+            scope[identifier] = {'declaration': attributes['declaration'], 'value': NaN, 'type': 'NaN'}
+            return NaN
+        scope[identifier] = self.symbol_table.attributes(attributes['declaration'], value)
+        return result
 
     @staticmethod
     def return_statement(args):
@@ -177,11 +155,11 @@ class TreeToJS(Transformer):
 
     @staticmethod
     def logical_and(args):
-        return args[0] and args[1]
+        return args[1] if truthy(args[0]) else args[0]
 
     @staticmethod
     def logical_or(args):
-        return args[0] or args[1]
+        return args[0] if truthy(args[0]) else args[1]
 
     @staticmethod
     def equality(args):
@@ -191,6 +169,7 @@ class TreeToJS(Transformer):
         if type(args[0]) in [float, int] and type(args[1]) in [float, int]:
             return args[0] == args[1]
         else:
+            args = flatten(args)  # the content of the ropes is compared
             if type(args[0]) == str and type(args[1]) in [float, int]:
                 try:
                     return int(args[0]) == args[1]
@@ -228,6 +207,7 @@ class TreeToJS(Transformer):
         if type(args[0]) in [float, int] and type(args[1]) in [float, int]:
             return args[0] != args[1]
         else:
+            args = flatten(args)  # the content of the ropes is compared
             if type(args[0]) == str and type(args[1]) in [float, int]:
                 try:
                     return int(args[0]) != args[1]
@@ -275,7 +255,7 @@ class TreeToJS(Transformer):
 
     @staticmethod
     def array(args):
-        return args
+        return JSArray(args)
 
     @staticmethod
     def greater_than(args):
@@ -286,6 +266,7 @@ class TreeToJS(Transformer):
         if type(args[0]) in [float, int] and type(args[1]) in [float, int]:
             return args[0] > args[1]
         else:
+            args = flatten(args)  # the content of the ropes is compared
             if type(args[0]) == str and type(args[1]) in [float, int]:
                 try:
                     return int(args[0]) > args[1]
@@ -324,6 +305,7 @@ class TreeToJS(Transformer):
         if type(args[0]) in [float, int] and type(args[1]) in [float, int]:
             return args[0] >= args[1]
         else:
+            args = flatten(args)  # the content of the ropes is compared
             if type(args[0]) == str and type(args[1]) in [float, int]:
                 try:
                     return int(args[0]) >= args[1]
@@ -362,6 +344,7 @@ class TreeToJS(Transformer):
         if type(args[0]) in [float, int] and type(args[1]) in [float, int]:
             return args[0] < args[1]
         else:
+            args = flatten(args)  # the content of the ropes is compared
             if type(args[0]) == str and type(args[1]) in [float, int]:
                 try:
                     return int(args[0]) < args[1]
@@ -400,6 +383,7 @@ class TreeToJS(Transformer):
         if type(args[0]) in [float, int] and type(args[1]) in [float, int]:
             return args[0] <= args[1]
         else:
+            args = flatten(args)  # the content of the ropes is compared
             if type(args[0]) == str and type(args[1]) in [float, int]:
                 try:
                     return int(args[0]) <= args[1]
@@ -432,282 +416,50 @@ class TreeToJS(Transformer):
     @staticmethod
     def add(args):
         """
-        This method is used to add two values. It simulates the JavaScript type coercion
+        This method is used to add two values. It simulates the JavaScript type coercion (see coercion.py)
         """
-        if type(args[0]) in [float, int, bool] and type(args[1]) in [float, int, bool] or type(args[0]) == type(args[1]):
-            return args[0] + args[1]
-        else:
-            if type(args[0]) == str and type(args[1]) in [float, int]:
-                return args[0] + str(args[1])
-            elif type(args[0]) in [float, int] and type(args[1]) == str:
-                return str(args[0]) + args[1]
-            elif type(args[0]) == str and type(args[1]) == bool:
-                if args[1]:
-                    return args[0] + "true"
-                else:
-                    return args[0] + "false"
-            elif type(args[0]) == bool and type(args[1]) == str:
-                if args[0]:
-                    return "true" + args[1]
-                else:
-                    return "false" + args[1]
-            else:
-                return 'NaN'
+        left, right = args
+        left_type, right_type = type(left), type(right)
+        if (left_type is int or left_type is float) and (right_type is int or right_type is float):  # fast path
+            return left + right
+        return add_table.get((left_type, right_type), add_same_type)(left, right)
 
     @staticmethod
     def sub(args):
         """
-        This method is used to subtract two values. It simulates the JavaScript type coercion
+        This method is used to subtract two values. It simulates the JavaScript type coercion (see coercion.py)
         """
-        if type(args[0]) in [float, int, bool] and type(args[1]) in [float, int, bool]:
-            return args[0] - args[1]
-        else:
-            if type(args[0]) == str and type(args[1]) in [float, int]:
-                try:
-                    return int(args[0]) - args[1]
-                except ValueError:
-                    try:
-                        return float(args[0]) - args[1]
-                    except ValueError:
-                        return 'NaN'
-            elif type(args[0]) in [float, int] and type(args[1]) == str:
-                try:
-                    return args[0] - int(args[1])
-                except ValueError:
-                    try:
-                        return args[0] - float(args[1])
-                    except ValueError:
-                        return 'NaN'
-            elif type(args[0]) in [float, int] and type(args[1]) == bool:
-                if args[1]:
-                    return args[0] - 1
-                else:
-                    return args[0] - 0
-            elif type(args[0]) == bool and type(args[1]) in [float, int]:
-                if args[0]:
-                    return 1 - args[1]
-                else:
-                    return 0 - args[1]
-            elif type(args[0]) == bool and type(args[1]) == str:
-                if args[0]:
-                    try:
-                        return 1 - int(args[1])
-                    except ValueError:
-                        try:
-                            return 1 - float(args[1])
-                        except ValueError:
-                            return 'NaN'
-                else:
-                    try:
-                        return 0 - int(args[1])
-                    except ValueError:
-                        try:
-                            return 0 - float(args[1])
-                        except ValueError:
-                            return 'NaN'
-            elif type(args[0]) == str and type(args[1]) == bool:
-                if args[1]:
-                    try:
-                        return int(args[0]) - 1
-                    except ValueError:
-                        try:
-                            return float(args[0]) - 1
-                        except ValueError:
-                            return 'NaN'
-                else:
-                    try:
-                        return int(args[0]) - 0
-                    except ValueError:
-                        try:
-                            return float(args[0]) - 0
-                        except ValueError:
-                            return 'NaN'
-            elif type(args[0]) == str and type(args[1]) == str:
-                try:
-                    return int(args[0]) - int(args[1])
-                except ValueError:
-                    try:
-                        return float(args[0]) - float(args[1])
-                    except ValueError:
-                        try:
-                            return int(args[0]) - float(args[1])
-                        except ValueError:
-                            try:
-                                return float(args[0]) - int(args[1])
-                            except ValueError:
-                                return 'NaN'
-            else:
-                return 'NaN'
+        left, right = args
+        left_type, right_type = type(left), type(right)
+        # fast path of the most common case, the numbers (the booleans are handled by the dispatch table)
+        if (left_type is int or left_type is float) and (right_type is int or right_type is float):
+            return left - right
+        return sub_table.get((left_type, right_type), nan)(left, right)
 
     @staticmethod
     def mul(args):
         """
-        This method is used to multiply two values. It simulates the JavaScript type coercion
+        This method is used to multiply two values. It simulates the JavaScript type coercion (see coercion.py)
         """
-        if type(args[0]) in [float, int, bool] and type(args[1]) in [float, int, bool]:
-            return args[0] * args[1]
-        else:
-            if type(args[0]) == str and type(args[1]) in [float, int]:
-                try:
-                    return int(args[0]) * args[1]
-                except ValueError:
-                    try:
-                        return float(args[0]) * args[1]
-                    except ValueError:
-                        return 'NaN'
-            elif type(args[0]) in [float, int] and type(args[1]) == str:
-                try:
-                    return args[0] * int(args[1])
-                except ValueError:
-                    try:
-                        return args[0] * float(args[1])
-                    except ValueError:
-                        return 'NaN'
-            elif type(args[0]) in [float, int] and type(args[1]) == bool:
-                if args[1]:
-                    return args[0] * 1
-                else:
-                    return args[0] * 0
-            elif type(args[0]) == bool and type(args[1]) in [float, int]:
-                if args[0]:
-                    return 1 * args[1]
-                else:
-                    return 0 * args[1]
-            elif type(args[0]) == bool and type(args[1]) == str:
-                if args[0]:
-                    try:
-                        return 1 * int(args[1])
-                    except ValueError:
-                        try:
-                            return 1 * float(args[1])
-                        except ValueError:
-                            return 'NaN'
-                else:
-                    try:
-                        return 0 * int(args[1])
-                    except ValueError:
-                        try:
-                            return 0 * float(args[1])
-                        except ValueError:
-                            return 'NaN'
-            elif type(args[0]) == str and type(args[1]) == bool:
-                if args[1]:
-                    try:
-                        return int(args[0]) * 1
-                    except ValueError:
-                        try:
-                            return float(args[0]) * 1
-                        except ValueError:
-                            return 'NaN'
-                else:
-                    try:
-                        return int(args[0]) * 0
-                    except ValueError:
-                        try:
-                            return float(args[0]) * 0
-                        except ValueError:
-                            return 'NaN'
-            elif type(args[0]) == str and type(args[1]) == str:
-                try:
-                    return int(args[0]) * int(args[1])
-                except ValueError:
-                    try:
-                        return float(args[0]) * float(args[1])
-                    except ValueError:
-                        try:
-                            return int(args[0]) * float(args[1])
-                        except ValueError:
-                            try:
-                                return float(args[0]) * int(args[1])
-                            except ValueError:
-                                return 'NaN'
-            else:
-                return 'NaN'
+        left, right = args
+        left_type, right_type = type(left), type(right)
+        if (left_type is int or left_type is float) and (right_type is int or right_type is float):
+            return left * right
+        return mul_table.get((left_type, right_type), nan)(left, right)
 
     @staticmethod
     def div(args):
         """
-        This method is used to divide two values. It simulates the JavaScript type coercion
+        This method is used to divide two values. It simulates the JavaScript type coercion (see coercion.py)
         """
-        if type(args[0]) in [float, int, bool] and type(args[1]) in [float, int, bool]:
-            return args[0] / args[1]
-        else:
-            if type(args[0]) == str and type(args[1]) in [float, int]:
-                try:
-                    return int(args[0]) / args[1]
-                except ValueError:
-                    try:
-                        return float(args[0]) / args[1]
-                    except ValueError:
-                        return 'NaN'
-            elif type(args[0]) in [float, int] and type(args[1]) == str:
-                try:
-                    return args[0] / int(args[1])
-                except ValueError:
-                    try:
-                        return args[0] / float(args[1])
-                    except ValueError:
-                        return 'NaN'
-            elif type(args[0]) in [float, int] and type(args[1]) == bool:
-                if args[1]:
-                    return args[0] / 1
-                else:
-                    return args[0] / 0
-            elif type(args[0]) == bool and type(args[1]) in [float, int]:
-                if args[0]:
-                    return 1 / args[1]
-                else:
-                    return 0 / args[1]
-            elif type(args[0]) == bool and type(args[1]) == str:
-                if args[0]:
-                    try:
-                        return 1 / int(args[1])
-                    except ValueError:
-                        try:
-                            return 1 / float(args[1])
-                        except ValueError:
-                            return 'NaN'
-                else:
-                    try:
-                        return 0 / int(args[1])
-                    except ValueError:
-                        try:
-                            return 0 / float(args[1])
-                        except ValueError:
-                            return 'NaN'
-            elif type(args[0]) == str and type(args[1]) == bool:
-                if args[1]:
-                    try:
-                        return int(args[0]) / 1
-                    except ValueError:
-                        try:
-                            return float(args[0]) / 1
-                        except ValueError:
-                            return 'NaN'
-                else:
-                    try:
-                        return int(args[0]) / 0
-                    except ValueError:
-                        try:
-                            return float(args[0]) / 0
-                        except ValueError:
-                            return 'NaN'
-            elif type(args[0]) == str and type(args[1]) == str:
-                try:
-                    return int(args[0]) / int(args[1])
-                except ValueError:
-                    try:
-                        return float(args[0]) / float(args[1])
-                    except ValueError:
-                        try:
-                            return int(args[0]) / float(args[1])
-                        except ValueError:
-                            try:
-                                return float(args[0]) / int(args[1])
-                            except ValueError:
-                                return 'NaN'
-            else:
-                return 'NaN'
+        left, right = args
+        left_type, right_type = type(left), type(right)
+        if (left_type is int or left_type is float) and (right_type is int or right_type is float):
+            try:
+                return left / right
+            except ZeroDivisionError:
+                return divide(left, right)
+        return div_table.get((left_type, right_type), nan)(left, right)
 
     @staticmethod
     def negative(args):
@@ -721,52 +473,41 @@ class TreeToJS(Transformer):
                 return -1
             else:
                 return -0
-        elif type(args[0]) == str:
-            try:
-                return - int(args[0])
-            except ValueError:
-                try:
-                    return - float(args[0])
-                except ValueError:
-                    return 'NaN'
+        elif type(args[0]) == str or type(args[0]) == Rope:
+            return - to_number(str(args[0]))
         else:
-            return 'NaN'
+            return NaN
 
     @staticmethod
     def logical_not(args):
         """
         This method is used to negate a boolean value. It simulates the JavaScript type coercion
         """
-        if type(args[0]) == bool:
-            return not args[0]
-        elif type(args[0]) == float:
-            if args[0] == 0:
-                return True
-            else:
-                return False
-        elif type(args[0]) == str:
-            if args[0] == '':
-                return True
-            else:
-                return False
-        else:
-            return False
+        return not truthy(args[0])
 
     @staticmethod
     def template_literal(args):
-        temp = ""
+        if args and type(args[0]) == Rope:  # es. s = `${s}...`, the rope is extended without copying it
+            head, args = args[0], args[1:]
+        else:
+            head = None
+        parts = []
         for arg in args:
-            if type(arg) in [float, int, bool, str]:
-                temp += str(arg) + " "
+            if type(arg) in [float, int, bool, str, Rope] or arg is undefined:
+                parts.append(display(arg) + " ")
             else:
-                temp += str(arg)
-        return temp
+                parts.append(str(arg))
+        if head is not None:
+            return head.concat(" " + "".join(parts))
+        if not parts:
+            return ""
+        return concatenate(parts[0], "".join(parts[1:]))  # a rope if the string is long
 
     def factor(self, args):
         """
         This method is used to substitute the nodes of the parse tree passed in the args parameter with computed value.
         """
-        if type(args[0]) in [str, int, float, list]:  # case of template literal or array
+        if type(args[0]) in [str, int, float, JSArray, Rope]:  # case of template literal or array
             return args[0]
         elif args[0].type == 'FLOAT':
             return float(args[0].value)
@@ -787,7 +528,7 @@ class TreeToJS(Transformer):
                 else:
                     return self.symbol_table.find(args[0].value)['value']
             except ReferenceError:
-                print('ReferenceError: ' + args[0].value + ' is not defined')
+                self.output.write('ReferenceError: ' + args[0].value + ' is not defined\n')
         elif args[0].type == 'ARRAY':
             return args[0]
 
@@ -800,28 +541,44 @@ class TreeToJS(Transformer):
         return args[0]
 
     def array_access(self, args):
+        return self.get_element(self.symbol_table.find(args[0].value)['value'], args[1])
+
+    def array_length(self, args):
+        return self.length(self.symbol_table.find(args[0])['value'])
+
+    @staticmethod
+    def get_element(arr, index):
+        """
+        This method is used to read a cell of an array (or a character of a string)
+        """
         try:
-            if type(args[1]) == str:
-                args[1] = int(args[1])
-            arr = self.symbol_table.find(args[0].value)['value']
-            return arr[args[1]]
+            if type(index) == str or type(index) == Rope:
+                index = int(str(index))
+            return arr[index]
         except IndexError:  # es index out of bounds
-            return 'undefined'
+            return undefined
         except TypeError:  # es float index
-            return 'undefined'
+            return undefined
         except ValueError:  # es string index
-            return 'undefined'
+            return undefined
 
-    def array_length(self, args):
-        try:
-            arr = self.symbol_table.find(args[0])['value']
-            if type(arr) == list:
-                return len(arr)
-            elif type(arr) == str:
-                if arr == 'NaN':
-                    return 'undefined'
-                return len(arr)
-        except TypeError: # es if is not an array, neither a string
-            return 'undefined'
-        except ValueError:
-            return 'undefined'
+    @staticmethod
+    def set_element(arr, index, value):
+        """
+        This method is used to write a cell of an array, the array is extended if the index is out of bounds
+        """
+        if index >= len(arr):
+            arr.extend(undefined, index - len(arr))  # pad intermediate cells with undefined
+            arr.append(value)
+        else:
+            arr[index] = value  # update the value
+        return arr
+
+    @staticmethod
+    def length(arr):
+        """
+        This method is used to compute the length property of an array or of a string
+        """
+        if type(arr) == JSArray or type(arr) == str or type(arr) == Rope:
+            return len(arr)  # the length of a rope is known without joining it
+        return undefined  # es if is not an array, neither a string
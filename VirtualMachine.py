@@ -0,0 +1,625 @@
+# The bytecode engine is an alternative to the closure compiler (Compiler.py). The parse tree is compiled into a flat
+# list of instructions for each function (and one for the program), which is executed by a stack-based virtual
+# machine. The variables are resolved at compile time by the resolver (Resolver.py): the local variables are read and
+# written by index in the frame of the function, only the global variables are stored by name in the symbol table.
+# The machine keeps the call stack in an explicit list of frames, thus a JavaScript call does not use the Python stack.
+# A call in tail position (return f(...) in a function) replaces the frame of the caller instead of being pushed over
+# it, so tail recursion runs in constant space. The depth of the call stack is limited by max_call_depth (RangeError).
+# The operations are computed by the methods of TreeToJS, so the two engines have the same semantics, except the
+# operators && and || which are compiled into conditional jumps, so their right operand is evaluated only when needed.
+# With resource limits (ExecutionLimits.py), a CHECK_LIMITS instruction counts a step before every test of a loop
+# condition and at the start of every function body; without limits it is not emitted.
+# The execution is a generator, so it can be suspended and resumed by an asynchronous host (AsyncRuntime.py): with
+# suspend_input it yields INPUT at every input statement and receives the line read, with slice_steps it yields
+# CHECK_LIMITS every slice_steps steps, so a long loop gives the control back to the host. The state of the execution
+# (frames, program counter, stack) is in the locals of the generator, so resuming it costs nothing.
+from lark import Tree
+
+from Frame import Frame, FrameVariables, UNSET, compound_operators, max_call_depth
+from Resolver import Resolver
+from error_handling import RangeError
+from js_values import undefined, truthy
+
+# Opcodes: each instruction is a pair (opcode, argument) stored in the flat list of instructions of a code object.
+# The argument is an index in the constants of the code object when the instruction needs more than an integer.
+LOAD_CONST = 0  # push constants[arg]
+LOAD_LOCAL = 1  # push the value of the slot arg of the current frame
+LOAD_VARIABLE = 2  # push the value of the variable constants[arg] (slot of an enclosing frame or global variable)
+BINARY_OP = 3  # pop the right and the left operands and push binary_operators[arg]([left, right])
+UNARY_OP = 4  # pop the operand and push unary_operators[arg]([operand])
+JUMP = 5  # jump to the instruction arg
+JUMP_IF_FALSE = 6  # pop the condition and jump to the instruction arg if it is a JavaScript falsy value
+JUMP_IF_TRUE = 7  # pop the condition and jump to the instruction arg if it is not a JavaScript falsy value
+POP = 8  # discard the value on top of the stack
+DECLARE = 9  # declaration of a variable (es. let a, let a = 2), constants[arg] = (variable, keyword, with value)
+ASSIGN = 10  # assignment to a variable (es. a = 2), constants[arg] = variable
+STORE_ELEMENT = 11  # assignment to a cell of an array (es. a[0] = 2), constants[arg] = variable
+UPDATE = 12  # variable assignment (es. a += 2, a++), constants[arg] = (variable, operator, prefix)
+CALL = 13  # function call, constants[arg] = (variable, number of arguments)
+RETURN = 14  # pop the returned value and go back to the caller
+DECLARE_FUNCTION = 15  # function declaration, constants[arg] = (variable, attributes of the function)
+CLEAR_SLOTS = 16  # set the slots constants[arg] of the current frame to UNSET (new block scope)
+PRINT = 17  # pop arg values and print them
+INPUT = 18  # pop arg values (the message) and read the input
+TEMPLATE = 19  # pop the values of arg parts and push the template literal
+BUILD_ARRAY = 20  # pop arg values and push the array
+BUILD_LIST = 21  # pop arg values and push the list of them (value of a program with more statements)
+ARRAY_ACCESS = 22  # pop the index and the array and push the element
+ARRAY_LENGTH = 23  # pop the array and push its length
+BRANCH_VALUE = 24  # turn the value of a statement into the value of the branch of an if statement
+LAST_ELEMENT = 25  # turn the value of the last statement of a loop into the value of the while statement
+CHECK_TERNARY = 26  # raise an error if a branch of a ternary condition gives a list of values
+TAIL_CALL = 27  # function call replacing the current frame (return f(...)), constants[arg] as for CALL
+CHECK_LIMITS = 28  # count a step of the execution, check the resource limits and end the time slice (slice_steps)
+JUMP_IF_FALSE_OR_POP = 29  # jump to the instruction arg keeping the value on top of the stack if it is falsy, else pop it
+JUMP_IF_TRUE_OR_POP = 30  # jump to the instruction arg keeping the value on top of the stack if it is truthy, else pop it
+
+opcode_names = {value: name for name, value in globals().items() if name.isupper() and type(value) == int}
+
+binary_operators = ['equality', 'inequality', 'strict_equality', 'strict_inequality',
+                    'greater_than', 'greater_than_or_equal', 'less_than', 'less_than_or_equal', 'add', 'sub', 'mul',
+                    'div']
+unary_operators = ['negative', 'logical_not']
+
+
+class CodeObject:
+    """
+    Compiled code of the program or of a function
+    """
+    def __init__(self, name, nlocals, local_names, parameter_slots=()):
+        self.name = name
+        self.instructions = []  # flat list: opcode, argument, opcode, argument...
+        self.constants = []
+        self.nlocals = nlocals
+        self.local_names = [str(name) for name in local_names]  # identifier of each slot, to fall back to the global variable with that name
+        self.parameter_slots = parameter_slots  # slot of each parameter of the function
+
+    def disassemble(self):
+        """
+        :return: a readable listing of the instructions (used for debugging)
+        """
+        lines = []
+        for pc in range(0, len(self.instructions), 2):
+            op, arg = self.instructions[pc], self.instructions[pc + 1]
+            lines.append('%4d %-16s %d' % (pc, opcode_names[op], arg))
+        return '\n'.join(lines)
+
+
+class BytecodeCompiler:
+    """
+    This class compiles the parse tree returned by the parser into code objects. Each method corresponds to one of the
+    rules in the grammar and emits the instructions that leave the value of the node on top of the stack.
+    """
+    def __init__(self, transformer, count_steps=False):
+        """
+        :param transformer: TreeToJS of the runtime, it holds the global symbol table and computes the operations
+        :param count_steps: if True the CHECK_LIMITS instructions are emitted (see ExecutionLimits.py)
+        """
+        self.transformer = transformer
+        self.count_steps = count_steps
+        self.resolver = Resolver()
+        self.code = None  # code object being compiled
+        self.scope = None  # scope of the statement being compiled
+        self.in_function = False
+
+    def compile(self, tree):
+        """
+        Compiles the parse tree of a program
+        :param tree: parse tree returned by the parser
+        :return: the code object of the program
+        """
+        self.scope = self.resolver.resolve(tree)
+        self.code = CodeObject('<program>', len(self.scope.local_names), self.scope.local_names)
+        if tree.data == 'start':
+            for child in tree.children:
+                self.visit(child)
+            self.emit(BUILD_LIST, len(tree.children))
+        else:
+            self.visit(tree)
+        self.emit(RETURN)
+        return self.code
+
+    def visit(self, tree):
+        getattr(self, tree.data)(tree)
+
+    def emit(self, op, arg=0):
+        """
+        :return: the position of the instruction, to patch the target of a jump
+        """
+        self.code.instructions += [op, arg]
+        return len(self.code.instructions) - 2
+
+    def patch(self, position):
+        self.code.instructions[position + 1] = len(self.code.instructions)  # jump to the next instruction
+
+    def constant(self, value):
+        self.code.constants.append(value)
+        return len(self.code.constants) - 1
+
+    def variable(self, identifier):
+        """
+        :param identifier: JavaScript variable binding (Lark token)
+        :return: the reference to the variable (depth, slot, identifier), depth is -1 for a global variable
+        """
+        depth, slot = self.scope.resolve(identifier)
+        # the identifier is used as key of the symbol table, plain strings are compared faster than Lark tokens
+        return depth, slot, str(identifier)
+
+    def statements(self, statements):
+        """
+        Compiles a sequence of statements, only the value of the last one is left on the stack
+        """
+        if not statements:
+            self.emit(LOAD_CONST, self.constant(undefined))
+            return
+        for i, statement in enumerate(statements):
+            if i:
+                self.emit(POP)
+            self.visit(statement)
+
+    def block_scope(self, scope):
+        """
+        Emits the instructions that start a new execution of a block scope
+        """
+        slots = tuple(scope.slots.values())
+        if slots:
+            self.emit(CLEAR_SLOTS, self.constant(slots))
+
+    def if_statement(self, tree):
+        self.visit(tree.children[0])
+        jump_if_false = self.emit(JUMP_IF_FALSE)
+        enclosing_scope, self.scope = self.scope, self.resolver.scope_of(tree)
+        self.block_scope(self.scope)
+        self.branch(tree.children[1])
+        jump = self.emit(JUMP)
+        self.patch(jump_if_false)
+        if len(tree.children) == 3:
+            self.block_scope(self.scope)
+            self.branch(tree.children[2])
+        else:
+            self.emit(LOAD_CONST, self.constant(None))  # the if statement has no value when the condition is false
+        self.patch(jump)
+        self.scope = enclosing_scope
+
+    def branch(self, tree):
+        """
+        Compiles a branch of an if statement, which can be a block or a single statement
+        """
+        if tree.data == 'block':
+            self.statements(tree.children)
+        else:
+            self.visit(tree)
+            self.emit(BRANCH_VALUE)
+
+    def while_statement(self, tree, invariants=()):
+        """
+        :param invariants: declarations executed once, before the first iteration (see hoisted_while)
+        """
+        body = tree.children[1].children if tree.children[1].data == 'block' else [tree.children[1]]
+        return_statement = None
+        for i, statement in enumerate(body):
+            if statement.data == 'return_statement' and not self.in_function:
+                # outside of a function, a return statement in the body ends the loop and gives its value
+                body, return_statement = body[:i], statement
+                break
+        self.emit(LOAD_CONST, self.constant(None))  # value of the while statement if the body is never executed
+        if invariants:
+            # first test of the condition, followed by the invariants and by the first iteration
+            self.condition(tree.children[0])
+            jump = self.emit(JUMP_IF_FALSE)
+            for declaration in invariants:
+                self.visit(declaration)
+                self.emit(POP)
+        else:
+            jump = self.emit(JUMP)
+        loop = len(self.code.instructions)
+        enclosing_scope, self.scope = self.scope, self.resolver.scope_of(tree)
+        self.emit(POP)  # value of the previous iteration
+        self.block_scope(self.scope)
+        exit_jump = None
+        if return_statement is not None:
+            for statement in body:
+                self.visit(statement)
+                self.emit(POP)
+            self.return_value(return_statement)
+            exit_jump = self.emit(JUMP)
+        elif body:
+            self.statements(body)
+        else:
+            self.emit(LOAD_CONST, self.constant(None))
+        self.scope = enclosing_scope
+        if not invariants:
+            self.patch(jump)
+        self.condition(tree.children[0])
+        self.emit(JUMP_IF_TRUE, loop)
+        if invariants:
+            self.patch(jump)  # the condition is false at the first test
+        self.emit(LAST_ELEMENT)
+        if exit_jump is not None:
+            self.patch(exit_jump)
+
+    def condition(self, tree):
+        """
+        Compiles the condition of a while loop, every test of the condition is a step of the execution
+        """
+        if self.count_steps:
+            self.emit(CHECK_LIMITS)
+        self.visit(tree)
+
+    def hoisted_while(self, tree):
+        """
+        while statement whose invariant operations have been moved by the optimizer (Optimizer.py) to the declarations
+        of temporary variables, which precede the loop
+        """
+        enclosing_scope, self.scope = self.scope, self.resolver.scope_of(tree)  # scope of the temporary variables
+        self.while_statement(tree.children[-1], tree.children[:-1])
+        self.scope = enclosing_scope
+
+    def ternary_condition_statement(self, tree):
+        self.visit(tree.children[0])
+        jump_if_false = self.emit(JUMP_IF_FALSE)
+        self.visit(tree.children[1])
+        jump = self.emit(JUMP)
+        self.patch(jump_if_false)
+        self.visit(tree.children[2])
+        self.patch(jump)
+        self.emit(CHECK_TERNARY)
+
+    def function_declaration(self, tree):
+        identifier = tree.children[1]
+        parameter_list = Resolver.parameter_list(tree)
+        function_body = tree.children[-1]
+        enclosing_code, enclosing_scope = self.code, self.scope
+        self.scope = self.resolver.scope_of(tree)
+        self.code = CodeObject(str(identifier), len(self.scope.local_names), self.scope.local_names,
+                               tuple(self.scope.slots[parameter] for parameter in parameter_list))
+        in_function, self.in_function = self.in_function, True
+        try:
+            self.function_body(function_body)
+        finally:
+            self.in_function = in_function
+        code, self.code, self.scope = self.code, enclosing_code, enclosing_scope
+        attributes = {'declaration': 'function', 'parameter_list': parameter_list, 'body': function_body,
+                      'type': 'function', 'code': code}
+        self.emit(DECLARE_FUNCTION, self.constant((self.variable(identifier), attributes)))
+
+    def function_body(self, tree):
+        if self.count_steps:
+            self.emit(CHECK_LIMITS)  # every call is a step of the execution
+        for statement in (tree.children if tree.data == 'block' else [tree]):
+            if statement.data == 'return_statement':
+                self.return_value(statement)  # the statements after the return are never executed
+                self.emit(RETURN)
+                return
+            self.visit(statement)
+            self.emit(POP)
+        self.emit(LOAD_CONST, self.constant(undefined))
+        self.emit(RETURN)
+
+    def function_call(self, tree, op=CALL):
+        """
+        :param op: CALL, or TAIL_CALL for a call in tail position
+        """
+        identifier = tree.children[0]
+        if len(tree.children) == 3:
+            arguments = []  # if there are no arguments
+        elif tree.children[2].data == 'argument_list':  # if there are more than one argument
+            arguments = tree.children[2].children
+        else:
+            arguments = [tree.children[2]]
+        for argument in arguments:
+            self.visit(argument)
+        self.emit(op, self.constant((self.variable(identifier), len(arguments))))
+
+    def return_value(self, tree):
+        for child in tree.children:
+            if isinstance(child, Tree):
+                if self.in_function and child.data == 'function_call':
+                    self.function_call(child, TAIL_CALL)  # return f(...), the RETURN is executed only on errors
+                else:
+                    self.visit(child)
+                return
+        self.emit(LOAD_CONST, self.constant(undefined))  # return without expression
+
+    def return_statement(self, tree):
+        self.return_value(tree)
+        if self.in_function:
+            self.emit(RETURN)
+
+    def print_statement(self, tree):
+        for child in tree.children:
+            self.visit(child)
+        self.emit(PRINT, len(tree.children))
+
+    def input_statement(self, tree):
+        for child in tree.children:
+            self.visit(child)
+        self.emit(INPUT, len(tree.children))
+
+    def variable_statement(self, tree):
+        children = tree.children
+        if len(children) == 2:  # variable declaration (es. let a)
+            self.emit(DECLARE, self.constant((self.variable(children[1]), children[0], False)))
+        elif len(children) == 3:  # variable assignment (es. a = 2)
+            self.visit(children[2])
+            self.emit(ASSIGN, self.constant(self.variable(children[0])))
+        elif len(children) == 4:  # variable declaration and assignment (es. let a = 2)
+            self.visit(children[3])
+            self.emit(DECLARE, self.constant((self.variable(children[1]), children[0], True)))
+        elif len(children) == 6:  # assignment to a cell of the array
+            self.visit(children[2])
+            self.visit(children[5])
+            self.emit(STORE_ELEMENT, self.constant(self.variable(children[0])))
+        else:
+            self.emit(LOAD_CONST, self.constant(None))
+
+    def variable_assignment(self, tree):
+        children = tree.children
+        if children[0] in ['++', '--']:  # pre increment and pre decrement
+            self.emit(UPDATE, self.constant((self.variable(children[1]), str(children[0]), True)))
+        else:
+            if len(children) == 3:
+                self.visit(children[2])
+            self.emit(UPDATE, self.constant((self.variable(children[0]), str(children[1]), False)))
+
+    def binary_operation(self, tree):
+        self.visit(tree.children[0])
+        self.visit(tree.children[1])
+        self.emit(BINARY_OP, binary_operators.index(tree.data))
+
+    equality = inequality = strict_equality = strict_inequality = binary_operation
+    greater_than = greater_than_or_equal = less_than = less_than_or_equal = binary_operation
+    add = sub = mul = div = binary_operation
+
+    def logical_and(self, tree):
+        # the right operand is skipped when the left one gives the value (short-circuit evaluation)
+        self.visit(tree.children[0])
+        jump = self.emit(JUMP_IF_FALSE_OR_POP)
+        self.visit(tree.children[1])
+        self.patch(jump)
+
+    def logical_or(self, tree):
+        self.visit(tree.children[0])
+        jump = self.emit(JUMP_IF_TRUE_OR_POP)
+        self.visit(tree.children[1])
+        self.patch(jump)
+
+    def unary_operation(self, tree):
+        for child in tree.children:
+            if isinstance(child, Tree):
+                self.visit(child)
+        self.emit(UNARY_OP, unary_operators.index(tree.data))
+
+    negative = logical_not = unary_operation
+
+    def template_literal(self, tree):
+        for child in tree.children:
+            if isinstance(child, Tree):
+                self.visit(child)
+            else:
+                self.emit(LOAD_CONST, self.constant(child))  # the string parts are passed as tokens
+        self.emit(TEMPLATE, len(tree.children))
+
+    def factor(self, tree):
+        child = tree.children[0]
+        if isinstance(child, Tree):  # template literal, input statement, array or function call
+            self.visit(child)
+        elif child.type == 'IDENTIFIER':
+            variable = self.variable(child)
+            if variable[0] == 0:
+                self.emit(LOAD_LOCAL, variable[1])
+            else:
+                self.emit(LOAD_VARIABLE, self.constant(variable))
+        else:
+            self.emit(LOAD_CONST, self.constant(self.transformer.factor([child])))  # literals are computed once
+
+    def term(self, tree):
+        self.visit(tree.children[0])
+
+    expression = term
+
+    def array(self, tree):
+        # an empty array literal has a single None child (placeholder of the missing element list)
+        elements = [child for child in tree.children if child is not None]
+        for element in elements:
+            self.visit(element)
+        self.emit(BUILD_ARRAY, len(elements))
+
+    def array_access(self, tree):
+        self.emit(LOAD_VARIABLE, self.constant(self.variable(tree.children[0])))
+        self.visit(tree.children[1])
+        self.emit(ARRAY_ACCESS)
+
+    def array_length(self, tree):
+        self.emit(LOAD_VARIABLE, self.constant(self.variable(tree.children[0])))
+        self.emit(ARRAY_LENGTH)
+
+
+class VirtualMachine(FrameVariables):
+    """
+    This class executes the code objects returned by the bytecode compiler. The global variables are stored in the
+    symbol table of the transformer, so the programs executed by the same machine share them (e.g., the console).
+    """
+    def __init__(self, transformer, max_call_depth=max_call_depth, limits=None, slice_steps=None, suspend_input=False):
+        """
+        :param transformer: TreeToJS of the runtime, it holds the global symbol table and computes the operations
+        :param limits: ExecutionLimits counting the steps of the CHECK_LIMITS instructions
+        :param slice_steps: number of steps after which the execution yields CHECK_LIMITS to the host (None to never
+        yield), the code must be compiled with count_steps=True
+        :param suspend_input: if True the execution yields INPUT at every input statement, and the host sends the line
+        read, otherwise the line is read from the standard input
+        """
+        super().__init__(transformer)
+        self.max_call_depth = max_call_depth  # maximum number of frames on the call stack (without the program)
+        self.limits = limits
+        self.slice_steps = slice_steps
+        self.suspend_input = suspend_input
+        self.binary_operators = [getattr(transformer, name) for name in binary_operators]
+        self.unary_operators = [getattr(transformer, name) for name in unary_operators]
+
+    def run(self, code):
+        """
+        Executes the code object of a program
+        :return: the value of the program
+        """
+        execution = self.start(code)
+        try:
+            next(execution)
+        except StopIteration as stop:
+            return stop.value
+        execution.close()
+        raise RuntimeError('the execution has been suspended, use a machine without slice_steps and suspend_input')
+
+    def start(self, code):
+        """
+        :return: the execution of the code object of a program, a generator which returns the value of the program
+        """
+        return self.execute(Frame(code.nlocals, None, code))
+
+    def execute(self, frame):
+        frames = []  # frames of the callers
+        instructions, constants, values, stack = frame.code.instructions, frame.code.constants, frame.values, frame.stack
+        pc = frame.pc
+        binary, unary = self.binary_operators, self.unary_operators
+        step = self.limits.step if self.limits is not None else None
+        slice_steps = budget = self.slice_steps  # budget: steps left before yielding to the host
+        while True:
+            op = instructions[pc]
+            arg = instructions[pc + 1]
+            pc += 2
+            if op == LOAD_LOCAL:
+                value = values[arg]
+                if value is UNSET or type(value) is dict:
+                    value = self.load(frame, (0, arg, frame.code.local_names[arg]))
+                stack.append(value)
+            elif op == LOAD_CONST:
+                stack.append(constants[arg])
+            elif op == BINARY_OP:
+                right = stack.pop()
+                stack[-1] = binary[arg]([stack[-1], right])
+            elif op == JUMP_IF_TRUE:
+                if truthy(stack.pop()):
+                    pc = arg
+            elif op == JUMP_IF_FALSE:
+                if not truthy(stack.pop()):
+                    pc = arg
+            elif op == JUMP:
+                pc = arg
+            elif op == JUMP_IF_FALSE_OR_POP:
+                if truthy(stack[-1]):
+                    stack.pop()
+                else:
+                    pc = arg
+            elif op == JUMP_IF_TRUE_OR_POP:
+                if truthy(stack[-1]):
+                    pc = arg
+                else:
+                    stack.pop()
+            elif op == CHECK_LIMITS:
+                if step is not None:
+                    step()
+                if slice_steps is not None:
+                    budget -= 1
+                    if not budget:
+                        budget = slice_steps
+                        yield CHECK_LIMITS
+            elif op == POP:
+                stack.pop()
+            elif op == UPDATE:
+                variable, operator, prefix = constants[arg]
+                operand = stack.pop() if operator in compound_operators else None
+                stack.append(self.update(frame, variable, operator, prefix, operand))
+            elif op == LOAD_VARIABLE:
+                stack.append(self.load(frame, constants[arg]))
+            elif op == UNARY_OP:
+                stack[-1] = unary[arg]([stack[-1]])
+            elif op == ASSIGN:
+                stack[-1] = self.assign(frame, constants[arg], stack[-1])
+            elif op == DECLARE:
+                variable, keyword, with_value = constants[arg]
+                value = stack.pop() if with_value else None
+                stack.append(self.declare(frame, variable, keyword, with_value, value))
+            elif op == STORE_ELEMENT:
+                value = stack.pop()
+                index = stack.pop()
+                stack.append(self.store_element(frame, constants[arg], index, value))
+            elif op == CALL or op == TAIL_CALL:
+                variable, argc = constants[arg]
+                arguments = stack[len(stack) - argc:]
+                del stack[len(stack) - argc:]
+                function = self.function(frame, variable)
+                if function is None:
+                    stack.append(None)
+                    continue
+                callee = Frame(function['code'].nlocals, function['scope'], function['code'])
+                parameter_slots = callee.code.parameter_slots
+                for i in range(len(parameter_slots)):
+                    callee.values[parameter_slots[i]] = arguments[i] if i < argc else undefined
+                    callee.declarations[parameter_slots[i]] = 'var'
+                if op == CALL:
+                    if len(frames) >= self.max_call_depth:
+                        raise RangeError()
+                    frame.pc = pc
+                    frames.append(frame)
+                # with a tail call the frame of the caller is left, the callee returns to the caller of the caller
+                frame = callee
+                instructions, constants, values, stack = frame.code.instructions, frame.code.constants, \
+                    frame.values, frame.stack
+                pc = 0
+            elif op == RETURN:
+                value = stack.pop()
+                if not frames:
+                    return value
+                frame = frames.pop()
+                instructions, constants, values, stack = frame.code.instructions, frame.code.constants, \
+                    frame.values, frame.stack
+                pc = frame.pc
+                stack.append(value)
+            elif op == CLEAR_SLOTS:
+                for slot in constants[arg]:
+                    values[slot] = UNSET
+            elif op == DECLARE_FUNCTION:
+                stack.append(self.declare_function(frame, *constants[arg]))
+            elif op == ARRAY_ACCESS:
+                index = stack.pop()
+                stack[-1] = self.transformer.get_element(stack[-1], index)
+            elif op == ARRAY_LENGTH:
+                stack[-1] = self.transformer.length(stack[-1])
+            elif op == PRINT:
+                args = stack[len(stack) - arg:]
+                del stack[len(stack) - arg:]
+                stack.append(self.transformer.print_statement(args))
+            elif op == INPUT:
+                args = stack[len(stack) - arg:]
+                del stack[len(stack) - arg:]
+                if self.suspend_input:
+                    self.transformer.prompt(args)
+                    stack.append(self.transformer.input_value((yield INPUT)))
+                else:
+                    stack.append(self.transformer.input_statement(args))
+            elif op == TEMPLATE:
+                args = stack[len(stack) - arg:]
+                del stack[len(stack) - arg:]
+                stack.append(self.transformer.template_literal(args))
+            elif op == BUILD_ARRAY:
+                args = stack[len(stack) - arg:]
+                del stack[len(stack) - arg:]
+                stack.append(self.transformer.array(args))
+            elif op == BUILD_LIST:
+                args = stack[len(stack) - arg:]
+                del stack[len(stack) - arg:]
+                stack.append(args)
+            elif op == BRANCH_VALUE:
+                value = stack[-1]
+                if not value:
+                    stack[-1] = undefined
+                elif type(value) == list:
+                    stack[-1] = value[-1]
+            elif op == LAST_ELEMENT:
+                if type(stack[-1]) == list:
+                    stack[-1] = stack[-1][-1]
+            elif op == CHECK_TERNARY:
+                if type(stack[-1]) == list:
+                    raise Exception('SyntaxError: Unexpected token')
+            else:
+                raise RuntimeError('unknown opcode %d' % op)
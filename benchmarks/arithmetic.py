@@ -0,0 +1,46 @@
+# Arithmetic microbenchmark: time of one call of TreeToJS.add, sub, mul and div for each pair of operand types, to
+# track the cost of the type coercion (see coercion.py).
+# Usage: python benchmarks/arithmetic.py [number of calls per measure]
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from JSArray import JSArray
+from Transformer import TreeToJS
+
+operators = ['add', 'sub', 'mul', 'div']
+
+# one sample value for each type, the strings that are numbers exercise the cached ToNumber conversion
+samples = {
+    'int': 7,
+    'float': 2.5,
+    'bool': True,
+    'numeric str': '12',
+    'str': 'abc',
+    'array': JSArray([1, 2]),
+}
+
+
+def measure(operation, args, number):
+    """
+    :return: the best time of one call in nanoseconds, over 5 repetitions
+    """
+    times = timeit.repeat(lambda: operation(args), number=number, repeat=5)
+    return min(times) / number * 1e9
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print("%-12s %-12s" % ("left", "right") + "".join("%10s" % name for name in operators) + "   (ns per call)")
+    for left_name, left in samples.items():
+        for right_name, right in samples.items():
+            row = "%-12s %-12s" % (left_name, right_name)
+            for name in operators:
+                row += "%10.0f" % measure(getattr(TreeToJS, name), [left, right], number)
+            print(row)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# Array memory benchmark: memory taken by an array of numbers built from an array literal and filled one cell at a
+# time (es. a[i] = i in a loop), with the typed storage of JSArray and with a plain Python list of the same values.
+# Usage: python benchmarks/arrays.py [number of elements]
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from JSArray import JSArray
+from Transformer import TreeToJS
+
+
+def allocated(build):
+    """
+    :param build: function building an array
+    :return: the memory allocated by the array in MB
+    """
+    tracemalloc.start()
+    array = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del array
+    return size / 2 ** 20
+
+
+def filled(n, value):
+    """
+    Fills an empty array one cell at a time, like the assignments a[i] = value in a loop
+    """
+    array = JSArray()
+    for i in range(n):
+        TreeToJS.set_element(array, i, value(i))
+    return array
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    cases = [
+        ('list of integers', lambda: list(range(n))),
+        ('literal of integers', lambda: TreeToJS.array(list(range(n)))),
+        ('filled with integers', lambda: filled(n, lambda i: i)),
+        ('list of floats', lambda: [i / 2 for i in range(n)]),
+        ('literal of floats', lambda: TreeToJS.array([i / 2 for i in range(n)])),
+        ('filled with floats', lambda: filled(n, lambda i: i / 2)),
+        ('mixed (generic list)', lambda: TreeToJS.array([i if i % 2 else str(i) for i in range(n)])),
+    ]
+    print("%d elements" % n)
+    for name, build in cases:
+        print("%-22s %8.1f MB" % (name, allocated(build)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# Asynchronous sessions benchmark: many AsyncRuntime sessions execute a loop-heavy script at the same time in one event
+# loop, sharing a program cache, while another coroutine measures its latency: the longest wait between two of its
+# wake-ups, which is the time taken by one time slice of every session (or by a whole session without slices). It is
+# repeated with different time slices: smaller slices keep the event loop more responsive, at the cost of more
+# switches between the sessions.
+# Usage: python benchmarks/async_sessions.py [sessions]
+import asyncio
+import os
+import sys
+import time
+
+benchmarks_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(benchmarks_dir))
+
+from AsyncRuntime import AsyncRuntime
+from OutputSink import NullSink
+from ProgramCache import ProgramCache
+
+iterations = 500
+source = """
+let total = 0
+let i = 0
+while (i < iterations) {
+    total += i
+    i++
+}
+console.log(total)
+""".replace('iterations', str(iterations))
+
+
+async def measure(sessions, slice_steps, cache):
+    """
+    :return: the total time of the sessions and the latency of the event loop
+    """
+    longest = 0.0
+    done = False
+
+    async def monitor():
+        nonlocal longest
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0)
+            now = time.perf_counter()
+            longest = max(longest, now - last)
+            last = now
+
+    monitor_task = asyncio.create_task(monitor())
+    runtimes = [AsyncRuntime(slice_steps=slice_steps, output=NullSink(), cache=cache) for _ in range(sessions)]
+    start = time.perf_counter()
+    await asyncio.gather(*(runtime.run(source) for runtime in runtimes))
+    elapsed = time.perf_counter() - start
+    done = True
+    await monitor_task
+    return elapsed, longest
+
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    cache = ProgramCache()
+    print("%d sessions, %d loop iterations each" % (sessions, iterations))
+    print("%-12s %12s %18s %20s" % ("slice", "total s", "iterations/s", "latency ms"))
+    for slice_steps in [None, 10000, 1000, 100]:
+        elapsed, longest = asyncio.run(measure(sessions, slice_steps, cache))
+        print("%-12s %12.2f %18.0f %20.2f" % (slice_steps if slice_steps is not None else "none", elapsed,
+                                               sessions * iterations / elapsed, longest * 1000))
+
+
+if __name__ == '__main__':
+    main()
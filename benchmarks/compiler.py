@@ -0,0 +1,115 @@
+# Compiler benchmark: executes loop-heavy scripts with the tree-walking interpreter (JavaScriptInterpreter), with
+# the closures produced by JavaScriptCompiler and with the bytecode virtual machine, and reports the speed-up of the
+# compiled forms over the interpreter.
+# Usage: python benchmarks/compiler.py
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from main import parse
+from Compiler import JavaScriptCompiler
+from Interpreter import JavaScriptInterpreter, js_transformer
+from SymbolTable import SymbolTable
+from Transformer import TreeToJS
+from VirtualMachine import BytecodeCompiler, VirtualMachine
+
+# the same loops of javascript_tests/test_3.js, with the marks generated instead of read from the keyboard
+count_marks = """
+let marks = []
+let i = 0
+while (i < 2000) {
+    marks[i] = i - (i / 31) * 31 + 3
+    i++
+}
+function count_sufficient_marks(marks) {
+    n_marks = marks.length
+    n_sufficient_marks = 0
+    n_unsufficient_marks = 0
+    i = 0
+    while(i < n_marks) {
+        if (marks[i] >= 18 && marks[i] <= 30) {
+            n_sufficient_marks++
+        } else {
+            n_unsufficient_marks++
+        }
+        i++
+    }
+    return [n_sufficient_marks, n_unsufficient_marks]
+}
+count = count_sufficient_marks(marks)
+console.log(`The number of sufficient marks is ${count[0]}`)
+"""
+
+arithmetic_loop = """
+let total = 0
+let k = 0
+while (k < 5000) {
+    total += k * 2 - 1
+    if (total > 1000000) {
+        total = total / 2
+    }
+    k++
+}
+console.log(total)
+"""
+
+# the same kind of loop with local variables of a function (slots of the frame in the virtual machine)
+function_locals = """
+function sum_to(n) {
+    let s = 0
+    let i = 0
+    while (i < n) {
+        s += i * 2 - 1
+        i++
+    }
+    return s
+}
+total = sum_to(5000)
+console.log(total)
+"""
+
+
+def compiled(tree):
+    JavaScriptCompiler(TreeToJS(SymbolTable())).compile(tree)()  # every run starts from an empty global scope
+
+
+def vm(tree):
+    transformer = TreeToJS(SymbolTable())
+    VirtualMachine(transformer).run(BytecodeCompiler(transformer).compile(tree))
+
+
+def run(execute, script):
+    """
+    :param execute: function that executes the parse tree of the program
+    :param script: source of the program, parsed again at each run because the interpreter modifies the parse tree
+    :return: the execution time in seconds and the output of the program
+    """
+    js_transformer.symbol_table = SymbolTable()  # the interpreter starts from an empty global scope
+    tree = parse(script)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        start = time.perf_counter()
+        execute(tree)
+        elapsed = time.perf_counter() - start
+    return elapsed, output.getvalue()
+
+
+def main():
+    print("%-18s %12s %12s %10s %12s %10s" % ("script", "interpreter", "compiled", "speed-up", "vm", "speed-up"))
+    for name, script in [("count_marks", count_marks), ("arithmetic_loop", arithmetic_loop),
+                         ("function_locals", function_locals)]:
+        interpreted, interpreted_output = run(lambda tree: JavaScriptInterpreter().visit(tree), script)
+        compiled_time, compiled_output = run(compiled, script)
+        vm_time, vm_output = run(vm, script)
+        assert interpreted_output == compiled_output == vm_output, "the execution modes print different outputs"
+        print("%-18s %10.1fms %10.1fms %9.1fx %10.1fms %9.1fx" % (name, interpreted * 1000, compiled_time * 1000,
+                                                                  interpreted / compiled_time, vm_time * 1000,
+                                                                  interpreted / vm_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+# Console benchmark: time to read each line of a long function typed (or pasted) in the console, with the incremental
+# parser of Console.py and by parsing again all the lines of the statement at every line. With the incremental parser
+# the time of a line does not grow with the lines before it.
+# Usage: python benchmarks/console.py [number of lines of the function]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from lark import UnexpectedInput
+
+from Console import Console
+from Runtime import get_parser
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    parser = get_parser()
+    lines = ['function f(a) {'] + ['  let x%d = a * %d + 1' % (i, i) for i in range(size)] + ['  return a', '}']
+    print("%-12s %18s %18s" % ("lines", "incremental ms", "re-parse ms"))
+    console = Console(parser)
+    buffer = []
+    for number, line in enumerate(lines, 1):
+        start = time.perf_counter()
+        list(console.feed(line))  # the generator parses the line when it is consumed
+        incremental = time.perf_counter() - start
+        buffer.append(line)
+        if number in [10, 100, 1000, 10000] or number == len(lines):
+            start = time.perf_counter()
+            try:
+                parser.parse('\n'.join(buffer))
+            except UnexpectedInput:
+                pass  # the statement is not complete yet
+            reparse = time.perf_counter() - start
+            print("%-12d %18.3f %18.3f" % (number, incremental * 1000, reparse * 1000))
+
+
+if __name__ == '__main__':
+    main()
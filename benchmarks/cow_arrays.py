@@ -0,0 +1,86 @@
+# Copy-on-write arrays benchmark:
+# - a loop writes one cell at a time into a global array of growing size: the time of a write does not depend on the
+#   size of the array, and the memory allocated by the loop is at most one copy of the array (the storage shared with
+#   the snapshot the array comes from is copied at the first write, then the writes are in place);
+# - a snapshot with a large array is restored into many runtimes: they share the storage of the array, which is
+#   copied only by the runtimes that write it.
+# Usage: python benchmarks/cow_arrays.py [engine]
+import os
+import sys
+import time
+import tracemalloc
+
+benchmarks_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(benchmarks_dir))
+
+from JSArray import JSArray
+from OutputSink import NullSink
+from Runtime import Runtime
+from SymbolTable import SymbolTable
+
+write_loop = """
+let i = 0
+while (i < table.length) {
+    table[i] = i + 1
+    i++
+}
+"""
+
+
+def snapshot_with_table(engine, size):
+    """
+    :return: the snapshot of a runtime with a global array of size numbers
+    """
+    runtime = Runtime(engine, output=NullSink())
+    runtime.globals.table['table'] = SymbolTable.attributes('let', JSArray(range(size)))
+    return runtime.snapshot()
+
+
+def writes(engine):
+    print("%-10s %16s %20s %16s" % ("size", "ns per write", "loop peak KiB", "array KiB"))
+    for size in [10 ** 4, 10 ** 5, 10 ** 6]:
+        snapshot = snapshot_with_table(engine, size)
+        runtime = Runtime(engine, output=NullSink())
+        runtime.restore(snapshot)
+        program = runtime.compile(runtime.parse(write_loop))
+        start = time.perf_counter()
+        runtime.call(program)
+        elapsed = time.perf_counter() - start
+        # the memory is measured in another run, because tracing the allocations slows the execution down
+        runtime = Runtime(engine, output=NullSink())
+        runtime.restore(snapshot)
+        program = runtime.compile(runtime.parse(write_loop))
+        tracemalloc.start()
+        runtime.call(program)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print("%-10d %16.0f %20.0f %16.0f" % (size, elapsed / size * 1e9, peak / 1024, size * 8 / 1024))
+
+
+def sharing(engine, runtimes=100, size=10 ** 5):
+    snapshot = snapshot_with_table(engine, size)
+    tracemalloc.start()
+    restored = []
+    for _ in range(runtimes):
+        runtime = Runtime(engine, output=NullSink())
+        runtime.restore(snapshot)
+        restored.append(runtime)
+    after_restore = tracemalloc.get_traced_memory()[0]
+    for runtime in restored[:runtimes // 10]:
+        runtime.run('table[0] = -1')
+    after_writes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print("\n%d runtimes restored from a snapshot with an array of %d numbers (%.0f KiB):" % (runtimes, size,
+                                                                                           size * 8 / 1024))
+    print("%-40s %12.0f KiB" % ("memory of the runtimes", after_restore / 1024))
+    print("%-40s %12.0f KiB" % ("after a write in %d of them" % (runtimes // 10), after_writes / 1024))
+
+
+def main():
+    engine = sys.argv[1] if len(sys.argv) > 1 else 'compiled'
+    writes(engine)
+    sharing(engine)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+# Guard benchmark: loops whose conditions are guards (a cheap test on the left of && or || protecting an expensive
+# operand on the right), executed with the short-circuit evaluation of the engines and, for the compiled engine, with
+# the eager evaluation of both operands (as the operators were compiled before, by the binary operation of the
+# compiler). With short-circuit evaluation the time of a guarded loop depends on how often the guard lets the right
+# operand be evaluated.
+# Usage: python benchmarks/guards.py
+import gc
+import os
+import sys
+import time
+
+benchmarks_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(benchmarks_dir))
+
+from Compiler import JavaScriptCompiler
+from OutputSink import NullSink
+from Runtime import Runtime
+
+iterations = 20000
+
+# the right operand scans a template literal of the array and compares it, much more expensive than the guard
+guard_and = """
+let a = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+let count = 0
+let i = 0
+while (i < %(iterations)d) {
+    if (i < %(guarded)d && `${a}${a}${a}${a}` == "" + i) {
+        count++
+    }
+    i++
+}
+console.log(count)
+"""
+
+guard_or = """
+let a = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+let count = 0
+let i = 0
+while (i < %(iterations)d) {
+    let valid = i >= %(guarded)d || `${a}${a}${a}${a}` != "" + i
+    if (valid) {
+        count++
+    }
+    i++
+}
+console.log(count)
+"""
+
+nested_guards = """
+let a = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+let count = 0
+let i = 0
+while (i < %(iterations)d) {
+    let hit = i < %(guarded)d && i >= 0 && a.length > 5 && `${a}${a}${a}${a}` != "" + i
+    if (hit) {
+        count++
+    }
+    i++
+}
+console.log(count)
+"""
+
+
+class eager_operators:
+    """
+    Context manager compiling && and || as binary operations, which evaluate both operands
+    """
+    def __enter__(self):
+        self.methods = JavaScriptCompiler.logical_and, JavaScriptCompiler.logical_or
+        JavaScriptCompiler.logical_and = JavaScriptCompiler.logical_or = \
+            lambda compiler, tree: compiler.binary_operation(getattr(compiler.transformer, tree.data), tree)
+
+    def __exit__(self, *exc_info):
+        JavaScriptCompiler.logical_and, JavaScriptCompiler.logical_or = self.methods
+
+
+def measure(engine, script, repeat=5):
+    """
+    :return: the best execution time in seconds
+    """
+    best = None
+    for _ in range(repeat):
+        runtime = Runtime(engine, output=NullSink())
+        program = runtime.compile(runtime.parse(script))
+        gc.disable()  # the collections triggered by the strings of the right operands would add noise
+        try:
+            start = time.perf_counter()
+            runtime.call(program)
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    print("%-15s %10s %14s %16s %10s %12s" % ("script", "evaluated", "eager ms", "compiled ms", "speed-up", "vm ms"))
+    for name, template in [("guard_and", guard_and), ("guard_or", guard_or), ("nested_guards", nested_guards)]:
+        for fraction in [0, 0.1, 0.5, 1]:
+            # fraction: share of the iterations in which the guard lets the right operand be evaluated
+            script = template % {'iterations': iterations, 'guarded': int(iterations * fraction)}
+            with eager_operators():
+                eager = measure('compiled', script)
+            compiled = measure('compiled', script)
+            vm = measure('vm', script)
+            print("%-15s %9d%% %14.1f %16.1f %9.1fx %12.1f" % (name, fraction * 100, eager * 1000, compiled * 1000,
+                                                               eager / compiled, vm * 1000))
+
+
+if __name__ == '__main__':
+    main()
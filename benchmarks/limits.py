@@ -0,0 +1,59 @@
+# Resource limits benchmark: the workloads of the benchmark suite (benchmarks/workloads) executed without limits, with
+# the step and time limits (counted in the loops and in the calls), with the size limit (checked when the arrays and
+# the strings are built) and with all of them, to measure the overhead of the checks.
+# Usage: python benchmarks/limits.py [engine]
+import gc
+import os
+import sys
+import time
+
+benchmarks_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(benchmarks_dir))
+
+from ExecutionLimits import ExecutionLimits
+from OutputSink import NullSink
+from Runtime import Runtime
+
+configurations = [
+    ("no limits", lambda: None),
+    ("steps + timeout", lambda: ExecutionLimits(max_steps=10 ** 9, timeout=3600)),
+    ("size", lambda: ExecutionLimits(max_value_size=10 ** 9)),
+    ("all", lambda: ExecutionLimits(max_steps=10 ** 9, timeout=3600, max_value_size=10 ** 9)),
+]
+
+
+def best_time(source, engine, limits, repeat=5):
+    """
+    :return: the best execution time in seconds of the source (parse excluded)
+    """
+    runtime = Runtime(engine, output=NullSink(), limits=limits)
+    tree = runtime.parse(source)
+    times = []
+    for _ in range(repeat):
+        runtime.reset()  # the declarations of the previous run would clash with the ones of this run
+        program = runtime.compile(tree)
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            runtime.call(program)
+            times.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return min(times)
+
+
+def main():
+    engine = sys.argv[1] if len(sys.argv) > 1 else 'compiled'
+    workloads_dir = os.path.join(benchmarks_dir, 'workloads')
+    print("%-18s" % "script" + "".join("%18s" % name for name, _ in configurations))
+    for name in sorted(os.listdir(workloads_dir)):
+        with open(os.path.join(workloads_dir, name)) as f:
+            source = f.read()
+        times = [best_time(source, engine, limits()) for _, limits in configurations]
+        print("%-18s" % os.path.splitext(name)[0] + "%16.1fms" % (times[0] * 1000)
+              + "".join("%+17.1f%%" % ((elapsed / times[0] - 1) * 100) for elapsed in times[1:]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# Memoization benchmark: recursive numeric functions (Fibonacci and binomial coefficients) executed without and with the
+# memoizer of the pure functions (--memoize-pure), and a function that is called once per argument, for which the
+# cache is only an overhead.
+# Usage: python benchmarks/memoize.py [n]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from Memoizer import Memoizer
+from OutputSink import NullSink
+from Runtime import Runtime
+
+scripts = {
+    'fib(n)': '''
+function fib(n) {
+    if (n < 2) {
+        return n
+    }
+    let a = fib(n - 1)
+    let b = fib(n - 2)
+    return a + b
+}
+let f = fib(%(n)d)
+''',
+    'binomial(n, n / 2)': '''
+function binomial(n, k) {
+    if (k == 0) {
+        return 1
+    }
+    if (k == n) {
+        return 1
+    }
+    let left = binomial(n - 1, k - 1)
+    let right = binomial(n - 1, k)
+    return left + right
+}
+let c = binomial(%(n)d, %(half)d)
+''',
+    'square(i), distinct i': '''
+function square(x) {
+    return x * x
+}
+let i = 0
+let n = %(n)d * 1000
+while (i < n) {
+    let s = square(i)
+    i++
+}
+''',
+}
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print("%-24s %12s %12s %10s" % ("script", "plain s", "memoized s", "hit rate"))
+    for name, script in scripts.items():
+        source = script % {'n': n, 'half': n // 2}
+        times = []
+        for memoizer in [None, Memoizer()]:
+            runtime = Runtime(output=NullSink(), memoizer=memoizer)
+            start = time.perf_counter()
+            runtime.run(source)
+            times.append(time.perf_counter() - start)
+        functions = [function for function in memoizer.functions if function.hits + function.misses]
+        calls = sum(function.hits + function.misses + function.bypasses for function in functions)
+        hits = sum(function.hits for function in functions)
+        print("%-24s %12.3f %12.3f %9.1f%%" % (name, times[0], times[1], hits * 100 / calls if calls else 0))
+
+
+if __name__ == '__main__':
+    main()
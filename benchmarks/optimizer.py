@@ -0,0 +1,80 @@
+# Optimizer benchmark: executes loops with constant and loop-invariant operations with the closure compiler and with
+# the bytecode virtual machine, without and with the optimizations of the parse tree (flag -O, see Optimizer.py).
+# Usage: python benchmarks/optimizer.py
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from main import parse
+from Compiler import JavaScriptCompiler
+from Optimizer import Optimizer
+from SymbolTable import SymbolTable
+from Transformer import TreeToJS
+from VirtualMachine import BytecodeCompiler, VirtualMachine
+
+constant_operations = """
+let total = 0
+let k = 0
+while (k < 20000) {
+    total += 60 * 60 * 24 - 400 / 8
+    if (10 > 5) {
+        k++
+    }
+}
+console.log(total)
+"""
+
+invariant_operations = """
+function scale(n, width, height) {
+    let s = 0
+    let i = 0
+    while (i < n) {
+        s += i * (width * height - 1) / (width + height)
+        i++
+    }
+    return s
+}
+total = scale(20000, 640, 480)
+console.log(total)
+"""
+
+engines = {
+    'compiled': lambda transformer, tree: JavaScriptCompiler(transformer).compile(tree)(),
+    'vm': lambda transformer, tree: VirtualMachine(transformer).run(BytecodeCompiler(transformer).compile(tree)),
+}
+
+
+def run(execute, tree):
+    """
+    :return: the best execution time in seconds over 5 runs and the output of the program
+    """
+    times = []
+    for _ in range(5):
+        transformer = TreeToJS(SymbolTable())  # every run starts from an empty global scope
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            start = time.perf_counter()
+            execute(transformer, tree)
+            times.append(time.perf_counter() - start)
+    return min(times), output.getvalue()
+
+
+def main():
+    print("%-22s %-10s %12s %12s %10s" % ("script", "engine", "plain", "-O", "speed-up"))
+    for name, script in [("constant_operations", constant_operations), ("invariant_operations", invariant_operations)]:
+        tree = parse(script)
+        optimized_tree = Optimizer(TreeToJS(SymbolTable())).optimize(tree)
+        for engine, execute in engines.items():
+            plain, plain_output = run(execute, tree)
+            optimized, optimized_output = run(execute, optimized_tree)
+            assert plain_output == optimized_output, "the optimized program prints a different output"
+            print("%-22s %-10s %10.1fms %10.1fms %9.2fx" % (name, engine, plain * 1000, optimized * 1000,
+                                                           plain / optimized))
+
+
+if __name__ == '__main__':
+    main()
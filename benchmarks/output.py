@@ -0,0 +1,42 @@
+# Output benchmark: a loop printing a line at every iteration, executed with each output sink and flush policy. The
+# stream sinks write to the null device, so the times do not depend on the terminal.
+# Usage: python benchmarks/output.py [number of printed lines]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from OutputSink import CaptureSink, NullSink, StreamSink
+from Runtime import Runtime
+
+script = '''
+let i = 0
+while (i < %d) {
+  console.log("line " + i)
+  i++
+}
+'''
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    source = script % lines
+    with open(os.devnull, 'w') as devnull:
+        sinks = [
+            ("stream, flush always", StreamSink(devnull, 'always')),
+            ("stream, flush line", StreamSink(devnull, 'line')),
+            ("stream, flush full", StreamSink(devnull, 'full')),
+            ("capture", CaptureSink()),
+            ("null (--quiet)", NullSink()),
+        ]
+        print("%-24s %12s" % ("sink", "time s"))
+        for name, sink in sinks:
+            runtime = Runtime(output=sink)
+            start = time.perf_counter()
+            runtime.run(source)
+            print("%-24s %12.3f" % (name, time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main()
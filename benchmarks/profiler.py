@@ -0,0 +1,57 @@
+# Profiler benchmark: the workloads of the benchmark suite (benchmarks/workloads) executed by the compiled engine without
+# profiler, with the instrumenting profiler (every call timed, every line counted) and with the sampling profiler, to
+# compare the overhead of the two modes of --profile.
+# Usage: python benchmarks/profiler.py
+import gc
+import os
+import sys
+import time
+
+benchmarks_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(benchmarks_dir))
+
+from OutputSink import NullSink
+from Profiler import Profiler, SamplingProfiler
+from Runtime import Runtime, get_parser
+
+configurations = [
+    ("no profiler", lambda: None),
+    ("instrumenting", Profiler),
+    ("sampling", SamplingProfiler),
+]
+
+
+def best_time(source, profiler, repeat=5):
+    """
+    :param profiler: function returning a new profiler, or None
+    :return: the best execution time in seconds of the source (parse excluded)
+    """
+    times = []
+    for _ in range(repeat):
+        runtime = Runtime('compiled', profiler=profiler(), output=NullSink())
+        program = runtime.compile(runtime.parse(source))
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            runtime.call(program)
+            times.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return min(times)
+
+
+def main():
+    get_parser(propagate_positions=True)  # the profilers record the lines of the statements
+    workloads_dir = os.path.join(benchmarks_dir, 'workloads')
+    print("%-18s" % "script" + "".join("%18s" % name for name, _ in configurations))
+    for name in sorted(os.listdir(workloads_dir)):
+        with open(os.path.join(workloads_dir, name)) as f:
+            source = f.read()
+        times = [best_time(source, profiler) for _, profiler in configurations]
+        print("%-18s" % os.path.splitext(name)[0] + "%16.1fms" % (times[0] * 1000)
+              + "".join("%+17.1f%%" % ((elapsed / times[0] - 1) * 100) for elapsed in times[1:]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+# Program cache benchmark: latency of one request (Runtime.run of a script with a new global scope) without cache,
+# with the parse trees and the compiled programs in memory, and with only the on-disk tier warm (es. after a restart).
+# Usage: python benchmarks/program_cache.py [number of requests per script]
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from ProgramCache import ProgramCache
+from Runtime import Runtime
+
+tests_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'javascript_tests')
+scripts = ['test_6.js', 'test_8.js', 'test_9.js']  # the scripts without keyboard input
+
+
+def latency(runtime, source, requests):
+    """
+    :return: the mean time of a request in milliseconds
+    """
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(requests):
+            runtime.reset()  # every request starts from an empty global scope
+            runtime.run(source)
+    return (time.perf_counter() - start) / requests * 1000
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print("%-12s %12s %12s %12s %10s" % ("script", "no cache", "memory", "disk", "speed-up"))
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for name in scripts:
+            with open(os.path.join(tests_dir, name)) as f:
+                source = f.read()
+            uncached = latency(Runtime(), source, requests)
+            memory_cache = ProgramCache()
+            runtime = Runtime(cache=memory_cache)
+            latency(runtime, source, 1)  # warm up
+            cached = latency(runtime, source, requests)
+            # a new cache on the same directory: the first request of each runtime reads the tree from disk
+            disk_cache = ProgramCache(cache_dir=cache_dir)
+            latency(Runtime(cache=disk_cache), source, 1)
+            disk = min(latency(Runtime(cache=ProgramCache(cache_dir=cache_dir)), source, 1) for _ in range(20))
+            print("%-12s %10.3fms %10.3fms %10.3fms %9.1fx" % (name, uncached, cached, disk, uncached / cached))
+
+
+if __name__ == '__main__':
+    main()
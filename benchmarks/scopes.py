@@ -0,0 +1,49 @@
+# Scope benchmark: runs the same nested loops and function calls while a growing array is visible in the global scope.
+# Entering and leaving a block or a function must not depend on the amount of data that is visible from it.
+# Usage: python benchmarks/scopes.py
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from main import parse
+from Interpreter import JavaScriptInterpreter, js_transformer
+from SymbolTable import SymbolTable
+
+prelude = """
+let data = [%s]
+let hits = 0
+"""
+
+workload = """
+function touch(k) {
+    if (k < data.length) {
+        hits++
+    }
+}
+let i = 0
+while (i < 100) {
+    let j = 0
+    while (j < 5) {
+        touch(j)
+        j++
+    }
+    i++
+}
+"""
+
+
+def main():
+    tree = parse(workload)
+    print("%12s %12s" % ("array size", "time"))
+    for size in [10, 1000, 10000, 100000]:
+        js_transformer.symbol_table = SymbolTable()  # every run starts from an empty global scope
+        JavaScriptInterpreter().visit(parse(prelude % ", ".join(str(k) for k in range(size))))
+        start = time.perf_counter()  # only the loops are measured, not the creation of the array
+        JavaScriptInterpreter().visit(tree)
+        print("%12d %10.1fms" % (size, (time.perf_counter() - start) * 1000))
+
+
+if __name__ == '__main__':
+    main()
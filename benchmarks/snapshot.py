@@ -0,0 +1,84 @@
+# Snapshot benchmark: a prelude declaring many functions and building constant tables with loops is executed before
+# a short script, either by executing the prelude again for every runtime or by restoring the snapshot taken after it
+# (Snapshot.py). It reports the size of the snapshot, the time to load it and the start-up time of a runtime.
+# Usage: python benchmarks/snapshot.py [engine]
+import os
+import sys
+import time
+
+benchmarks_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(benchmarks_dir))
+
+from OutputSink import NullSink
+from Runtime import Runtime
+from Snapshot import Snapshot
+
+functions = 100
+table_size = 2000
+
+function_template = """
+function helper%(n)d(x, y) {
+    let total = x
+    let i = 0
+    while (i < y) {
+        total += i * %(n)d
+        i++
+    }
+    return total
+}
+"""
+
+prelude = "".join(function_template % {'n': n} for n in range(functions)) + """
+let table = []
+let k = 0
+while (k < %(size)d) {
+    table[k] = k * k
+    k++
+}
+const limit = %(size)d
+""" % {'size': table_size}
+
+script = """
+let value = helper7(3, 10)
+table[0] = value
+console.log(table[1999])
+"""
+
+
+def best(function, repeat=20):
+    """
+    :return: the best time of the function in seconds
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    engine = sys.argv[1] if len(sys.argv) > 1 else 'compiled'
+    runtime = Runtime(engine, output=NullSink())
+    runtime.run(prelude)
+    data = runtime.snapshot().dumps()
+    snapshot = Snapshot.loads(data)
+    print("prelude: %d functions, a table of %d numbers" % (functions, table_size))
+    print("snapshot: %d bytes, loaded in %.2f ms" % (len(data), best(lambda: Snapshot.loads(data)) * 1000))
+
+    def from_prelude():
+        fresh = Runtime(engine, output=NullSink())
+        fresh.run(prelude)
+        fresh.run(script)
+
+    def from_snapshot():
+        fresh = Runtime(engine, output=NullSink())
+        fresh.restore(snapshot)
+        fresh.run(script)
+
+    print("%-30s %10.2f ms" % ("prelude executed every time", best(from_prelude) * 1000))
+    print("%-30s %10.2f ms" % ("snapshot restored", best(from_snapshot) * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+# Start-up benchmark: measures the wall time of short interpreter processes with a cold parser cache,
+# a warm parser cache and with the cache disabled (--no-parser-cache).
+# Usage: python benchmarks/startup.py [-n RUNS]
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+
+project_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+main_path = os.path.join(project_dir, "main.py")
+
+
+def run_interpreter(script_path, cache_dir, extra_args=()):
+    """
+    Runs the interpreter in a new process
+    :param script_path: path of the JavaScript script to be executed
+    :param cache_dir: directory used as parser cache
+    :param extra_args: additional command line flags
+    :return: the wall time of the process in seconds
+    """
+    env = dict(os.environ, JS_INTERPRETER_CACHE_DIR=cache_dir)
+    start = time.perf_counter()
+    subprocess.run([sys.executable, main_path, "-s", script_path, *extra_args], env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def main():
+    argument_parser = ArgumentParser(description="Interpreter start-up benchmark")
+    argument_parser.add_argument("-n", "--runs", help="number of runs for each configuration", type=int, default=10)
+    args = argument_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        script_path = os.path.join(work_dir, "startup.js")
+        with open(script_path, "w") as f:
+            f.write("let a = 1\nconsole.log(a)\n")
+
+        cold, warm, disabled = [], [], []
+        for i in range(args.runs):
+            cache_dir = os.path.join(work_dir, "cache_%d" % i)  # empty directory: the parser has to be built
+            cold.append(run_interpreter(script_path, cache_dir))
+            warm.append(run_interpreter(script_path, cache_dir))  # the parser is loaded from the cache
+            disabled.append(run_interpreter(script_path, cache_dir, ["--no-parser-cache"]))
+
+    print("%-20s %10s %10s %10s" % ("configuration", "median", "min", "max"))
+    for name, times in [("cold cache", cold), ("warm cache", warm), ("--no-parser-cache", disabled)]:
+        print("%-20s %9.1fms %9.1fms %9.1fms" % (name, statistics.median(times) * 1000, min(times) * 1000,
+                                                 max(times) * 1000))
+    print("warm start speed-up: %.1fx" % (statistics.median(cold) / statistics.median(warm)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+# String building benchmark: a while loop builds a string of growing size by appending 100 characters at a time with
+# +=. With the ropes (Rope.py) the time per append does not depend on the length of the string, so the time grows
+# linearly with the size; with plain Python strings (ropes disabled) every append copies the whole string, so the time
+# grows quadratically (measured only on the smaller sizes).
+# Usage: python benchmarks/strings.py [engine]
+import os
+import sys
+import time
+
+benchmarks_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(benchmarks_dir))
+
+import Rope
+from OutputSink import NullSink
+from Runtime import Runtime
+
+chunk = 'x' * 100
+
+script = """
+let s = ""
+let i = 0
+while (i < %(appends)d) {
+    s += "%(chunk)s"
+    i++
+}
+console.log(s.length)
+"""
+
+
+def build(engine, size):
+    """
+    :param size: length of the string in characters
+    :return: the time to build the string in seconds
+    """
+    runtime = Runtime(engine, output=NullSink())
+    program = runtime.compile(runtime.parse(script % {'appends': size // len(chunk), 'chunk': chunk}))
+    start = time.perf_counter()
+    runtime.call(program)
+    return time.perf_counter() - start
+
+
+def main():
+    engine = sys.argv[1] if len(sys.argv) > 1 else 'compiled'
+    print("%-10s %14s %18s %16s %18s" % ("size MB", "ropes s", "ropes us/append", "plain s", "plain us/append"))
+    for size_mb in [0.25, 0.5, 1, 2, 5, 10]:
+        size = int(size_mb * 10 ** 6)
+        appends = size // len(chunk)
+        ropes = build(engine, size)
+        row = "%-10g %14.3f %18.2f" % (size_mb, ropes, ropes / appends * 1e6)
+        if size_mb <= 2:
+            Rope.min_length, min_length = 2 ** 62, Rope.min_length  # the concatenations give plain strings
+            try:
+                plain = build(engine, size)
+            finally:
+                Rope.min_length = min_length
+            row += " %16.3f %18.2f" % (plain, plain / appends * 1e6)
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+# Benchmark suite: executes the CPU-heavy workloads of benchmarks/workloads (or the given scripts) and reports, for each
+# script, the parse time, the execution time (compilation included), the peak memory allocated during the execution and
+# the operations per second. The number of operations of a workload is declared in its header ("// operations: N"),
+# es. the iterations of its inner loop or the number of calls. The times are the medians of the repetitions, together
+# with their noise (the median absolute deviation, relative to the median); the peak memory is measured with tracemalloc
+# in a separate run, because tracing the allocations slows the execution down. A script that raises an error is
+# reported as failed and is not measured.
+# The results can be written in a JSON file and compared with the results of a previous run (the baseline):
+# - by default only the outputs of the scripts are compared with benchmarks/baseline.json, committed with the code, so
+#   a change of the semantics (or a script that fails) is reported on any machine;
+# - with --baseline FILE, recorded on the same machine, the execution times and the peak memory are compared too: a
+#   script is a regression when its time grows more than the threshold (25% by default, raised to three times the
+#   noise of the script when the noise is higher) or its peak memory more than the memory threshold (10% by default).
+#   A baseline recorded on another machine is used only for the outputs.
+# In both cases the suite exits with status 1 when there are regressions.
+# Usage: python benchmarks/suite.py [--engine compiled|vm|interpreter] [-O] [--repeat N] [--json FILE]
+#                                   [--baseline FILE | --no-baseline] [--threshold PERCENT]
+#                                   [--memory-threshold PERCENT] [script ...]
+# es. python benchmarks/suite.py --json before.json  (before a change)
+#     python benchmarks/suite.py --baseline before.json  (after the change, on the same machine)
+import gc
+import hashlib
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from argparse import ArgumentParser
+
+benchmarks_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(benchmarks_dir))
+
+import lark
+
+from Interpreter import JavaScriptInterpreter, js_transformer
+from OutputSink import CaptureSink
+from Runtime import Runtime
+from SymbolTable import SymbolTable
+
+workloads_dir = os.path.join(benchmarks_dir, 'workloads')
+default_baseline = os.path.join(benchmarks_dir, 'baseline.json')
+
+operations_header = re.compile(r'^//\s*operations:\s*(\d+)', re.M)
+
+
+def execute(engine, optimize, source):
+    """
+    Parses and executes a script in a new global scope
+    :param engine: 'compiled', 'vm' or 'interpreter' (the tree-walking interpreter of Interpreter.py)
+    :return: the parse time, the execution time (in seconds) and the output of the script
+    """
+    output = CaptureSink()
+    if engine == 'interpreter':
+        runtime = Runtime(output=output)  # only used to parse the script
+        js_transformer.symbol_table, js_transformer.output = SymbolTable(), output
+    else:
+        runtime = Runtime(engine, optimize, output=output)
+    gc.collect()
+    gc.disable()  # like timeit, so that a collection does not fall at random in one of the runs
+    try:
+        start = time.perf_counter()
+        tree = runtime.parse(source)
+        parsed = time.perf_counter()
+        if engine == 'interpreter':
+            JavaScriptInterpreter().visit(tree)  # the interpreter modifies the tree, so it is parsed at every run
+        else:
+            runtime.execute(runtime.optimize(tree))
+        executed = time.perf_counter()
+    finally:
+        gc.enable()
+    return parsed - start, executed - parsed, output.getvalue()
+
+
+def peak_memory(engine, optimize, source):
+    """
+    :return: the peak memory in bytes allocated while parsing and executing the script
+    """
+    tracemalloc.start()
+    try:
+        execute(engine, optimize, source)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure(path, engine, optimize, repeat):
+    """
+    :return: the results of a script: times in seconds, peak memory in bytes, operations per second and the digest of
+    the output
+    """
+    with open(path) as f:
+        source = f.read()
+    match = operations_header.search(source)
+    operations = int(match.group(1)) if match else None
+    runs = [execute(engine, optimize, source) for _ in range(repeat)]
+    outputs = {output for _, _, output in runs}
+    if len(outputs) > 1:
+        raise RuntimeError('%s printed different outputs in different runs' % path)
+    execute_times = [execution for _, execution, _ in runs]
+    execute_time = statistics.median(execute_times)
+    return {
+        'parse_s': statistics.median(parse for parse, _, _ in runs),
+        'execute_s': execute_time,
+        'execute_noise': statistics.median(abs(t - execute_time) for t in execute_times) / execute_time
+        if execute_time else 0.0,
+        'peak_bytes': peak_memory(engine, optimize, source),
+        'operations': operations,
+        'ops_per_s': operations / execute_time if operations and execute_time else None,
+        'output_sha256': hashlib.sha256(outputs.pop().encode('utf8')).hexdigest(),
+    }
+
+
+def machine():
+    """
+    :return: the description of the machine, the times of two runs can be compared only if it is the same
+    """
+    return {'node': platform.node(), 'machine': platform.machine(), 'processor': platform.processor(),
+            'system': platform.system(), 'python': platform.python_version()}
+
+
+def compare(results, baseline, threshold, memory_threshold, timings):
+    """
+    :param results: results of this run
+    :param baseline: results of the baseline run
+    :param threshold: minimum growth (in percent) of the execution time reported as regression, raised to three times
+    the noise of the script
+    :param memory_threshold: maximum growth (in percent) of the peak memory
+    :param timings: if False only the outputs are compared
+    :return: the rows of the comparison and the number of regressions
+    """
+    if timings:
+        rows = ["%-20s %12s %12s %9s %9s %12s %12s %9s  %s" % ("script", "base s", "exec s", "change", "allowed",
+                                                              "base MiB", "peak MiB", "change", "")]
+    else:
+        rows = ["%-20s %s" % ("script", "output")]
+    regressions = 0
+    for name, current in results['scripts'].items():
+        previous = baseline['scripts'].get(name)
+        if previous is None or 'error' in previous:
+            rows.append("%-20s %s" % (name, "not measured in the baseline"))
+            continue
+        if 'error' in current:
+            regressions += 1
+            rows.append("%-20s %s" % (name, "FAILED"))
+            continue
+        notes = []
+        if current['output_sha256'] != previous['output_sha256']:
+            notes.append('OUTPUT CHANGED')
+        if not timings:
+            if notes:
+                regressions += 1
+            rows.append("%-20s %s" % (name, ' '.join(notes) or 'same'))
+            continue
+        time_change = (current['execute_s'] / previous['execute_s'] - 1) * 100 if previous['execute_s'] else 0.0
+        memory_change = (current['peak_bytes'] / previous['peak_bytes'] - 1) * 100 if previous['peak_bytes'] else 0.0
+        noise = max(current.get('execute_noise', 0.0), previous.get('execute_noise', 0.0)) * 100
+        allowed = max(threshold, 3 * noise)
+        if time_change > allowed:
+            notes.append('SLOWER')
+        if memory_change > memory_threshold:
+            notes.append('MORE MEMORY')
+        if notes:
+            regressions += 1
+        rows.append("%-20s %12.4f %12.4f %8.1f%% %8.1f%% %12.2f %12.2f %8.1f%%  %s" % (
+            name, previous['execute_s'], current['execute_s'], time_change, allowed, previous['peak_bytes'] / 2 ** 20,
+            current['peak_bytes'] / 2 ** 20, memory_change, ' '.join(notes)))
+    return rows, regressions
+
+
+def main():
+    argument_parser = ArgumentParser(description="Benchmark suite of the JavaScript interpreter")
+    argument_parser.add_argument("scripts", nargs="*", help="scripts to be executed (default: benchmarks/workloads)")
+    argument_parser.add_argument("--engine", choices=["compiled", "vm", "interpreter"], default="compiled")
+    argument_parser.add_argument("-O", "--optimize", help="optimizes the parse trees before the execution",
+                                 action="store_true")
+    argument_parser.add_argument("--repeat", help="executions of each script (default: %(default)s)", type=int,
+                                 default=5)
+    argument_parser.add_argument("--json", help="writes the results in a JSON file", metavar="FILE")
+    argument_parser.add_argument("--baseline", help="compares the times, the peak memory and the outputs with the ones "
+                                                    "of a JSON file recorded on this machine (default: only the outputs "
+                                                    "are compared with benchmarks/baseline.json)", metavar="FILE")
+    argument_parser.add_argument("--no-baseline", help="does not compare the results with a baseline",
+                                 action="store_true")
+    argument_parser.add_argument("--threshold", help="growth of the execution time reported as regression, in percent, "
+                                                     "raised to three times the noise of the script (default: "
+                                                     "%(default)s)", type=float, default=25.0)
+    argument_parser.add_argument("--memory-threshold", help="growth of the peak memory reported as regression, in "
+                                                            "percent (default: %(default)s)", type=float, default=10.0)
+    args = argument_parser.parse_args()
+    if args.engine == 'interpreter' and args.optimize:
+        argument_parser.error("the optimizer is not used by the interpreter")
+    if args.baseline and args.no_baseline:
+        argument_parser.error("--baseline and --no-baseline are mutually exclusive")
+    scripts = args.scripts or sorted(os.path.join(workloads_dir, name) for name in os.listdir(workloads_dir)
+                                     if name.endswith('.js'))
+
+    results = {
+        'engine': args.engine,
+        'optimize': args.optimize,
+        'repeat': args.repeat,
+        'python': platform.python_version(),
+        'lark': lark.__version__,
+        'machine': machine(),
+        'scripts': {},
+    }
+    print("%-20s %10s %12s %12s %14s" % ("script", "parse ms", "execute ms", "peak MiB", "ops/s"))
+    for path in scripts:
+        name = os.path.splitext(os.path.basename(path))[0]
+        try:
+            result = measure(path, args.engine, args.optimize, args.repeat)
+        except Exception as e:
+            results['scripts'][name] = {'error': '%s: %s' % (type(e).__name__, e)}
+            print("%-20s failed: %s" % (name, results['scripts'][name]['error']))
+            continue
+        results['scripts'][name] = result
+        ops_per_s = "%14.0f" % result['ops_per_s'] if result['ops_per_s'] is not None else "%14s" % "-"
+        print("%-20s %10.2f %12.2f %12.2f %s" % (name, result['parse_s'] * 1000, result['execute_s'] * 1000,
+                                                 result['peak_bytes'] / 2 ** 20, ops_per_s))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+        print("Results written to %s" % args.json)
+
+    baseline_path = args.baseline
+    if baseline_path is None and not args.no_baseline and os.path.exists(default_baseline):
+        baseline_path = default_baseline
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        print()
+        timings = args.baseline is not None  # the outputs are the same with every engine, the times are not
+        if timings and (baseline['engine'], baseline['optimize']) != (results['engine'], results['optimize']):
+            print("warning: the baseline has been measured with engine %s%s" % (baseline['engine'],
+                                                                             ' -O' if baseline['optimize'] else ''))
+        if timings and baseline.get('machine') != results['machine']:
+            print("warning: %s has been recorded on another machine, only the outputs are compared" % baseline_path)
+            timings = False
+        rows, regressions = compare(results, baseline, args.threshold, args.memory_threshold, timings)
+        print('\n'.join(rows))
+        if timings:
+            print("%d regressions (threshold %.1f%%, memory threshold %.1f%%)" % (regressions, args.threshold,
+                                                                               args.memory_threshold))
+        else:
+            print("%d regressions (outputs only)" % regressions)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,46 @@
+# Syntax error benchmark: time to parse a malformed script and classify its error with Lark's match_examples (which
+# parses again all the examples at every error) and with the map precomputed by ErrorClassifier.py.
+# Usage: python benchmarks/syntax_errors.py [number of repetitions]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from lark import UnexpectedInput
+
+from ErrorClassifier import ErrorClassifier, error_examples
+from Runtime import get_parser
+
+sources = ['if (a == b', 'let a = [foo, fo,', 'const foo 1', 'function foo() { return 1', 'let x = 1 +* 2']
+
+
+def error(parser, source):
+    try:
+        parser.parse(source)
+    except UnexpectedInput as e:
+        return e
+
+
+def main():
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    parser = get_parser()
+    start = time.perf_counter()
+    classifier = ErrorClassifier.of(parser)
+    print("map built in %.2f ms (%d examples)" % ((time.perf_counter() - start) * 1000,
+                                                  sum(len(examples) for examples in error_examples.values())))
+    print("%-28s %16s %16s %10s" % ("source", "match_examples", "map", "speed-up"))
+    for source in sources:
+        start = time.perf_counter()
+        for _ in range(repetitions):
+            error(parser, source).match_examples(parser.parse, error_examples, use_accepts=True)
+        examples_time = (time.perf_counter() - start) / repetitions * 1000
+        start = time.perf_counter()
+        for _ in range(repetitions):
+            classifier.classify(error(parser, source))
+        map_time = (time.perf_counter() - start) / repetitions * 1000
+        print("%-28r %13.3f ms %13.3f ms %9.1fx" % (source, examples_time, map_time, examples_time / map_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+// an array filled one cell at a time, then scanned five times for the sum and the maximum of its elements
+// operations: 60000
+let size = 10000
+let values = []
+let i = 0
+while (i < size) {
+    values[i] = size - i * 3
+    i++
+}
+let sum = 0
+let largest = -1
+let round = 0
+while (round < 5) {
+    let k = 0
+    while (k < values.length) {
+        let v = values[k]
+        sum += v
+        if (v > largest) {
+            largest = v
+        }
+        k++
+    }
+    round++
+}
+console.log(sum)
+console.log(largest)
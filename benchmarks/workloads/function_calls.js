@@ -0,0 +1,20 @@
+// a small function with three arguments called in a loop
+// operations: 20000
+function clamp(x, low, high) {
+    let result = x
+    if (x < low) {
+        result = low
+    }
+    if (x > high) {
+        result = high
+    }
+    return result
+}
+let total = 0
+let i = 0
+while (i < 20000) {
+    let c = clamp(i - 5000, 0, 10000)
+    total += c
+    i++
+}
+console.log(total)
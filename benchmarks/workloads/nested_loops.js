@@ -0,0 +1,16 @@
+// nested while loops with arithmetic, comparisons and compound assignments
+// operations: 90000
+let total = 0
+let i = 0
+while (i < 300) {
+    let j = 0
+    while (j < 300) {
+        total += i * j
+        if (j > i) {
+            total -= 1
+        }
+        j++
+    }
+    i++
+}
+console.log(total)
@@ -0,0 +1,13 @@
+// recursive calls: naive Fibonacci, fib(n) makes 2 * fib(n + 1) - 1 calls
+// operations: 8361
+function fib(n) {
+    let result = n
+    if (n >= 2) {
+        let a = fib(n - 1)
+        let b = fib(n - 2)
+        result = a + b
+    }
+    return result
+}
+let f = fib(18)
+console.log(f)
@@ -0,0 +1,15 @@
+// strings built piece by piece with template literals
+// operations: 20000
+let total = 0
+let rows = 0
+while (rows < 200) {
+    let row = ""
+    let i = 0
+    while (i < 100) {
+        row = `${row}[${rows},${i}]`
+        i++
+    }
+    total += row.length
+    rows++
+}
+console.log(total)
@@ -0,0 +1,57 @@
+# Access to the files of the on-disk caches (ParserCache.py, ProgramCache.py).
+# Reading a cache file can execute code: Lark.load unpickles the parser and the program cache unpickles the parse
+# trees. Anyone able to write in the cache directory could therefore run code as the user of the interpreter, so a
+# cache file is read only when no other user can have written it: the directory must belong to the user and be
+# accessible only by the user (mode 0700), and the file must belong to the user and not be writable by the others.
+# The cache directories are created with mode 0700, and an existing directory of the user with a wider mode is
+# restricted to 0700 before writing in it. A file that fails the checks is not read: the cache is rebuilt as after a
+# cold start. On the systems without user ids (Windows) the checks are skipped, the cache is in the profile of the user.
+import os
+import stat
+
+
+def owned(info):
+    """
+    :param info: os.stat_result of a file or a directory
+    :return: True if the file belongs to the user running the interpreter
+    """
+    return not hasattr(os, 'getuid') or info.st_uid == os.getuid()
+
+
+def make_private_directory(path):
+    """
+    Creates the cache directory with mode 0700, or restricts an existing directory of the user to mode 0700
+    :param path: path of the cache directory
+    :return: None, raises PermissionError if the path is not a directory of the user (es. a symbolic link planted by
+    another user)
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if not hasattr(os, 'getuid'):
+        return
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or not owned(info):
+        raise PermissionError('the cache directory %s does not belong to the user' % path)
+    if stat.S_IMODE(info.st_mode) & 0o077:
+        os.chmod(path, 0o700)
+
+
+def open_private_file(path):
+    """
+    Opens a cache file for reading, after checking that no other user can have written it
+    :param path: path of the cache file
+    :return: the file object (binary mode), raises PermissionError if the directory or the file are not private to the
+    user, FileNotFoundError if the file does not exist
+    """
+    f = open(path, 'rb')
+    try:
+        if hasattr(os, 'getuid'):
+            directory = os.lstat(os.path.dirname(path) or '.')
+            if not stat.S_ISDIR(directory.st_mode) or not owned(directory) or stat.S_IMODE(directory.st_mode) & 0o077:
+                raise PermissionError('the cache directory of %s is accessible by other users' % path)
+            info = os.fstat(f.fileno())  # the opened file, not a file renamed in its place after the check
+            if not owned(info) or stat.S_IMODE(info.st_mode) & 0o022:
+                raise PermissionError('the cache file %s is writable by other users' % path)
+    except BaseException:
+        f.close()
+        raise
+    return f
@@ -0,0 +1,110 @@
+# Type coercion of the arithmetic operators (+, -, *, /).
+# Instead of testing the types of the operands with a chain of if/elif, each operator has a dispatch table that maps
+# the pair (type of the left operand, type of the right operand) to the function computing the result, so the right
+# case is found with a single dictionary lookup. The conversion of a string to a number (ToNumber) is cached, because
+# the same strings (e.g., the values read with prompt) are usually converted many times.
+# The operations without a meaning give NaN, the division by zero gives an infinity (see js_values.py).
+# The concatenations give a rope when the result is long (Rope.py), the other operations convert the ropes to strings.
+import operator
+from functools import lru_cache
+
+from Rope import Rope, concatenate
+from js_values import Undefined, NaN, number_to_string, divide
+
+number_types = (int, float, bool)  # the booleans are numbers in the arithmetic operations (true is 1, false is 0)
+
+
+@lru_cache(maxsize=1024)
+def to_number(string):
+    """
+    Converts a string to a number, like JavaScript's ToNumber
+    :param string: string to be converted
+    :return: the integer or float value of the string, NaN if the string is not a number
+    """
+    try:
+        return int(string)
+    except ValueError:
+        try:
+            return float(string)
+        except ValueError:
+            return NaN
+
+
+def boolean_to_string(value):
+    return 'true' if value else 'false'
+
+
+def nan(left, right):
+    return NaN
+
+
+def add_same_type(left, right):
+    """
+    Addition of operands without a specific case: the values of the same type (es. two arrays) are concatenated
+    """
+    if type(left) == type(right):
+        return left + right
+    return NaN
+
+
+def arithmetic_table(operation):
+    """
+    Builds the dispatch table of -, * and /, which convert both the operands to numbers
+    :param operation: function computing the operation between two numbers
+    :return: dictionary (left type, right type) -> function(left, right)
+    """
+    def string_number(left, right):
+        return operation(to_number(left), right)
+
+    def number_string(left, right):
+        return operation(left, to_number(right))
+
+    def string_string(left, right):
+        return operation(to_number(left), to_number(right))
+
+    table = {(str, str): string_string}
+    for left_type in number_types:
+        for right_type in number_types:
+            table[left_type, right_type] = operation
+        table[str, left_type] = string_number
+        table[left_type, str] = number_string
+    return with_ropes(table)
+
+
+def with_ropes(table):
+    """
+    Adds to a dispatch table the cases of the ropes, which are converted to strings and given to the cases of str
+    :return: the table
+    """
+    for (left_type, right_type), operation in list(table.items()):
+        if left_type is str:
+            table[Rope, right_type] = lambda left, right, operation=operation: operation(str(left), right)
+        if right_type is str:
+            table[left_type, Rope] = lambda left, right, operation=operation: operation(left, str(right))
+        if left_type is str and right_type is str:
+            table[Rope, Rope] = lambda left, right, operation=operation: operation(str(left), str(right))
+    return table
+
+
+# the addition concatenates when one of the operands is a string
+add_table = {(left_type, right_type): operator.add for left_type in number_types for right_type in number_types}
+add_table.update({
+    (str, str): concatenate,
+    (str, int): lambda left, right: concatenate(left, str(right)),
+    (str, float): lambda left, right: concatenate(left, number_to_string(right)),
+    (int, str): lambda left, right: concatenate(str(left), right),
+    (float, str): lambda left, right: concatenate(number_to_string(left), right),
+    (str, bool): lambda left, right: concatenate(left, boolean_to_string(right)),
+    (bool, str): lambda left, right: concatenate(boolean_to_string(left), right),
+    (str, Undefined): lambda left, right: concatenate(left, 'undefined'),
+    (Undefined, str): lambda left, right: concatenate('undefined', right),
+    (Undefined, Undefined): nan,
+})
+with_ropes(add_table)  # a rope on the right is converted to a string
+# a rope on the left is extended without copying it (see concatenate)
+for right_operand_type in [str, int, float, bool, Undefined]:
+    add_table[Rope, right_operand_type] = add_table[str, right_operand_type]
+add_table[Rope, Rope] = lambda left, right: concatenate(left, str(right))
+sub_table = arithmetic_table(operator.sub)
+mul_table = arithmetic_table(operator.mul)
+div_table = arithmetic_table(divide)
@@ -1,3 +1,5 @@
+from lark import UnexpectedInput
+
 # Reserved javascript keywords
 reserved_words = ['break', 'case', 'catch', 'class', 'const', 'continue', 'debugger', 'default', 'delete', 'do',
                   'else', 'export', 'extends', 'finally', 'for', 'function', 'if', 'import', 'in', 'instanceof',
@@ -59,3 +61,50 @@ class IsNotAFunction(JavaScriptSemanticError):
 
 class ConstAssignmentTypeError(JavaScriptSemanticError):
     pass
+
+
+class RangeError(JavaScriptSemanticError):
+    def __str__(self):
+        return 'RangeError: Maximum call stack size exceeded'
+
+
+# the executions stopped by the resource limits (ExecutionLimits.py) raise a termination error, which is not a
+# JavaScript error: the program is not at fault, it has just used more resources than allowed
+class ExecutionLimitExceeded(Exception):
+    pass
+
+
+class StepLimitExceeded(ExecutionLimitExceeded):
+    def __str__(self):
+        return 'ExecutionLimitExceeded: more than %d steps (loop iterations and function calls)' % self.args
+
+
+class TimeLimitExceeded(ExecutionLimitExceeded):
+    def __str__(self):
+        return 'ExecutionLimitExceeded: execution time longer than %g seconds' % self.args
+
+
+class SizeLimitExceeded(ExecutionLimitExceeded):
+    def __str__(self):
+        return 'ExecutionLimitExceeded: array or string longer than %d elements' % self.args
+
+
+# messages printed by the command line interface (main.py) and by the batch runner (BatchRunner.py)
+def script_error_message(error):
+    """
+    :param error: lexical or syntax error raised by parse for a script
+    :return: the message printed for the error
+    """
+    if isinstance(error, UnexpectedInput):
+        return f"LexicalError: scanning failed due to unexpected input at line {error.line} column {error.column}\n"
+    return str(error)
+
+
+def console_error_message(error):
+    """
+    :param error: lexical or syntax error raised by the console
+    :return: the message printed for the error
+    """
+    if isinstance(error, UnexpectedInput):
+        return f"LexicalError: scanning failed due to unexpected input at line {error.line} and column {error.column}\n"
+    return str(error)
@@ -0,0 +1,96 @@
+# Check of the console (Console.py): every valid test script is fed to the console one line at a time, and the
+# statements it generates must be the ones of the parse tree of the whole script, so a statement split across lines
+# (es. an if statement with the else in the next line, or with the block after the line of the condition) is parsed
+# as in a script. Then a few sessions are typed in the console of main.py (-c) and their output is compared with the
+# expected one.
+# Usage: python javascript_tests/check_console.py
+import os
+import re
+import subprocess
+import sys
+
+tests_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(tests_dir))
+
+from lark import UnexpectedInput
+
+from Console import Console
+from Runtime import get_parser
+
+# (lines typed in the console, expected output without the prompts)
+sessions = [
+    (['let x = 1;', 'if (x > 0) {', '  console.log("a");', '}', 'else {', '  console.log("b");', '}'], ['a']),
+    (['let x = 1;', 'if (x > 0)', '{', '  console.log("a");', '}'], ['a']),
+    (['let x = 1;', 'if (x < 0) {', '  console.log("a");', '}', 'else if (x > 0) {', '  console.log("b");', '}',
+      'else {', '  console.log("c");', '}'], ['b']),
+    (['let x = 1;', 'while (x < 3)', '{', '  x = x + 1;', '  console.log(x);', '}'], ['2', '3']),
+    (['if (true) {', '  console.log("a");', '}', 'console.log("b");'], ['a', 'b']),
+    (['if (true) {', '  console.log("a");', '}', '', 'console.log("b");'], ['a', 'b']),
+    (['if (true) {', '  console.log("a");', '}', 'else'],
+     ['LexicalError: scanning failed due to unexpected input at line 4 and column 1']),  # like in a script
+]
+
+
+def statements(tree):
+    """
+    :return: the list of the statements of a parse tree (the tree of a single statement is the statement itself)
+    """
+    return tree.children if tree.data == 'start' else [tree]
+
+
+def feed_lines(parser, lines):
+    """
+    :return: the statements generated by the console fed with the lines
+    """
+    console = Console(parser)
+    result = []
+    for line in lines:
+        for tree in console.feed(line):
+            result += statements(tree)
+    tree = console.end()
+    if tree is not None:
+        result += statements(tree)
+    return result
+
+
+def run_session(lines):
+    """
+    :return: the lines printed by the console of main.py, without the prompts
+    """
+    completed = subprocess.run([sys.executable, os.path.join(os.path.dirname(tests_dir), 'main.py'), '-c'],
+                               input='\n'.join(lines) + '\n', capture_output=True, text=True, timeout=60)
+    output = re.sub(r'(JS> |\.\.\. )', '', completed.stdout)
+    return [line for line in output.split('\n') if line and line != 'undefined']
+
+
+def main():
+    parser = get_parser()
+    failures = 0
+    checked = 0
+    for script in sorted(name for name in os.listdir(tests_dir) if name.endswith('.js')):
+        with open(os.path.join(tests_dir, script)) as f:
+            text = f.read()
+        try:
+            expected = statements(parser.parse(text))
+        except UnexpectedInput:
+            continue  # the scripts with errors are checked by check_syntax_errors.py
+        checked += 1
+        try:
+            result = feed_lines(parser, text.split('\n'))
+        except UnexpectedInput as error:
+            result = error
+        if result != expected:
+            failures += 1
+            print('MISMATCH %s: the console parses the lines differently from the script' % script)
+    for lines, expected in sessions:
+        checked += 1
+        result = run_session(lines)
+        if result != expected:
+            failures += 1
+            print('MISMATCH %r: %r instead of %r' % (' / '.join(lines), result, expected))
+    print('%d scripts and sessions, %d mismatches' % (checked, failures))
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,62 @@
+# Check of the classification of the syntax errors: every example of ErrorClassifier.py (also followed by other tokens),
+# and every prefix (made of whole lines) of the test scripts that is not a valid program, is classified both with the
+# precomputed map used by the runtimes (loaded from the parser cache) and with Lark's match_examples (which parses
+# again all the examples), and the two error classes are compared. Each example must also keep the class it is
+# listed under, unless match_examples itself gives it another one.
+# Usage: python javascript_tests/check_syntax_errors.py
+import os
+import sys
+
+tests_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(tests_dir))
+
+from lark import UnexpectedInput
+
+from ErrorClassifier import error_examples, get_classifier
+from Runtime import get_parser
+
+
+def classify(parser, classifier, source):
+    """
+    :return: the (class given by the classifier, class given by match_examples) of the error raised by the source, None
+    if the source is a valid program
+    """
+    try:
+        parser.parse(source)
+    except UnexpectedInput as error:
+        return classifier.classify(error), error.match_examples(parser.parse, error_examples, use_accepts=True)
+    return None
+
+
+def name(error_class):
+    return error_class.__name__ if error_class is not None else 'None'
+
+
+def main():
+    parser = get_parser()
+    classifier = get_classifier(parser)
+    sources = [(error_class, example) for error_class, examples in error_examples.items() for example in examples]
+    sources += [(None, example + suffix) for _, example in list(sources) for suffix in [' foo', ' 1;', ')', ']', '}']]
+    for script in sorted(name for name in os.listdir(tests_dir) if name.endswith('.js')):
+        with open(os.path.join(tests_dir, script)) as f:
+            text = f.read()
+        lines = text.split('\n')
+        sources += [(None, '\n'.join(lines[:end])) for end in range(1, len(lines))]
+    failures = 0
+    checked = 0
+    for listed_class, source in sources:
+        classes = classify(parser, classifier, source)
+        if classes is None:
+            continue
+        checked += 1
+        if classes[0] is not classes[1]:
+            failures += 1
+            print('MISMATCH %r: %s instead of %s' % (source[-60:], name(classes[0]), name(classes[1])))
+        elif listed_class is not None and classes[0] is not listed_class:
+            print('note     %r is listed under %s but matches %s' % (source, name(listed_class), name(classes[0])))
+    print('%d malformed sources, %d mismatches' % (checked, failures))
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,61 @@
+# Differential test of the execution engines: every test script is executed by main.py with the closure compiler and
+# with the bytecode virtual machine, with and without the optimizer (-O), with the memoization of the pure functions and
+# with the profiler, giving the same keyboard input to all of them, and the printed outputs are compared.
+# Usage: python javascript_tests/compare_engines.py
+import os
+import subprocess
+import sys
+import tempfile
+
+tests_dir = os.path.dirname(os.path.realpath(__file__))
+main_path = os.path.join(os.path.dirname(tests_dir), 'main.py')
+
+# command line flags of each configuration
+engines = {
+    'compiled': ['--engine', 'compiled'],
+    'vm': ['--engine', 'vm'],
+    'compiled -O': ['--engine', 'compiled', '-O'],
+    'vm -O': ['--engine', 'vm', '-O'],
+    'compiled --memoize-pure': ['--engine', 'compiled', '--memoize-pure'],
+    # the profile is written in the temporary directory, it only must not change the output
+    'compiled --profile': ['--engine', 'compiled', '--profile', os.path.join(tempfile.gettempdir(), 'compare_engines')],
+}
+
+# input typed at the prompt() calls of the test scripts
+inputs = {
+    'test_1.js': '7\n',
+    'test_2.js': '3\n4\n',
+    'test_3.js': '45\n20\nY\n25\nY\n10\nY\n40\nN\n',
+    'test_13.js': '4\n1\n',
+}
+
+
+def run(script, engine):
+    """
+    Executes a script with the given configuration
+    :return: the standard output of the interpreter
+    """
+    result = subprocess.run([sys.executable, main_path, '-s', script, *engines[engine]],
+                            input=inputs.get(os.path.basename(script), ''), capture_output=True, text=True)
+    return result.stdout
+
+
+def main():
+    scripts = sorted(name for name in os.listdir(tests_dir) if name.endswith('.js'))
+    failures = 0
+    for name in scripts:
+        outputs = {engine: run(os.path.join(tests_dir, name), engine) for engine in engines}
+        if len(set(outputs.values())) == 1:
+            print('ok       ' + name)
+            continue
+        failures += 1
+        print('MISMATCH ' + name)
+        for engine in engines:
+            print('--- ' + engine)
+            print(outputs[engine], end='')
+    print('%d scripts, %d mismatches' % (len(scripts), failures))
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,59 @@
+// This test checks the deep recursion: the calls in tail position (return f(...)) do not grow the call stack, the
+// other recursive calls can be nested up to the maximum depth, and a deeper recursion ends with a RangeError
+function sumTo(n, acc) {
+    if (n == 0) {
+        return acc
+    }
+    return sumTo(n - 1, acc + n)
+}
+let total = sumTo(100000, 0)
+console.log(total)
+
+function isEven(n) {
+    if (n == 0) {
+        return true
+    } else {
+        return isOdd(n - 1)
+    }
+}
+function isOdd(n) {
+    if (n == 0) {
+        return false
+    }
+    return isEven(n - 1)
+}
+let even = isEven(50001)
+console.log(even)
+
+function countDown(n, k) {
+    while (n > 0) {
+        if (n == k) {
+            return found(n)
+        }
+        n--
+    }
+    return 0
+}
+function found(n) {
+    return n * 10
+}
+let stop = countDown(100, 7)
+console.log(stop)
+
+function depth(n) {
+    if (n == 0) {
+        return 0
+    }
+    let d = depth(n - 1)
+    return d + 1
+}
+let nested = depth(5000)
+console.log(nested)
+
+function forever(n) {
+    let next = forever(n + 1)
+    return next
+}
+console.log("the next call exceeds the maximum call stack size")
+let never = forever(0)
+console.log("never printed")
@@ -0,0 +1,100 @@
+// pure functions: their calls can be cached (flag --memoize-pure)
+function fib(n) {
+    if (n < 2) {
+        return n
+    }
+    let a = fib(n - 1)
+    let b = fib(n - 2)
+    return a + b
+}
+
+function binomial(n, k) {
+    if (k == 0) {
+        return 1
+    }
+    if (k == n) {
+        return 1
+    }
+    let left = binomial(n - 1, k - 1)
+    let right = binomial(n - 1, k)
+    return left + right
+}
+
+function paths(rows, columns) {
+    let total = 0
+    let k = 0
+    while (k <= columns) {
+        let ways = binomial(rows + k, k)
+        total += ways
+        k++
+    }
+    return total
+}
+
+let f = fib(20)
+console.log(f)
+let c = binomial(18, 9)
+console.log(c)
+let p = paths(8, 8)
+console.log(p)
+
+// the arguments are compared with their types: 1, 1.0 and true are different arguments
+function describe(x) {
+    return `${x}:${-x}`
+}
+let d1 = describe(1)
+let d2 = describe(1.5)
+let d3 = describe(true)
+let d4 = describe("1")
+console.log(`${d1} ${d2} ${d3} ${d4}`)
+let zero = 0.0
+let negativeZero = -zero
+function inverse(x) {
+    return 1 / x
+}
+let i1 = inverse(zero)
+let i2 = inverse(negativeZero)
+console.log(`${i1} ${i2}`)
+
+// not pure: it prints, so every call is executed
+function noisy(n) {
+    console.log(`noisy ${n}`)
+    return n * 2
+}
+let n1 = noisy(4)
+let n2 = noisy(4)
+console.log(n1 + n2)
+
+// not pure: it reads a global variable, which changes between the calls
+let offset = 10
+function shifted(n) {
+    return n + offset
+}
+let s1 = shifted(1)
+offset = 20
+let s2 = shifted(1)
+console.log(`${s1} ${s2}`)
+
+// not pure: it calls a function that is not pure
+function twice(n) {
+    let once = noisy(n)
+    return once * 2
+}
+let t1 = twice(3)
+let t2 = twice(3)
+console.log(`${t1} ${t2}`)
+
+// an array argument is never cached: the array can change between the calls
+function first(list) {
+    return list[0]
+}
+let list = [1, 2, 3]
+let a1 = first(list)
+list[0] = 7
+let a2 = first(list)
+console.log(`${a1} ${a2}`)
+
+// a global variable with the name of a local variable is assigned by the declaration of the local variable
+var total = 0
+let p2 = paths(2, 2)
+console.log(`${p2} ${total}`)
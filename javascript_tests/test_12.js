@@ -0,0 +1,53 @@
+// This test checks the long strings built by concatenation (ropes): appending, reading the length, comparing,
+// indexing and printing them give the same results as for the short strings
+let s = ""
+let i = 0
+while (i < 300) {
+    s += "ab"
+    i++
+}
+console.log(s.length)
+let copy = s
+s += "!"
+console.log(`${copy.length} ${s.length}`)
+let other = copy + "?"
+console.log(`${s.length} ${other.length}`)
+let first = s[0]
+let last = s[600]
+console.log(`${first} ${last}`)
+let same = copy + "!"
+let equal = same == s
+let strictEqual = same === s
+let different = s !== other
+console.log(`${equal} ${strictEqual} ${different}`)
+
+// a long numeric string converted to a number
+let digits = ""
+let k = 0
+while (k < 300) {
+    digits += "0"
+    k++
+}
+digits += "42"
+let number = digits * 2
+let negated = -digits
+let sameNumber = digits == 42
+console.log(`${number} ${negated} ${sameNumber}`)
+
+// the strings built with template literals
+let t = ""
+let n = 0
+while (n < 100) {
+    t = `${t}x${n}`
+    n++
+}
+console.log(t.length)
+let empty = ""
+let full = t
+if (full) {
+    console.log("a long string is truthy")
+}
+let list = [copy, "short"]
+let element = list[0]
+console.log(element.length)
+console.log(t)
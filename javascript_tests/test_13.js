@@ -0,0 +1,36 @@
+// short-circuit evaluation of &&, || and of the ternary condition: the right operand (and the branch not taken) is
+// evaluated only when it gives the value, so its prompts and function calls are not executed otherwise
+let calls = 0
+function tick() {
+    calls++
+    return calls
+}
+
+let n = 3
+console.log(n > 5 && prompt("never asked ") > 0)
+console.log(n < 5 || prompt("never asked ") > 0)
+console.log(n < 5 && prompt("first number: ") > 2)
+console.log(n > 5 || prompt("second number: ") > 2)
+
+console.log(n > 5 && `${tick()}` == 1)
+console.log(n < 5 || `${tick()}` == 1)
+console.log(calls)
+console.log(n < 5 && `${tick()}` == 1)
+console.log(n > 5 || `${tick()}` == 2)
+console.log(calls)
+
+// nested guards: every operand is evaluated at most once, from left to right
+let guarded = n > 0 && n < 10 && `${tick()}` == 3
+console.log(guarded)
+let fallback = n > 10 || n < 0 || `${tick()}` == 4
+console.log(fallback)
+console.log(calls)
+
+// a guard protects an operand that would fail on a missing variable
+let safe = n > 5 && missing > 0
+console.log(safe)
+
+let message = n > 2 ? console.log("taken") : console.log("not taken")
+let taken = n > 2 ? tick() : tick()
+console.log(taken)
+console.log(calls)
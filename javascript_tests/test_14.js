@@ -0,0 +1,32 @@
+// This test checks the deepest recursion allowed by the default maximum call depth (10000 nested calls) when the calls
+// are nested in many statements: it must give the same result with the profiler (--profile), whose wrappers add Python
+// frames to every call, and one call more must end with a RangeError
+function nested(n) {
+    let r = 0
+    if (n > 0) {
+        if (n > 0) {
+            if (n > 0) {
+                if (n > 0) {
+                    if (n > 0) {
+                        if (n > 0) {
+                            if (n > 0) {
+                                if (n > 0) {
+                                    if (n > 0) {
+                                        if (n > 0) {
+                                            let s = nested(n - 1)
+                                            r = s + 1
+                                        }
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+    return r
+}
+let deepest = nested(9999)
+console.log(deepest)
+let deeper = nested(10000)
@@ -0,0 +1,55 @@
+// This test covers functions, recursion, nested functions and block scopes
+function factorial(n) {
+    if (n <= 1) {
+        return 1
+    }
+    let r = factorial(n - 1)
+    return n * r
+}
+console.log(`10! = ${factorial(10)}`)
+
+// the inner function reads the parameter and the local variable of the outer one
+function outer(x) {
+    let y = 2
+    function inner(z) {
+        return x + y + z
+    }
+    let r = inner(3)
+    return r
+}
+console.log(outer(1))
+
+// a return statement inside a loop leaves the function
+function first_sum_over(limit, n) {
+    let i = 0
+    let s = 0
+    while (i < n) {
+        i++
+        s += i
+        if (s > limit) {
+            return s
+        }
+    }
+    return -1
+}
+console.log(first_sum_over(20, 100))
+console.log(first_sum_over(20, 3))
+
+// missing arguments are undefined
+function second(a, b) {
+    return b
+}
+console.log(second(1))
+
+// the variables declared in a block are not visible outside of it
+let counter = 0
+while (counter < 3) {
+    let square = counter * counter
+    counter++
+}
+console.log(counter)
+
+let numbers = [1, 2, 3]
+numbers[5] = 9
+console.log(numbers)
+console.log(numbers.length)
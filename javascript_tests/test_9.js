@@ -0,0 +1,73 @@
+// constant expressions (folded by the optimizer, flag -O) and loops with invariant operations
+console.log(2 * 3 + 4)
+let flag = 1 < 2 && 3 > 2
+console.log(flag)
+console.log(!(1 > 2))
+console.log(1 > 2 || "2" == 2)
+console.log("5" - 2)
+console.log("5" + 2)
+console.log(true + 1)
+console.log("a" * 2)
+console.log(1 / 0)
+console.log(-1 / 0)
+console.log(0 / 0)
+console.log(7 / 2)
+console.log(-"3")
+console.log(-true)
+console.log("3" == 3)
+console.log("3" === 3)
+console.log(2 < 10)
+console.log("2" < "10")
+console.log(`${2 * 21} is the answer`)
+
+if (1 < 2) {
+    let message = "constant true branch"
+    console.log(message)
+} else {
+    console.log("never printed")
+}
+if ("a" == "b") {
+    console.log("never printed")
+} else {
+    console.log("constant false branch")
+}
+while (1 > 2) {
+    console.log("never printed")
+}
+
+let a = 6
+let b = 7
+let i = 0
+let total = 0
+while (i < 5) {
+    total = total + a * b + i
+    console.log(`step ${i}: ${a * b - 1}`)
+    i++
+}
+console.log(total)
+
+function sum_scaled(n, scale) {
+    let j = 0
+    let sum = 0
+    while (j < n) {
+        sum += scale * 2
+        j++
+    }
+    return sum
+}
+let scaled = sum_scaled(4, 1.5)
+console.log(scaled)
+
+let cells = [1, 2]
+let k = 0
+while (k < 3) {
+    cells[k] = cells[0] + a * 2
+    k++
+}
+console.log(cells)
+
+let never = 0
+while (never > 0) {
+    console.log(a * b)
+}
+console.log(never)
@@ -0,0 +1,92 @@
+# Representation of the JavaScript values that have no Python equivalent.
+# - undefined is a singleton object (it is equal only to itself and it is falsy);
+# - NaN and Infinity are the IEEE 754 float values, so the arithmetic on them needs no special case;
+# - the truthiness of a value (ToBoolean) is decided by its type with a constant number of checks, and the values are
+#   printed and converted to strings with the JavaScript names of the special numbers.
+import math
+
+from JSArray import JSArray
+from Rope import Rope
+
+
+class Undefined:
+    """
+    Type of the JavaScript undefined value, it has only one instance
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return 'undefined'
+
+    def __reduce__(self):
+        return Undefined, ()  # a copied or unpickled undefined is still the same object
+
+
+undefined = Undefined()
+NaN = float('nan')
+Infinity = float('inf')
+
+
+def truthy(value):
+    """
+    Converts a value to boolean, like JavaScript's ToBoolean
+    :return: False for false, 0, NaN, the empty string and undefined, True for any other value (arrays and functions
+    included)
+    """
+    value_type = type(value)
+    if value_type is bool:
+        return value
+    elif value_type is int:
+        return value != 0
+    elif value_type is float:
+        return value != 0 and value == value  # NaN is the only value not equal to itself
+    elif value_type is str:
+        return value != ''
+    elif value_type is Rope:
+        return len(value) != 0
+    return value is not undefined and value is not None
+
+
+def number_to_string(number):
+    """
+    :return: the string of a number, with the JavaScript names of NaN and of the infinities
+    """
+    if number != number:
+        return 'NaN'
+    elif number == Infinity:
+        return 'Infinity'
+    elif number == -Infinity:
+        return '-Infinity'
+    return str(number)
+
+
+def divide(left, right):
+    """
+    Division between two numbers: the division by zero gives an infinity (or NaN for 0/0), like in JavaScript
+    """
+    try:
+        return left / right
+    except ZeroDivisionError:
+        if left == 0 or left != left:
+            return NaN
+        return math.copysign(Infinity, left) * math.copysign(1, right)
+
+
+def display(value):
+    """
+    :return: the string printed by console.log for the value
+    """
+    if type(value) is float:
+        return number_to_string(value)
+    elif type(value) is list or type(value) is JSArray:
+        return '[' + ', '.join(repr(str(element)) if type(element) is str or type(element) is Rope else display(element)
+                               for element in value) + ']'
+    return str(value)
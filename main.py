@@ -1,102 +1,20 @@
-from lark import Lark, UnexpectedInput
-from lark.exceptions import UnexpectedToken
-from Interpreter import JavaScriptInterpreter
+from lark import UnexpectedInput
+from BatchRunner import run_batch
+from Console import Console
+from ExecutionLimits import ExecutionLimits
+from Frame import max_call_depth
+from Memoizer import Memoizer
+from OutputSink import FileSink, NullSink, StreamSink, flush_policies
+from Profiler import Profiler, SamplingProfiler
+from Runtime import Runtime, get_parser, parse
+from Snapshot import Snapshot
 from error_handling import *
+from js_values import display
 from argparse import ArgumentParser  # to provide Command Line Interface (CLI) command and flags (i.e., to execute scripts)
 
+import atexit
 import os
-
-# Get the path to the 'JavaScript_grammar.lark' file relative to the script location
-script_dir = os.path.dirname(os.path.realpath(__file__))
-grammar_file_path = os.path.join(script_dir, "JavaScript_grammar.lark")
-
-# Now you can use grammar_file_path to access the grammar file
-
-# the grammar is contained in the file JavaScript_grammar.lark
-parser = Lark.open(grammar_file_path, parser='lalr', debug=True)
-
-
-def parse(javascript_script):
-    """
-    Wrapper for the parser.parse method including error handling
-    :param javascript_script: script given as input from CLI command
-    :return:
-    """
-    try:
-        tree = parser.parse(javascript_script)
-    except UnexpectedInput as u:
-        # find some lexical or syntactic error
-        exc_class = u.match_examples(parser.parse, {
-            MissingClosingParenthesisAfterCondition: ['if (a == b',
-                                                      'if (a == b { return foo }',
-                                                      'if (a > b',
-                                                      'if (a > b { return foo }',
-                                                      'if (a < b',
-                                                      'if (a < b { return foo }',
-                                                      'if (a',
-                                                      'if (a { return foo }',
-                                                      'if (true',
-                                                      'if (true { return foo }',
-                                                      'if (false',
-                                                      'if (false { return foo }',
-                                                      'if (a == b && c != d',
-                                                      'if (a == b && c != d { return foo }',
-                                                      'while (a == b',
-                                                      'while (a > b',
-                                                      'while (a < b',
-                                                      'while (a',
-                                                      'while (true',
-                                                      'while (false',
-                                                      'while (a == b && c != d'
-                                                      ],
-            MissingClosingParenthesisAfterElementList: ['[fo',
-                                                        '[foo, fo',
-                                                        '[fooo, foo, fo',
-                                                        '[fooo, foo, fo,',
-                                                        '[foo, fo,',
-                                                        '[fo,'
-                                                        ],
-            MissingClosingParenthesisAfterFunctionBody: ['function foo() {',
-                                                         'function foo() { return 1',
-                                                         'function foo() { return 1 + 2',
-                                                         'function foo(a,b) { return a+ b'],
-            MissingEqualInConstDeclaration: ['const foo 1',
-                                             'const foo',
-                                             'const foo;'],
-            UnexpectedEndOfInput: ['const foo =',
-                                   'foo(',
-                                   'function foo(',
-                                   'function foo(fo',
-                                   'function foo(fo,',
-                                   'function foo(foo, fo',
-                                   'function foo(foo, fo,',
-                                   'function foo(fooo, foo, fo',
-                                   'function foo(fooo, foo, fo,',
-                                   'let a = [fo',
-                                   'let a = [foo, fo',
-                                   'let a = [fooo, foo, fo',
-                                   'let a = [fo,',
-                                   'let a = [foo, fo,',
-                                   'let a = [fooo, foo, fo,',
-                                   'const a = [fo',
-                                   'const a = [foo, fo',
-                                   'const a = [fooo, foo, fo',
-                                   'const a = [fo,',
-                                   'const a = [foo, fo,',
-                                   'const a = [fooo, foo, fo,',
-                                   'var a = [fo',
-                                   'var a = [foo, fo',
-                                   'var a = [fooo, foo, fo',
-                                   'var a = [fo,',
-                                   'var a = [foo, fo,',
-                                   'var a = [fooo, foo, fo,'
-                                   ]
-        }, use_accepts=True)  # True because it is recommended by Lark documentation
-        if not exc_class:
-            raise
-        raise exc_class(u.get_context(javascript_script), u.line, u.column)
-    else:
-        return tree # return the parse tree
+import sys
 
 
 def main():
@@ -106,86 +24,158 @@ def main():
                                  action="store_true") # execute the interpreter in console mode
     argument_parser.add_argument("-d", "--debug", help="Prints the tree of the process for debug purposes",
                                  action="store_true") # print the parse tree for debug purposes
+    argument_parser.add_argument("-O", "--optimize", help="Optimizes the parse tree before the execution (constant "
+                                                          "folding, dead branches, loop-invariant operations)",
+                                 action="store_true")
+    argument_parser.add_argument("--dump-optimized", help="Prints the optimized parse tree (implies -O)",
+                                 action="store_true")
+    argument_parser.add_argument("--profile", help="Profiles the execution and writes the report in PREFIX.txt and the "
+                                                   "collapsed stacks (for flame graphs) in PREFIX.folded",
+                                 nargs="?", const="js_profile", metavar="PREFIX")
+    argument_parser.add_argument("--profile-interval", help="With --profile, samples the stack every MS milliseconds "
+                                                            "instead of timing every call", type=float, metavar="MS")
+    argument_parser.add_argument("--output", help="Writes the output of the program (console.log) in a file instead of "
+                                                  "the terminal", metavar="FILE")
+    argument_parser.add_argument("--flush", help="Flush policy of the output: at every write, at every line or when the "
+                                                 "buffer is full (default: line on a terminal, full otherwise)",
+                                 choices=flush_policies)
+    argument_parser.add_argument("--quiet", help="Discards the output of the program and prints only its size, to "
+                                                 "benchmark the program without the cost of the output",
+                                 action="store_true")
+    argument_parser.add_argument("--max-call-depth", help="Maximum number of nested function calls, a deeper call "
+                                                          "raises a RangeError (default: %(default)s)",
+                                 type=int, default=max_call_depth)
+    argument_parser.add_argument("--max-steps", help="Maximum number of steps (loop iterations and function calls) of "
+                                                     "an execution", type=int)
+    argument_parser.add_argument("--timeout", help="Maximum execution time in seconds", type=float)
+    argument_parser.add_argument("--max-value-size", help="Maximum length of each array or string (a cap on every "
+                                                          "value, not on their total)", type=int)
+    argument_parser.add_argument("--memoize-pure", help="Caches the calls of the pure functions by their arguments and "
+                                                        "prints the hit rates at the end", action="store_true")
+    argument_parser.add_argument("--load-snapshot", help="Starts with the global variables and functions of a snapshot "
+                                                         "(es. of a prelude)", metavar="FILE")
+    argument_parser.add_argument("--save-snapshot", help="Writes the global variables and functions in a snapshot at "
+                                                         "the end of the script or of the console", metavar="FILE")
+    argument_parser.add_argument("--batch", help="Executes all the scripts in a directory or matching a glob pattern "
+                                                 "with a pool of worker processes", metavar="DIR|GLOB")
+    argument_parser.add_argument("-j", "--jobs", help="Number of worker processes of --batch (default: number of CPUs)",
+                                 type=int)
+    argument_parser.add_argument("--no-parser-cache", help="Builds the parser from the grammar without using the "
+                                                          "on-disk parser cache", action="store_true")
+    argument_parser.add_argument("--engine", help="Execution engine: closure compiler (default, the fastest) or "
+                                                  "bytecode virtual machine (slower, its calls do not use the Python "
+                                                  "stack)", choices=["compiled", "vm"], default="compiled")
     # get the arguments from the command line instruction (e.g., the path of the script to be executed)
     args = argument_parser.parse_args()
+    limits = None
+    if args.max_steps is not None or args.timeout is not None or args.max_value_size is not None:
+        limits = ExecutionLimits(args.max_steps, args.timeout, args.max_value_size)
+    if args.profile and args.engine != 'compiled':
+        argument_parser.error("--profile requires the compiled engine")
+    if args.profile_interval is not None and not args.profile:
+        argument_parser.error("--profile-interval requires --profile")
+    if args.memoize_pure and args.engine != 'compiled':
+        argument_parser.error("--memoize-pure requires the compiled engine")
+    if args.batch:
+        sys.exit(run_batch(args.batch, args.engine, args.optimize, args.jobs, use_cache=not args.no_parser_cache,
+                           limits=limits, snapshot_path=args.load_snapshot))
+    profiler = None
+    if args.profile:
+        profiler = Profiler() if args.profile_interval is None else SamplingProfiler(args.profile_interval / 1000)
+        atexit.register(profiler.save, args.profile)  # the report is written also when the script ends with an error
+    memoizer = None
+    if args.memoize_pure:
+        memoizer = Memoizer()
+        atexit.register(lambda: print(memoizer.report(), end='', file=sys.stderr))
+    if args.quiet:
+        output = NullSink(prompt_stream=sys.stdout)  # the prompts are still shown, to type the input
+        atexit.register(lambda: print('%d bytes of output' % output.bytes, file=sys.stderr))
+    elif args.output:
+        output = FileSink(args.output, args.flush or 'full')
+        atexit.register(output.close)
+    else:
+        output = StreamSink(flush_policy=args.flush or ('line' if sys.stdout.isatty() else 'full'))
+        atexit.register(output.flush)
+
+    def echo(text):
+        """
+        Prints the results, the errors and the parse trees through the output sink, in order with the output of the
+        programs and with their prompts
+        """
+        output.write('%s\n' % text)
+
+    get_parser(use_cache=not args.no_parser_cache, propagate_positions=profiler is not None)
+    # the runtime keeps the global scope of the program (shared by the lines of the console)
+    runtime = Runtime(args.engine, args.optimize or args.dump_optimized, profiler, output=output,
+                      max_call_depth=args.max_call_depth, memoizer=memoizer, limits=limits)
+    if args.load_snapshot:
+        runtime.restore(Snapshot.load(args.load_snapshot))
 
     if args.console or args.script is None:  # if no script is provided, the interpreter starts in console mode
+        repl = Console(runtime.parser)  # a statement can span many lines, read until it is complete
+
+        def run(tree):
+            """
+            Executes the parse tree of the statements read by the console and prints their result
+            """
+            program = runtime.optimize(tree)
+            try:
+                interpreted_tree = runtime.execute(program)  # compile the parse tree and execute it
+            except (IsNotAFunction, RangeError, ExecutionLimitExceeded) as e:
+                echo(e)
+                return
+            if args.debug:
+                echo("Here the parse tree for debug purposes: \n")
+                echo(tree.pretty())
+            if args.dump_optimized:
+                echo("Here the optimized parse tree: \n")
+                echo(program.pretty())
+            if interpreted_tree is not None:
+                echo(display(interpreted_tree))
+
         while True:
+            output.flush()  # the results of the previous line are visible before the next prompt
             try:
-                console = input('JS> ')
-                if console == "" or console.startswith("//") or (console.startswith("/*") and console.endswith("*/")):
-                    # ignore comments
-                    continue
+                console = input('... ' if repl.pending else 'JS> ')
             except EOFError:
+                try:
+                    tree = repl.end()  # the statement held by the last line, the one left incomplete is an error
+                    if tree is not None:
+                        run(tree)
+                except (UnexpectedInput, JavaScriptSyntaxError) as e:
+                    echo(console_error_message(e))
+                if args.save_snapshot:
+                    runtime.snapshot().save(args.save_snapshot)
                 break
             try:
-                tree = parse(console) # obtain the parse tree by parsing the input from the console
-            except UnexpectedInput as i:
-                print(f"LexicalError: scanning failed due to unexpected input at line {i.line} and column {i.column}\n")
-                continue
-            except UnexpectedToken as t:
-                print(f"LexicalError: scanning failed due to unexpected token at line {t.line} and column {t.column}\n")
-                continue
-            except MissingClosingParenthesisAfterCondition as e:
-                print(e)
-                continue
-            except MissingClosingParenthesisAfterElementList as e:
-                print(e)
-                continue
-            except MissingClosingParenthesisAfterFunctionBody as e:
-                print(e)
-                continue
-            except MissingEqualInConstDeclaration as e:
-                print(e)
-                continue
-            except UnexpectedEndOfInput as e:
-                print(e)
-                continue
-            try:
-                interpreted_tree = JavaScriptInterpreter().visit(tree) # interpret the parse tree
-            except IsNotAFunction as e:
-                print(e)
-                continue
-            if args.debug:
-                print("Here the parse tree for debug purposes: \n")
-                print(tree.pretty())
-            if interpreted_tree is not None:
-                print(interpreted_tree)
+                # the parse trees of the statements ended by the line, none if the statement continues in the next lines
+                for tree in repl.feed(console):
+                    run(tree)
+            except (UnexpectedInput, JavaScriptSyntaxError) as e:
+                echo(console_error_message(e))
     elif args.script:
         # if a script is given, execute it
         with open(args.script, "r") as f:
             file = f.read()
             try:
                 tree = parse(file)
-            except UnexpectedInput as i:
-                print(f"LexicalError: scanning failed due to unexpected input at line {i.line} column {i.column}\n")
-                exit()
-            except UnexpectedToken as t:
-                print(f"LexicalError: scanning failed due to unexpected token at line {t.line} column {t.column}\n")
-                exit()
-            except MissingClosingParenthesisAfterCondition as e:
-                print(e)
-                exit()
-            except MissingClosingParenthesisAfterElementList as e:
-                print(e)
-                exit()
-            except MissingClosingParenthesisAfterFunctionBody as e:
-                print(e)
-                exit()
-            except MissingEqualInConstDeclaration as e:
-                print(e)
-                exit()
-            except UnexpectedEndOfInput as e:
-                print(e)
+            except (UnexpectedInput, JavaScriptSyntaxError) as e:
+                echo(script_error_message(e))
                 exit()
+            program = runtime.optimize(tree)
             try:
-                JavaScriptInterpreter().visit(tree)
-            except IsNotAFunction as e:
-                print(e)
+                runtime.execute(program)
+            except (IsNotAFunction, RangeError, ExecutionLimitExceeded) as e:
+                echo(e)
                 exit()
             if args.debug:
-                print("Here the parse tree for debug purposes: \n")
-                print(tree.pretty())  # print the parse tree
+                echo("Here the parse tree for debug purposes: \n")
+                echo(tree.pretty())  # print the parse tree
+            if args.dump_optimized:
+                echo("Here the optimized parse tree: \n")
+                echo(program.pretty())
+            if args.save_snapshot:
+                runtime.snapshot().save(args.save_snapshot)
 
 
 if __name__ == '__main__':